@@ -53,6 +53,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     # Local apps
+    'common',
     'accounts',
     'activities',
 ]
@@ -142,6 +143,26 @@ else:
     }
 
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at e.g. Redis or Memcached in production.
+# A shared backend is required with several workers: invalidation only reaches the local process otherwise,
+# so on LocMem every entry is capped at LOCAL_CACHE_MAX_TIMEOUT seconds (see common/caching.py).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'activitypass'),
+    }
+}
+LOCAL_CACHE_MAX_TIMEOUT = int(os.getenv('LOCAL_CACHE_MAX_TIMEOUT', '30'))
+# Seconds a cached activity list/detail response lives; writes invalidate it immediately on a shared backend
+ACTIVITY_CACHE_TIMEOUT = int(os.getenv('ACTIVITY_CACHE_TIMEOUT', '300'))
+
+# Where streamed course uploads are spooled before the background import (default: system temp dir)
+COURSE_IMPORT_DIR = os.getenv('COURSE_IMPORT_DIR', '')
+# Jobs without progress for this many seconds are picked up by `recover_course_imports`
+COURSE_IMPORT_STALE_AFTER = int(os.getenv('COURSE_IMPORT_STALE_AFTER', '600'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -181,6 +202,27 @@ STATIC_URL = 'static/'
 import os
 TRANSLATE_API_URL = os.environ.get('TRANSLATE_API_URL', 'https://libretranslate.com/translate')
 TRANSLATE_API_KEY = os.environ.get('TRANSLATE_API_KEY', '')
+TRANSLATE_TIMEOUT = int(os.environ.get('TRANSLATE_TIMEOUT', '10'))
+TRANSLATE_FAILURE_BACKOFF = int(os.environ.get('TRANSLATE_FAILURE_BACKOFF', '60'))
+# Strings sent per LibreTranslate request and size of the in-process LRU in front of the memo table
+TRANSLATE_BATCH_SIZE = int(os.environ.get('TRANSLATE_BATCH_SIZE', '50'))
+TRANSLATION_CACHE_SIZE = int(os.environ.get('TRANSLATION_CACHE_SIZE', '4096'))
+# Dotted path to a (texts, target, source) -> list|None callable; use common.translation.stub_translate_batch offline
+TRANSLATION_BACKEND = os.environ.get('TRANSLATION_BACKEND', 'common.translation.libretranslate_batch')
+# Drain queued translations on a background thread after each save; disable to rely on `translate_pending`
+TRANSLATION_ASYNC = os.environ.get('TRANSLATION_ASYNC', 'true').lower() == 'true'
+# Recommender encoder, loaded lazily on first use or by `warm_recommender`.
+# Dotted path to a zero-argument factory; ai.recommendation.HashingEncoder is a deterministic offline stub.
+RECOMMENDER_ENCODER = os.environ.get('RECOMMENDER_ENCODER', 'ai.recommendation.SentenceTransformerEncoder')
+# sentence-transformers model name or a local directory for offline deployments
+RECOMMENDER_MODEL_PATH = os.environ.get('RECOMMENDER_MODEL_PATH', 'all-MiniLM-L6-v2')
+RECOMMENDER_FAILURE_BACKOFF = int(os.environ.get('RECOMMENDER_FAILURE_BACKOFF', '300'))
+# Memory-mapped activity embeddings (built by `build_activity_embeddings`, kept current on save when NumPy is installed)
+RECOMMENDER_STORE_DIR = os.environ.get('RECOMMENDER_STORE_DIR', '')
+RECOMMENDER_STORE_SYNC = os.environ.get('RECOMMENDER_STORE_SYNC', 'true').lower() == 'true'
+# Per-student ranked ids for /api/activities/recommended/ (warmed by `precompute_recommendations`)
+RECOMMENDATION_CACHE_TIMEOUT = int(os.environ.get('RECOMMENDATION_CACHE_TIMEOUT', '3600'))
+RECOMMENDATION_LIMIT = int(os.environ.get('RECOMMENDATION_LIMIT', '50'))
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = []
 # Vite puts assets in 'assets' directory, not 'static'
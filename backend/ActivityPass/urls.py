@@ -54,6 +54,10 @@ spa_view = frontend_view
 from django.conf import settings
 from django.conf.urls.static import static
 urlpatterns = [
+    # Listed before the router so admin/courses/<pk>/ does not swallow them
+    path('api/admin/courses/import/', accounts_admin.import_courses, name='admin_courses_import'),
+    path('api/admin/courses/import/stream/', accounts_admin.import_courses_stream, name='admin_courses_import_stream'),
+    path('api/admin/courses/import/jobs/<int:job_id>/', accounts_admin.course_import_job_status, name='admin_courses_import_job'),
     path('api/', include(router.urls)),
     path('api/eligibility/<int:activity_id>/', eligibility_check, name='eligibility-check'),
     # Auth (JWT)
@@ -67,7 +71,6 @@ urlpatterns = [
     path('api/admin/create-faculty/', accounts_admin.create_faculty, name='admin_create_faculty'),
     path('api/admin/create-student/', accounts_admin.create_student, name='admin_create_student'),
     path('api/admin/reset-password/', accounts_admin.reset_password, name='admin_reset_password'),
-    path('api/admin/courses/import/', accounts_admin.import_courses, name='admin_courses_import'),
     path('api/admin/faculty/course-counts/', accounts_admin.get_faculty_course_counts, name='admin_faculty_course_counts'),
     path('api/admin/security/preferences/', accounts_admin.get_security_preferences, name='admin_security_preferences'),
     path('api/admin/security/toggle/', accounts_admin.toggle_default_password_enforcement, name='admin_security_toggle'),
@@ -5,30 +5,15 @@ from django.db.models.functions import Coalesce
 from rest_framework import permissions, status, viewsets, serializers
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+import os
 import random
 import string
 
-from .serializers import UserSerializer, CourseSerializer, CourseEnrollmentSerializer, AcademicTermSerializer, FacultyProfileSerializer
+from .course_import import import_course_rows, schedule_course_import, spool_upload
+from .serializers import UserSerializer, CourseSerializer, CourseEnrollmentSerializer, AcademicTermSerializer, FacultyProfileSerializer, CourseImportJobSerializer
 from rest_framework.decorators import api_view, permission_classes
 
-@api_view(['POST'])
-@transaction.atomic
-def import_courses(request):
-    """Batch import courses. Body: {"courses": [CourseInput, ...]} Returns: {created: int, errors: [{index, error, data}]}"""
-    items = request.data.get('courses')
-    if not isinstance(items, list):
-        return Response({'detail': 'courses must be a list'}, status=400)
-    created = 0
-    errors = []
-    for idx, data in enumerate(items):
-        serializer = CourseSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save()
-            created += 1
-        else:
-            errors.append({'index': idx, 'error': serializer.errors, 'data': data})
-    return Response({'created': created, 'errors': errors}, status=201 if created else 400)
-from .models import AccountMeta, StudentProfile, FacultyProfile, SecurityPreference, Course, CourseEnrollment, AcademicTerm
+from .models import AccountMeta, StudentProfile, FacultyProfile, SecurityPreference, Course, CourseEnrollment, AcademicTerm, CourseImportJob
 from activities.models import Activity
 from activities.serializers import ActivitySerializer
 
@@ -99,6 +84,87 @@ class IsAdmin(permissions.BasePermission):
         return bool(request.user and request.user.is_authenticated and request.user.is_superuser)
 
 
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def import_courses(request):
+    """Batch import courses. Body: {"courses": [CourseInput, ...]} Returns: {created: int, updated: int, unchanged: int, errors: [{index, error, data}]}
+
+    Rows matching an existing (code, term, weekday, periods) update that course instead of duplicating it.
+    """
+    items = request.data.get('courses')
+    if not isinstance(items, list):
+        return Response({'detail': 'courses must be a list'}, status=400)
+    result = import_course_rows(items)
+    accepted = result['created'] + result['updated'] + result['unchanged']
+    return Response(result, status=201 if accepted else 400)
+
+
+IMPORT_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/x-jsonlines': 'jsonl',
+}
+
+
+def _import_format(request, upload):
+    # Not ``format``: DRF reserves that query parameter for renderer selection (404 on csv/jsonl).
+    fmt = (request.query_params.get('type') or '').lower()
+    if fmt:
+        return fmt
+    if upload is not None:
+        name = (upload.name or '').lower()
+        if name.endswith('.csv'):
+            return 'csv'
+        if name.endswith(('.jsonl', '.ndjson')):
+            return 'jsonl'
+    return IMPORT_CONTENT_TYPES.get((request.content_type or '').split(';')[0].strip().lower(), '')
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def import_courses_stream(request):
+    """Queue a CSV or JSONL course import. Send multipart ``file`` or a raw text/csv / application/x-ndjson body.
+
+    Columns/keys match scripts/py/csv_to_json_courses.py output. Returns the job (202); poll
+    /api/admin/courses/import/jobs/<id>/ for progress.
+    """
+    upload = None
+    if (request.content_type or '').startswith('multipart/'):
+        upload = request.FILES.get('file')
+        if upload is None or not upload.size:
+            return Response({'detail': 'file is required'}, status=400)
+    elif request.stream is None:
+        # DRF leaves no stream for an empty body
+        return Response({'detail': 'request body is required'}, status=400)
+    fmt = _import_format(request, upload)
+    if fmt not in dict(CourseImportJob.FORMAT_CHOICES):
+        return Response({'detail': 'type must be csv or jsonl'}, status=400)
+    # The raw body is copied to disk block by block rather than parsed into memory.
+    path = spool_upload(upload if upload is not None else request.stream, fmt)
+    try:
+        job = CourseImportJob.objects.create(format=fmt, source_path=path, created_by=request.user)
+    except Exception:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    schedule_course_import(job.pk)
+    return Response(CourseImportJobSerializer(job).data, status=202)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def course_import_job_status(request, job_id: int):
+    try:
+        job = CourseImportJob.objects.get(pk=job_id)
+    except CourseImportJob.DoesNotExist:
+        return Response({'detail': 'Import job not found'}, status=404)
+    return Response(CourseImportJobSerializer(job).data)
+
+
 class AdminStudentProfileSerializer(serializers.ModelSerializer):
     student_id = serializers.CharField(read_only=True)
     class_name = serializers.CharField(required=False, allow_blank=True)
@@ -274,7 +340,7 @@ class AdminCourseEnrollmentViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
     def get_queryset(self):
-        qs = CourseEnrollment.objects.select_related('course', 'student', 'student__user')
+        qs = CourseEnrollment.objects.select_related('course', 'student__user__account_meta')
         course_id = self.request.query_params.get('course')
         if course_id:
             qs = qs.filter(course_id=course_id)
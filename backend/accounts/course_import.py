@@ -0,0 +1,313 @@
+"""Bulk course import shared by the admin import endpoints.
+
+``import_course_rows`` upserts a list of rows; ``import_course_stream`` feeds it
+chunk by chunk from a CSV/JSONL upload, which ``CourseImportJob`` processes on
+a single background thread. Jobs orphaned by a worker restart are resumed or
+failed by ``recover_stale_import_jobs`` (``manage.py recover_course_imports``).
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from activities.course_events import invalidate_all_busy_indexes
+from .models import Course, CourseImportJob
+from .serializers import CourseSerializer, active_term_starts
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 500
+
+CourseKey = Tuple[str, str, int, Tuple[int, ...]]
+
+
+def course_key(code, term, weekday, periods) -> CourseKey:
+    """Identity used to match imported rows against stored courses."""
+    return (code or '', term or '', weekday, tuple(sorted(periods or [])))
+
+
+def _existing_course_ids(keys: Iterable[CourseKey]) -> Dict[CourseKey, int]:
+    keys = set(keys)
+    codes = {key[0] for key in keys}
+    terms = {key[1] for key in keys}
+    rows = Course.objects.filter(code__in=codes, term__in=terms).values_list('id', 'code', 'term', 'weekday', 'periods')
+    existing: Dict[CourseKey, int] = {}
+    for course_id, code, term, weekday, periods in rows:
+        key = course_key(code, term, weekday, periods)
+        if key in keys:
+            existing.setdefault(key, course_id)
+    return existing
+
+
+def import_course_rows(items: List[dict], chunk_size: int = IMPORT_CHUNK_SIZE, start_index: int = 0) -> Dict:
+    """Validate, dedupe and upsert course rows.
+
+    Every row is validated in memory against one preloaded term map, existing
+    courses are matched on (code, term, weekday, periods) with a single query,
+    and writes go through bulk_create/bulk_update in chunks that each commit in
+    their own short transaction; rows identical to the stored course are left
+    alone. Returns ``{created, updated, unchanged, errors}`` where each error
+    is ``{index, error, data}``; indexes are offset by ``start_index``.
+    """
+    # One serializer instance is reused so DRF builds the field set once, not per row.
+    validator = CourseSerializer(context={'academic_terms': active_term_starts()})
+    errors: List[Dict] = []
+    valid: Dict[CourseKey, Tuple[int, dict]] = {}
+
+    for idx, data in enumerate(items, start_index):
+        try:
+            attrs = validator.run_validation(data)
+        except serializers.ValidationError as exc:
+            errors.append({'index': idx, 'error': exc.detail, 'data': data})
+            continue
+        key = course_key(attrs.get('code'), attrs.get('term'), attrs.get('weekday', -1), attrs.get('periods'))
+        if key in valid:
+            errors.append({
+                'index': idx,
+                'error': {'non_field_errors': [f'Duplicate of row {valid[key][0]} in this import.']},
+                'data': data,
+            })
+            continue
+        valid[key] = (idx, attrs)
+
+    existing_ids = _existing_course_ids(valid)
+    existing = Course.objects.in_bulk(list(existing_ids.values()))
+    to_create: List[Course] = []
+    to_update: List[Course] = []
+    update_fields = set()
+    unchanged = 0
+    now = timezone.now()
+
+    for key, (_, attrs) in valid.items():
+        course = existing.get(existing_ids.get(key))
+        if course is None:
+            course = Course(**attrs)
+            course.refresh_schedule_masks()
+            to_create.append(course)
+            continue
+        changed = {field for field, value in attrs.items() if getattr(course, field) != value}
+        if not changed:
+            # Re-importing the same timetable should not rewrite every row.
+            unchanged += 1
+            continue
+        for field in changed:
+            setattr(course, field, attrs[field])
+        course.refresh_schedule_masks()
+        course.updated_at = now
+        update_fields |= changed | {'week_mask', 'period_mask', 'updated_at'}
+        to_update.append(course)
+
+    for start in range(0, len(to_create), chunk_size):
+        with transaction.atomic():
+            Course.objects.bulk_create(to_create[start:start + chunk_size])
+    for start in range(0, len(to_update), chunk_size):
+        with transaction.atomic():
+            Course.objects.bulk_update(to_update[start:start + chunk_size], sorted(update_fields))
+
+    if to_update:
+        # bulk_update skips post_save, so drop cached schedules by hand.
+        invalidate_all_busy_indexes()
+
+    return {'created': len(to_create), 'updated': len(to_update), 'unchanged': unchanged, 'errors': errors}
+
+
+# --- Streaming CSV/JSONL uploads -------------------------------------------
+
+STREAM_COPY_BYTES = 64 * 1024
+MAX_REPORTED_ERRORS = 200
+LIST_COLUMNS = ('periods', 'weeks')
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _parse_int_list(raw: str):
+    """Accept ``[1,2,3]`` (as written by csv_to_json_courses.py) or ``1,2,3`` / ``1 2 3``."""
+    raw = raw.strip()
+    if raw.startswith('['):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw
+    return [part for part in re.split(r'[\s,;]+', raw) if part]
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[dict]:
+    """Yield course dicts from a CSV whose header uses the course JSON field names."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    for row in reader:
+        item = {}
+        for column, value in row.items():
+            if column is None or value is None:
+                continue
+            value = value.strip()
+            if not value:
+                # CSV has no null; let model defaults apply instead of failing number fields.
+                continue
+            item[column.strip()] = _parse_int_list(value) if column.strip() in LIST_COLUMNS else value
+        yield item
+
+
+def iter_jsonl_rows(stream: BinaryIO) -> Iterator:
+    """Yield one object per non-blank line; undecodable lines are passed through as strings."""
+    for line in io.TextIOWrapper(stream, encoding='utf-8-sig'):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+ROW_READERS = {
+    'csv': iter_csv_rows,
+    'jsonl': iter_jsonl_rows,
+}
+
+
+def import_course_stream(rows: Iterable, chunk_size: int = IMPORT_CHUNK_SIZE, on_chunk=None) -> Dict:
+    """Import an iterable of rows ``chunk_size`` at a time; memory stays bounded by one chunk.
+
+    ``on_chunk(totals)`` is called after every committed chunk so callers can report progress.
+    """
+    totals = {'processed': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'error_count': 0, 'errors': []}
+    chunk: List = []
+
+    def flush():
+        result = import_course_rows(chunk, chunk_size=chunk_size, start_index=totals['processed'])
+        totals['processed'] += len(chunk)
+        for name in ('created', 'updated', 'unchanged'):
+            totals[name] += result[name]
+        totals['error_count'] += len(result['errors'])
+        room = MAX_REPORTED_ERRORS - len(totals['errors'])
+        if room > 0:
+            totals['errors'].extend(result['errors'][:room])
+        chunk.clear()
+        if on_chunk is not None:
+            on_chunk(totals)
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return totals
+
+
+def course_import_dir() -> str:
+    path = getattr(settings, 'COURSE_IMPORT_DIR', '') or os.path.join(tempfile.gettempdir(), 'activitypass-imports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def spool_upload(source, suffix: str) -> str:
+    """Copy an uploaded file or raw request stream to disk in fixed-size chunks; return the path."""
+    fd, path = tempfile.mkstemp(prefix='courses-', suffix=f'.{suffix}', dir=course_import_dir())
+    with os.fdopen(fd, 'wb') as out:
+        if hasattr(source, 'chunks'):
+            for block in source.chunks(STREAM_COPY_BYTES):
+                out.write(block)
+        else:
+            while True:
+                block = source.read(STREAM_COPY_BYTES)
+                if not block:
+                    break
+                out.write(block)
+    return path
+
+
+def _job_progress(job_id: int, totals: Dict, **extra) -> None:
+    CourseImportJob.objects.filter(pk=job_id).update(
+        processed_rows=totals['processed'],
+        created_count=totals['created'],
+        updated_count=totals['updated'],
+        unchanged_count=totals['unchanged'],
+        error_count=totals['error_count'],
+        errors=totals['errors'],
+        updated_at=timezone.now(),
+        **extra,
+    )
+
+
+def run_course_import_job(job_id: int) -> None:
+    """Process one pending job; safe to call from a worker thread or a shell."""
+    claimed = CourseImportJob.objects.filter(pk=job_id, status='pending').update(status='running', updated_at=timezone.now())
+    if not claimed:
+        return
+    job = CourseImportJob.objects.get(pk=job_id)
+    try:
+        with open(job.source_path, 'rb') as stream:
+            totals = import_course_stream(
+                ROW_READERS[job.format](stream),
+                on_chunk=lambda progress: _job_progress(job_id, progress),
+            )
+    except Exception as exc:
+        logger.exception('Course import job %s failed', job_id)
+        CourseImportJob.objects.filter(pk=job_id).update(
+            status='failed', message=str(exc), finished_at=timezone.now(), updated_at=timezone.now()
+        )
+    else:
+        _job_progress(job_id, totals, status='done', finished_at=timezone.now())
+    finally:
+        try:
+            os.remove(job.source_path)
+        except OSError:
+            pass
+
+
+def recover_stale_import_jobs(stale_after: int, resume: bool = True) -> Tuple[int, int]:
+    """Restart or fail jobs with no progress for ``stale_after`` seconds; returns (resumed, failed).
+
+    Imports are upserts, so a restarted job simply re-reads its upload from the
+    first row. Jobs whose spooled upload is gone, or all of them when
+    ``resume`` is False, are marked failed instead.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    resumed = failed = 0
+    stale = CourseImportJob.objects.filter(status__in=['pending', 'running'], updated_at__lt=cutoff)
+    for job in stale.order_by('id'):
+        claimed = CourseImportJob.objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at)
+        if resume and os.path.exists(job.source_path):
+            if claimed.update(status='pending', message='Resumed after the import worker stopped', updated_at=timezone.now()):
+                run_course_import_job(job.pk)
+                resumed += 1
+        elif claimed.update(
+            status='failed',
+            message='Import worker stopped before finishing; upload again',
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        ):
+            failed += 1
+    return resumed, failed
+
+
+def schedule_course_import(job_id: int) -> None:
+    """Run the job on the background import thread once the current transaction commits."""
+    transaction.on_commit(lambda: _submit_course_import(job_id))
+
+
+def _submit_course_import(job_id: int) -> None:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='course-import')
+    _executor.submit(_run_in_background, job_id)
+
+
+def _run_in_background(job_id: int) -> None:
+    try:
+        run_course_import_job(job_id)
+    finally:
+        connection.close()
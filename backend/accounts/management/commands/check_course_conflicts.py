@@ -1,11 +1,129 @@
 import json
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, groupby
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
 
+import django
 from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts.models import CourseEnrollment, StudentProfile
+from accounts.schedule import is_scheduled, mask_to_list
+
+ENROLLMENT_FIELDS = (
+    'student_id',
+    'student__student_id',
+    'course_id',
+    'course__code',
+    'course__title',
+    'course__weekday',
+    'course__week_mask',
+    'course__period_mask',
+)
+STUDENT_ORDER = ('student__student_id', 'student_id', 'course__code', 'course_id')
+
+
+def serialize_course(row: Dict) -> Dict:
+    return {
+        'id': row['course_id'],
+        'code': row['course__code'],
+        'title': row['course__title'],
+        'weekday': row['course__weekday'],
+        'periods': mask_to_list(row['course__period_mask']),
+        'weeks': mask_to_list(row['course__week_mask']),
+        'week_mask': row['course__week_mask'],
+        'period_mask': row['course__period_mask'],
+    }
+
+
+def detect_schedule_conflicts(courses: List[Dict]) -> List[Dict]:
+    """Find overlapping course pairs by bucketing on (weekday, period).
+
+    Only courses sharing a bucket can clash, so the week-mask AND runs on a
+    handful of candidate pairs instead of every pair of the student's courses.
+    """
+    buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for idx, course in enumerate(courses):
+        for period in mask_to_list(course['period_mask']):
+            buckets[(course['weekday'], period)].append(idx)
+
+    pairs = set()
+    for members in buckets.values():
+        if len(members) > 1:
+            pairs.update(combinations(members, 2))
+
+    conflicts: List[Dict] = []
+    for left_idx, right_idx in sorted(pairs):
+        left, right = courses[left_idx], courses[right_idx]
+        shared_weeks = left['week_mask'] & right['week_mask']
+        if not shared_weeks:
+            continue
+        conflicts.append({
+            'type': 'schedule_conflict',
+            'course_ids': [left['id'], right['id']],
+            'codes': [left.get('code'), right.get('code')],
+            'titles': [left.get('title'), right.get('title')],
+            'weekday': left['weekday'],
+            'overlap_periods': mask_to_list(left['period_mask'] & right['period_mask']),
+            'overlap_weeks': mask_to_list(shared_weeks),
+        })
+    return conflicts
+
+
+def scan_student_courses(courses: List[Dict]) -> List[Dict]:
+    issues: List[Dict] = []
+    seen_codes: Dict[str, List[Dict]] = defaultdict(list)
+    scheduled_courses: List[Dict] = []
+
+    for course in courses:
+        code = course.get('code')
+        if code:
+            seen_codes[code].append(course)
+        if is_scheduled(course['weekday'], course['week_mask'], course['period_mask']):
+            scheduled_courses.append(course)
+
+    for code, items in seen_codes.items():
+        if len(items) > 1:
+            issues.append({
+                'type': 'duplicate_course_code',
+                'code': code,
+                'course_ids': [item['id'] for item in items],
+                'titles': list({item['title'] for item in items}),
+            })
+
+    issues.extend(detect_schedule_conflicts(scheduled_courses))
+    return issues
+
+
+def scan_enrollment_rows(rows: Iterable[Dict]) -> Iterator[Tuple[str, Dict]]:
+    """Yield ``(student_key, report_entry)`` for rows ordered by student."""
+    for student_pk, student_rows in groupby(rows, key=lambda row: row['student_id']):
+        student_rows = list(student_rows)
+        student_id = student_rows[0]['student__student_id']
+        courses = [serialize_course(row) for row in student_rows]
+        yield student_id or str(student_pk), {
+            'student_id': student_id,
+            'student_pk': student_pk,
+            'issues': scan_student_courses(courses),
+            'courses': courses,
+        }
+
+
+def _init_worker():
+    # Spawned workers start without an app registry; forked ones already have it.
+    django.setup()
 
-from accounts.models import CourseEnrollment
+
+def _scan_student_chunk(student_pks: Sequence[int]) -> List[Tuple[str, Dict]]:
+    rows = (
+        CourseEnrollment.objects
+        .filter(student_id__in=student_pks)
+        .order_by(*STUDENT_ORDER)
+        .values(*ENROLLMENT_FIELDS)
+    )
+    return list(scan_enrollment_rows(rows))
 
 
 class Command(BaseCommand):
@@ -18,24 +136,32 @@ class Command(BaseCommand):
             default='conflict_report.json',
             help='Optional path where the JSON report should be saved (default: conflict_report.json in the project root).',
         )
+        parser.add_argument(
+            '--format',
+            choices=('json', 'jsonl'),
+            default='json',
+            help='json writes a single report object; jsonl writes one student per line followed by an aggregates line.',
+        )
+        parser.add_argument('--workers', type=int, default=1, help='Number of processes to partition students across (default: 1).')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Students per worker task when --workers > 1 (default: 1000).')
 
     def handle(self, *args, **options):
-        report = self.build_conflict_report()
-        issues = sum(len(student_info['issues']) for student_info in report['students'].values())
-        duplicates = report['aggregates']['duplicate_pairs']
-        conflicts = report['aggregates']['conflict_pairs']
+        output_path = self.resolve_output_path(options['output'])
+        entries = self.iter_student_reports(max(options['workers'], 1), max(options['chunk_size'], 1))
+        with output_path.open('w', encoding='utf-8') as f:
+            if options['format'] == 'jsonl':
+                aggregates = self.write_jsonl(f, entries)
+            else:
+                aggregates = self.write_json(f, entries)
 
         self.stdout.write(self.style.SUCCESS(
-            f"Checked {report['aggregates']['student_count']} students, "
-            f"found {duplicates} duplicate course assignments and {conflicts} schedule conflicts."
+            f"Checked {aggregates['student_count']} students, "
+            f"found {aggregates['duplicate_pairs']} duplicate course assignments and {aggregates['conflict_pairs']} schedule conflicts."
         ))
 
-        if issues:
+        if aggregates['duplicate_pairs'] or aggregates['conflict_pairs']:
             self.stdout.write(self.style.WARNING('Detailed issues were found. See JSON report for specifics.'))
 
-        output_path = self.resolve_output_path(options['output'])
-        with output_path.open('w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
         self.stdout.write(self.style.SUCCESS(f'Report saved to {output_path}'))
 
     def resolve_output_path(self, output: str) -> Path:
@@ -44,101 +170,63 @@ class Command(BaseCommand):
             return path
         return Path.cwd() / path
 
-    def build_conflict_report(self) -> Dict:
-        students: Dict[str, Dict] = {}
-        duplicate_pairs = 0
-        conflict_pairs = 0
-
-        enrollments = (
-            CourseEnrollment.objects
-            .select_related('student__user', 'course')
-            .order_by('student__student_id', 'course__code')
+    def iter_student_reports(self, workers: int, chunk_size: int) -> Iterator[Tuple[str, Dict]]:
+        if workers == 1:
+            rows = (
+                CourseEnrollment.objects
+                .order_by(*STUDENT_ORDER)
+                .values(*ENROLLMENT_FIELDS)
+                .iterator(chunk_size=5000)
+            )
+            yield from scan_enrollment_rows(rows)
+            return
+
+        student_pks = list(
+            StudentProfile.objects
+            .filter(course_enrollments__isnull=False)
+            .distinct()
+            .order_by('student_id', 'pk')
+            .values_list('pk', flat=True)
         )
-
-        for enrollment in enrollments:
-            student = enrollment.student
-            course = enrollment.course
-            student_key = student.student_id or str(student.pk)
-
-            student_bucket = students.setdefault(student_key, {
-                'student_id': student.student_id,
-                'student_pk': student.pk,
-                'issues': [],
-                'courses': [],
-            })
-
-            student_bucket['courses'].append(self.serialize_course(course))
-
-        for student_data in students.values():
-            issues = self.scan_student_courses(student_data['courses'])
-            student_data['issues'] = issues
-            for issue in issues:
-                if issue['type'] == 'duplicate_course_code':
-                    duplicate_pairs += 1
-                if issue['type'] == 'schedule_conflict':
-                    conflict_pairs += 1
-
-        return {
-            'students': students,
-            'aggregates': {
-                'student_count': len(students),
-                'duplicate_pairs': duplicate_pairs,
-                'conflict_pairs': conflict_pairs,
-            }
-        }
-
-    def scan_student_courses(self, courses: List[Dict]) -> List[Dict]:
-        issues: List[Dict] = []
-        seen_codes: Dict[str, List[Dict]] = defaultdict(list)
-        scheduled_courses: List[Dict] = []
-
-        for course in courses:
-            code = course.get('code')
-            if code:
-                seen_codes[code].append(course)
-            if course['weekday'] not in (-1, None) and course['periods'] and course['weeks']:
-                scheduled_courses.append(course)
-
-        for code, items in seen_codes.items():
-            if len(items) > 1:
-                issues.append({
-                    'type': 'duplicate_course_code',
-                    'code': code,
-                    'course_ids': [item['id'] for item in items],
-                    'titles': list({item['title'] for item in items}),
-                })
-
-        conflicts = self.detect_schedule_conflicts(scheduled_courses)
-        issues.extend(conflicts)
-        return issues
-
-    def detect_schedule_conflicts(self, courses: List[Dict]) -> List[Dict]:
-        conflicts: List[Dict] = []
-        for idx, left in enumerate(courses):
-            for right in courses[idx + 1:]:
-                if left['weekday'] != right['weekday']:
-                    continue
-                if not set(left['weeks']).intersection(right['weeks']):
-                    continue
-                if not set(left['periods']).intersection(right['periods']):
-                    continue
-                conflicts.append({
-                    'type': 'schedule_conflict',
-                    'course_ids': [left['id'], right['id']],
-                    'codes': [left.get('code'), right.get('code')],
-                    'titles': [left.get('title'), right.get('title')],
-                    'weekday': left['weekday'],
-                    'overlap_periods': sorted(set(left['periods']).intersection(right['periods'])),
-                    'overlap_weeks': sorted(set(left['weeks']).intersection(right['weeks'])),
-                })
-        return conflicts
-
-    def serialize_course(self, course) -> Dict:
-        return {
-            'id': course.id,
-            'code': course.code,
-            'title': course.title,
-            'weekday': course.weekday,
-            'periods': list(course.periods or []),
-            'weeks': list(course.weeks or []),
-        }
+        chunks = [student_pks[i:i + chunk_size] for i in range(0, len(student_pks), chunk_size)]
+        # Children must open their own connections rather than share the parent's socket.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for chunk_entries in pool.map(_scan_student_chunk, chunks):
+                yield from chunk_entries
+
+    def write_json(self, f, entries: Iterable[Tuple[str, Dict]]) -> Dict:
+        # Written one student at a time so the full report is never held in memory.
+        aggregates = self.empty_aggregates()
+        f.write('{\n  "students": {')
+        for position, (student_key, entry) in enumerate(entries):
+            self.count_issues(aggregates, entry)
+            f.write(',\n    ' if position else '\n    ')
+            f.write(json.dumps(student_key, ensure_ascii=False))
+            f.write(': ')
+            f.write(json.dumps(entry, ensure_ascii=False))
+        f.write('\n  },\n  "aggregates": ')
+        f.write(json.dumps(aggregates))
+        f.write('\n}\n')
+        return aggregates
+
+    def write_jsonl(self, f, entries: Iterable[Tuple[str, Dict]]) -> Dict:
+        aggregates = self.empty_aggregates()
+        for student_key, entry in entries:
+            self.count_issues(aggregates, entry)
+            f.write(json.dumps({'student_key': student_key, **entry}, ensure_ascii=False))
+            f.write('\n')
+        f.write(json.dumps({'aggregates': aggregates}))
+        f.write('\n')
+        return aggregates
+
+    def empty_aggregates(self) -> Dict:
+        return {'student_count': 0, 'duplicate_pairs': 0, 'conflict_pairs': 0}
+
+    def count_issues(self, aggregates: Dict, entry: Dict) -> None:
+        aggregates['student_count'] += 1
+        for issue in entry['issues']:
+            if issue['type'] == 'duplicate_course_code':
+                aggregates['duplicate_pairs'] += 1
+            if issue['type'] == 'schedule_conflict':
+                aggregates['conflict_pairs'] += 1
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.course_import import recover_stale_import_jobs
+
+
+class Command(BaseCommand):
+    help = "Resume (or fail) course import jobs left pending/running by a stopped or recycled worker."
+
+    def add_arguments(self, parser):
+        default = getattr(settings, 'COURSE_IMPORT_STALE_AFTER', 600)
+        parser.add_argument('--stale-after', type=int, default=default, help=f'Seconds without progress before a job counts as orphaned (default: {default})')
+        parser.add_argument('--fail', action='store_true', help='Mark orphaned jobs failed instead of re-running them')
+
+    def handle(self, *args, **options):
+        resumed, failed = recover_stale_import_jobs(max(options['stale_after'], 0), resume=not options['fail'])
+        self.stdout.write(self.style.SUCCESS(f'Resumed {resumed} and failed {failed} stale course import jobs.'))
@@ -1,30 +1,272 @@
 import json
 import os
 import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Iterable
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
+import django
 from django.core.management.base import BaseCommand
+from django.db import connections, transaction
 
 from accounts.models import Course, StudentProfile, CourseEnrollment, AcademicTerm
+from accounts.schedule import is_scheduled, mask_to_list
+from accounts.seeding import read_seed_records
+from activities.course_events import invalidate_all_busy_indexes
+
+COURSE_BATCH_SIZE = 1000
+ENROLLMENT_BATCH_SIZE = 5000
+STUDENT_CHUNK_SIZE = 2000
+
+
+class SeedCourse(NamedTuple):
+    """The slice of a Course needed for assignment; cheap to ship to worker processes."""
+    id: int
+    code: str
+    weekday: int
+    week_mask: int
+    period_mask: int
+    periods: Tuple[int, ...]
+
+
+def seed_course(course_id, code, weekday, week_mask_value, period_mask_value) -> SeedCourse:
+    return SeedCourse(course_id, code or '', weekday, week_mask_value, period_mask_value, tuple(mask_to_list(period_mask_value)))
+
+
+def course_seed_key(course_data: dict) -> tuple:
+    return (
+        course_data.get('code', ''),
+        course_data.get('title', ''),
+        course_data.get('teacher_id', ''),
+        course_data.get('location', ''),
+        course_data.get('term', ''),
+        tuple(sorted(course_data.get('weeks', []))),
+        course_data.get('weekday', -1),
+        tuple(sorted(course_data.get('periods', []))),
+        course_data.get('term_start_date', ''),
+    )
+
+
+def course_lookup_key(code, title, teacher_id, location, term, term_start_date, weekday) -> tuple:
+    return (code, title, teacher_id, location, term, str(term_start_date), int(weekday))
+
+
+def course_lookup_key_from_data(course_data: dict) -> tuple:
+    return course_lookup_key(
+        course_data.get('code', ''),
+        course_data.get('title', ''),
+        course_data.get('teacher_id', ''),
+        course_data.get('location', ''),
+        course_data.get('term', ''),
+        course_data.get('term_start_date', ''),
+        course_data.get('weekday', -1),
+    )
+
+
+def load_catalog(terms) -> Dict[tuple, SeedCourse]:
+    """Stored courses for ``terms`` keyed like the old get_or_create lookup (first match wins)."""
+    rows = Course.objects.filter(term__in=terms).order_by('pk').values_list(
+        'id', 'code', 'title', 'teacher_id', 'location', 'term', 'term_start_date', 'weekday', 'week_mask', 'period_mask'
+    )
+    catalog: Dict[tuple, SeedCourse] = {}
+    for course_id, code, title, teacher_id, location, term, term_start_date, weekday, weeks, periods in rows:
+        key = course_lookup_key(code, title, teacher_id, location, term, term_start_date, weekday)
+        catalog.setdefault(key, seed_course(course_id, code, weekday, weeks, periods))
+    return catalog
+
+
+def load_student_schedules() -> Dict[int, List[SeedCourse]]:
+    """Every student's current courses, read in one pass."""
+    schedules: Dict[int, List[SeedCourse]] = defaultdict(list)
+    rows = CourseEnrollment.objects.values_list(
+        'student_id', 'course_id', 'course__code', 'course__weekday', 'course__week_mask', 'course__period_mask'
+    )
+    for student_pk, course_id, code, weekday, weeks, periods in rows.iterator(chunk_size=5000):
+        schedules[student_pk].append(seed_course(course_id, code, weekday, weeks, periods))
+    return schedules
+
+
+class Timetable:
+    """Occupied teaching weeks per (weekday, period), so a clash test is a few mask ANDs."""
+
+    def __init__(self, courses=()):
+        self.slots: Dict[Tuple[int, int], int] = {}
+        for course in courses:
+            self.add(course)
+
+    def conflicts(self, course: SeedCourse) -> bool:
+        # Flexible or unscheduled courses cannot conflict because they have no fixed slot.
+        if not is_scheduled(course.weekday, course.week_mask, course.period_mask):
+            return False
+        slots = self.slots
+        return any(slots.get((course.weekday, period), 0) & course.week_mask for period in course.periods)
+
+    def add(self, course: SeedCourse) -> None:
+        for period in course.periods:
+            key = (course.weekday, period)
+            self.slots[key] = self.slots.get(key, 0) | course.week_mask
+
+
+def random_order(count: int, rng: random.Random) -> Iterator[int]:
+    """Lazily yield a uniform permutation of ``range(count)``.
+
+    A sparse Fisher-Yates shuffle: each draw costs O(1), so a student who fills
+    up after a handful of picks never pays for shuffling the whole catalog.
+    """
+    swapped: Dict[int, int] = {}
+    for i in range(count):
+        j = rng.randrange(i, count)
+        yield swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+
+
+_STATE: dict = {}
+
+
+def _init_assigner(state: dict, setup: bool = True) -> None:
+    global _STATE
+    if setup:
+        # Spawned workers start without an app registry; forked ones already have it.
+        django.setup()
+    _STATE = state
+
+
+def _assign_chunk(task) -> Tuple[List[Tuple[int, SeedCourse, Optional[str]]], dict, List[Tuple[str, str]]]:
+    """Pick courses for one chunk of students; returns (enrollment rows, stats, messages)."""
+    chunk_index, students, seed = task
+    rng = random.Random(None if seed is None else seed + chunk_index)
+    pool = _STATE['pool']
+    rows: List[Tuple[int, SeedCourse, Optional[str]]] = []
+    stats = {'specific': 0, 'manual': 0, 'random': 0}
+    messages: List[Tuple[str, str]] = []
+
+    for student_pk, sid, existing_courses in students:
+        timetable = Timetable(existing_courses)
+        existing_course_ids = {course.id for course in existing_courses}
+        existing_course_codes = {course.code for course in existing_courses if course.code}
+        label = f'StudentProfile({sid or student_pk})'
+
+        def enroll(course: SeedCourse) -> None:
+            rows.append((student_pk, course, sid))
+            timetable.add(course)
+            existing_course_ids.add(course.id)
+            if course.code:
+                existing_course_codes.add(course.code)
+
+        assigned_specific = False
+        for course in _STATE['specific'].get(sid, ()):
+            if course.id in existing_course_ids:
+                continue
+            if course.code and course.code in existing_course_codes:
+                continue
+            if timetable.conflicts(course):
+                continue
+            enroll(course)
+            assigned_specific = True
+
+        for code in _STATE['manual'].get(sid, ()):
+            candidates = _STATE['by_code'].get(code, [])
+            if not candidates:
+                messages.append(('warning', f'Manual assignment: course code {code} not found for student {sid}'))
+                continue
+
+            assigned = False
+            for course in candidates:
+                if course.id in existing_course_ids:
+                    assigned = True
+                    break
+                if timetable.conflicts(course):
+                    continue
+                enroll(course)
+                stats['manual'] += 1
+                assigned_specific = True
+                assigned = True
+                break
+
+            if not assigned:
+                messages.append(('warning', (
+                    f'Manual assignment: unable to assign course {code} to student {sid} due to conflicts or pre-existing enrollment'
+                )))
+
+        if assigned_specific:
+            stats['specific'] += 1
+            continue
+
+        if _STATE['skip_existing'] and existing_courses:
+            messages.append(('info', f'Skipping {label} - already has {len(existing_courses)} course enrollments'))
+            continue
+
+        if not pool:
+            continue
+        num_courses = rng.randint(_STATE['random_min'], _STATE['random_max'])
+        selected = 0
+        for index in random_order(len(pool), rng):
+            if selected >= num_courses:
+                break
+            course = pool[index]
+            if course.code and course.code in existing_course_codes:
+                continue
+            if timetable.conflicts(course):
+                continue
+            enroll(course)
+            selected += 1
+
+        if selected:
+            stats['random'] += 1
+            messages.append(('info', f'Assigned {selected} random non-conflicting courses to {label}'))
+
+    return rows, stats, messages
+
+
+class EnrollmentWriter:
+    """Buffers enrollment rows and writes them with bulk_create(ignore_conflicts=True)."""
+
+    def __init__(self, batch_size: int = ENROLLMENT_BATCH_SIZE):
+        self.batch_size = max(batch_size, 1)
+        self.pending: List[CourseEnrollment] = []
+        self.written = 0
+
+    def add(self, rows) -> None:
+        for student_pk, course, sid in rows:
+            self.pending.append(CourseEnrollment(
+                course_id=course.id,
+                student_id=student_pk,
+                external_course_code=course.code or None,
+                external_student_id=sid or None,
+            ))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        with transaction.atomic():
+            CourseEnrollment.objects.bulk_create(self.pending, ignore_conflicts=True)
+        self.written += len(self.pending)
+        self.pending = []
 
 
 class Command(BaseCommand):
     help = "Seed courses from backend/accounts/seed_data/courses.json, create academic terms from course data, and enroll students."
 
     def add_arguments(self, parser):
-        parser.add_argument('--file', type=str, default=None, help='JSON file path (defaults to backend/accounts/seed_data/courses.json)')
+        parser.add_argument('--file', type=str, default=None, help='JSON or JSONL file path, or - to read stdin (defaults to backend/accounts/seed_data/courses.json)')
         parser.add_argument('--random-min', type=int, default=5, help='Min random courses for students without specific courses')
         parser.add_argument('--random-max', type=int, default=10, help='Max random courses for students without specific courses')
         parser.add_argument('--skip-existing', action='store_true', default=True, help='Skip students who already have course enrollments (default: True)')
         parser.add_argument('--clear-enrollments', action='store_true', help='Delete all existing course enrollments before seeding')
+        parser.add_argument('--workers', type=int, default=1, help='Processes used to pick courses for student chunks (default: 1)')
+        parser.add_argument('--chunk-size', type=int, default=STUDENT_CHUNK_SIZE, help=f'Students per assignment chunk (default: {STUDENT_CHUNK_SIZE})')
+        parser.add_argument('--batch-size', type=int, default=ENROLLMENT_BATCH_SIZE, help=f'Enrollments per bulk insert (default: {ENROLLMENT_BATCH_SIZE})')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed; results are identical for any --workers value')
 
     def handle(self, *args, **options):
         seed_dir = Path(__file__).resolve().parents[2] / 'seed_data'
         default_json = seed_dir / 'courses.json'
         json_path = Path(options['file']) if options['file'] else default_json
-        if not json_path.exists():
+        if options['file'] != '-' and not json_path.exists():
             self.stderr.write(self.style.ERROR(f'JSON not found: {json_path}'))
             return
         random_min = options['random_min']
@@ -36,8 +278,7 @@ class Command(BaseCommand):
             deleted = CourseEnrollment.objects.all().delete()
             self.stdout.write(self.style.WARNING(f'Cleared existing course enrollments (deleted {deleted[0]} records)'))
 
-        with json_path.open('r', encoding='utf-8') as f:
-            courses_data = json.load(f)
+        courses_data = read_seed_records(options['file'] if options['file'] == '-' else str(json_path))
 
         manual_assignments_path = seed_dir / 'student_courses.json'
         manual_course_codes: dict[str, list[str]] = {}
@@ -107,233 +348,139 @@ class Command(BaseCommand):
         if created_terms_count > 0:
             self.stdout.write(self.style.SUCCESS(f'Created {created_terms_count} academic terms from course data'))
 
-        # Group courses by student_id
-        courses_by_student = {}
-        all_courses = []
+        # Index the catalog by course key (dict lookups instead of scanning a list per row)
+        courses_by_student: dict[str, list[tuple]] = defaultdict(list)
+        catalog_data: dict[tuple, dict] = {}
         for course_data in courses_data:
+            course_key = course_seed_key(course_data)
             student_id = course_data.get('student_id')
             if student_id:
-                if student_id not in courses_by_student:
-                    courses_by_student[student_id] = []
-                courses_by_student[student_id].append(course_data)
-            # Also collect all unique courses
-            course_key = (
-                course_data.get('code', ''),
-                course_data.get('title', ''),
-                course_data.get('teacher_id', ''),
-                course_data.get('location', ''),
-                course_data.get('term', ''),
-                tuple(sorted(course_data.get('weeks', []))),
-                course_data.get('weekday', -1),
-                tuple(sorted(course_data.get('periods', []))),
-                course_data.get('term_start_date', ''),
-            )
-            if course_key not in [c[0] for c in all_courses]:
-                all_courses.append((course_key, course_data))
-
-        # Create courses
-        course_objects = {}
-        courses_by_code: dict[str, list[Course]] = {}
-        for course_key, course_data in all_courses:
-            periods = course_data.get('periods', [])
-            course, created = Course.objects.get_or_create(
-                code=course_data.get('code', ''),
-                title=course_data.get('title', ''),
-                teacher_id=course_data.get('teacher_id', ''),
-                location=course_data.get('location', ''),
-                term=course_data.get('term', ''),
-                term_start_date=course_data.get('term_start_date', ''),
-                weekday=course_data.get('weekday', -1),
-                defaults={
-                    'weeks': course_data.get('weeks', []),
-                    'periods': periods,
-                    'credits': course_data.get('credits', ''),
-                    'department_name': course_data.get('department_name', ''),
-                    'category': course_data.get('category', ''),
-                    'nature': course_data.get('nature', ''),
-                    'teaching_mode': course_data.get('teaching_mode', ''),
-                    'exam_type': course_data.get('exam_type', ''),
-                    'grading_method': course_data.get('grading_method', ''),
-                    'hours_per_week': course_data.get('hours_per_week', ''),
-                    'total_course_hours': course_data.get('total_course_hours', ''),
-                    'enrolled_students': course_data.get('enrolled_students', ''),
-                    'class_students': course_data.get('class_students', ''),
-                    'capacity': course_data.get('capacity', 0),
-                    'campus_name': course_data.get('campus_name', ''),
-                    'majors': course_data.get('majors', ''),
-                    'grades': course_data.get('grades', ''),
-                    'audience': course_data.get('audience', ''),
-                    'course_type_detail': course_data.get('course_type_detail', ''),
-                }
-            )
-            course_objects[course_key] = course
-            if course.code:
-                courses_by_code.setdefault(course.code, []).append(course)
-            if created:
-                self.stdout.write(f'Created course: {course}')
-
-        def has_schedule_conflict(existing_courses: Iterable[Course], candidate: Course) -> bool:
-            """Return True when the candidate course overlaps with an existing course."""
-
-            # Flexible or unscheduled courses cannot conflict because they have no fixed slot.
-            if candidate.weekday in (-1, None):
-                return False
-
-            candidate_weeks = set(candidate.weeks or [])
-            candidate_periods = set(candidate.periods or [])
-            if not candidate_weeks or not candidate_periods:
-                return False
-
-            for existing in existing_courses:
-                if existing.weekday in (-1, None):
-                    continue
-
-                if existing.weekday != candidate.weekday:
-                    continue
-
-                existing_weeks = set(existing.weeks or [])
-                existing_periods = set(existing.periods or [])
-
-                if not existing_weeks or not existing_periods:
-                    continue
-
-                # Conflict only if weeks overlap *and* periods overlap.
-                if candidate_weeks.intersection(existing_weeks) and candidate_periods.intersection(existing_periods):
-                    return True
+                courses_by_student[student_id].append(course_key)
+            catalog_data.setdefault(course_key, course_data)
 
-            return False
-
-        def enroll_student_in_course(student: StudentProfile, course: Course) -> None:
-            CourseEnrollment.objects.update_or_create(
-                course=course,
-                student=student,
-                defaults={
-                    'external_course_code': course.code or None,
-                    'external_student_id': student.student_id or None,
-                }
-            )
+        course_objects, created_count = self.create_catalog(catalog_data)
+        if created_count:
+            self.stdout.write(f'Created {created_count} new courses')
 
-        # Enroll students
-        students = StudentProfile.objects.all()
-        enrolled_students = set()
-        random_assignments = 0
-        manual_assignments = 0
-
-        for student in students:
-            sid = student.student_id
-            existing_enrollments = list(student.course_enrollments.select_related('course'))
-            existing_courses = [enrollment.course for enrollment in existing_enrollments]
-            existing_course_ids = {course.id for course in existing_courses}
-            existing_course_codes = {course.code for course in existing_courses if course.code}
-
-            assigned_specific = False
-
-            if sid in courses_by_student:
-                for course_data in courses_by_student[sid]:
-                    course_key = (
-                        course_data.get('code', ''),
-                        course_data.get('title', ''),
-                        course_data.get('teacher_id', ''),
-                        course_data.get('location', ''),
-                        course_data.get('term', ''),
-                        tuple(sorted(course_data.get('weeks', []))),
-                        course_data.get('weekday', -1),
-                        tuple(sorted(course_data.get('periods', []))),
-                        course_data.get('term_start_date', ''),
-                    )
-                    course = course_objects.get(course_key)
-                    if not course:
-                        continue
-                    if course.id in existing_course_ids:
-                        continue
-                    if course.code and course.code in existing_course_codes:
-                        continue
-                    if has_schedule_conflict(existing_courses, course):
-                        continue
-
-                    enroll_student_in_course(student, course)
-                    existing_courses.append(course)
-                    existing_course_ids.add(course.id)
-                    if course.code:
-                        existing_course_codes.add(course.code)
-                    assigned_specific = True
-
-            manual_codes = manual_course_codes.get(sid, [])
-            for code in manual_codes:
-                candidates = courses_by_code.get(code, [])
-                if not candidates:
-                    self.stderr.write(self.style.WARNING(f'Manual assignment: course code {code} not found for student {sid}'))
-                    continue
-
-                assigned = False
-                for course in candidates:
-                    if course.id in existing_course_ids:
-                        assigned = True
-                        break
-                    if has_schedule_conflict(existing_courses, course):
-                        continue
-                    enroll_student_in_course(student, course)
-                    existing_courses.append(course)
-                    existing_course_ids.add(course.id)
-                    if course.code:
-                        existing_course_codes.add(course.code)
-                    manual_assignments += 1
-                    assigned_specific = True
-                    assigned = True
-                    break
-
-                if not assigned:
-                    self.stderr.write(self.style.WARNING(
-                        f'Manual assignment: unable to assign course {code} to student {sid} due to conflicts or pre-existing enrollment'
-                    ))
-
-            if assigned_specific:
-                enrolled_students.add(sid)
-                continue
-
-            if skip_existing and existing_enrollments:
-                self.stdout.write(f'Skipping {student} - already has {len(existing_enrollments)} course enrollments')
-                continue
-
-            num_courses = random.randint(random_min, random_max)
-            available_courses = list(course_objects.values())
-
-            if not available_courses:
-                continue
-
-            random.shuffle(available_courses)
-            selected_courses: list[Course] = []
-            selected_codes: set[str] = set()
-
-            for course in available_courses:
-                if len(selected_courses) >= num_courses:
-                    break
-                if course.code:
-                    if course.code in existing_course_codes or course.code in selected_codes:
-                        continue
-                if has_schedule_conflict(existing_courses, course) or has_schedule_conflict(selected_courses, course):
-                    continue
-                selected_courses.append(course)
-                existing_courses.append(course)
-                if course.code:
-                    selected_codes.add(course.code)
-                    existing_course_codes.add(course.code)
-
-            if selected_courses:
-                for course in selected_courses:
-                    enroll_student_in_course(student, course)
-                random_assignments += 1
-                self.stdout.write(
-                    f'Assigned {len(selected_courses)} random non-conflicting courses to {student}'
-                )
+        unique_courses = list({course.id: course for course in course_objects.values()}.values())
+        courses_by_code: dict[str, list[SeedCourse]] = defaultdict(list)
+        for course in unique_courses:
+            if course.code:
+                courses_by_code[course.code].append(course)
+
+        state = {
+            'pool': unique_courses,
+            'by_code': dict(courses_by_code),
+            'specific': {
+                sid: [course_objects[key] for key in keys if key in course_objects]
+                for sid, keys in courses_by_student.items()
+            },
+            'manual': manual_course_codes,
+            'random_min': random_min,
+            'random_max': random_max,
+            'skip_existing': skip_existing,
+        }
+
+        # Enroll students: existing enrollments are loaded once, assignment runs in memory
+        students = list(StudentProfile.objects.order_by('pk').values_list('pk', 'student_id'))
+        existing = load_student_schedules()
+        chunk_size = max(options['chunk_size'], 1)
+        seed = options['seed']
+        tasks = [
+            (index, [(pk, sid, existing.get(pk, [])) for pk, sid in students[start:start + chunk_size]], seed)
+            for index, start in enumerate(range(0, len(students), chunk_size))
+        ]
+
+        totals = {'specific': 0, 'manual': 0, 'random': 0, 'enrollments': 0}
+        writer = EnrollmentWriter(options['batch_size'])
+        for rows, stats, messages in self.run_assignments(state, tasks, max(options['workers'], 1)):
+            for key in ('specific', 'manual', 'random'):
+                totals[key] += stats[key]
+            for level, message in messages:
+                if level == 'warning':
+                    self.stderr.write(self.style.WARNING(message))
+                elif options['verbosity'] > 1:
+                    self.stdout.write(message)
+            writer.add(rows)
+        writer.flush()
+        if writer.written:
+            # bulk_create skips the post_save hooks that normally drop cached schedules.
+            invalidate_all_busy_indexes()
 
         self.stdout.write(self.style.SUCCESS(
             'Seeding courses done. Created {course_count} courses, enrolled {specific_count} students with specific courses/manual codes '
             '({manual_count} manual assignments applied), assigned random courses to {random_count} students.'
             .format(
                 course_count=len(course_objects),
-                specific_count=len(enrolled_students),
-                manual_count=manual_assignments,
-                random_count=random_assignments,
+                specific_count=totals['specific'],
+                manual_count=totals['manual'],
+                random_count=totals['random'],
+            )
+        ))
+
+    def create_catalog(self, catalog_data: dict[tuple, dict]) -> tuple[dict[tuple, 'SeedCourse'], int]:
+        """Resolve every catalog entry to a stored course, bulk-creating the missing ones.
+
+        Courses are matched on the same fields the per-row get_or_create used, so
+        re-running the seed never duplicates a course.
+        """
+        terms = {course_data.get('term', '') for course_data in catalog_data.values()}
+        stored = load_catalog(terms)
+        pending: dict[tuple, Course] = {}
+        for course_data in catalog_data.values():
+            key = course_lookup_key_from_data(course_data)
+            if key in stored or key in pending:
+                continue
+            course = Course(
+                code=course_data.get('code', ''),
+                title=course_data.get('title', ''),
+                teacher_id=course_data.get('teacher_id', ''),
+                location=course_data.get('location', ''),
+                term=course_data.get('term', ''),
+                term_start_date=course_data.get('term_start_date', ''),
+                weekday=course_data.get('weekday', -1),
+                weeks=course_data.get('weeks', []),
+                periods=course_data.get('periods', []),
+                credits=course_data.get('credits', ''),
+                department_name=course_data.get('department_name', ''),
+                category=course_data.get('category', ''),
+                nature=course_data.get('nature', ''),
+                teaching_mode=course_data.get('teaching_mode', ''),
+                exam_type=course_data.get('exam_type', ''),
+                grading_method=course_data.get('grading_method', ''),
+                hours_per_week=course_data.get('hours_per_week', ''),
+                total_course_hours=course_data.get('total_course_hours', ''),
+                enrolled_students=course_data.get('enrolled_students', ''),
+                class_students=course_data.get('class_students', ''),
+                capacity=course_data.get('capacity', 0),
+                campus_name=course_data.get('campus_name', ''),
+                majors=course_data.get('majors', ''),
+                grades=course_data.get('grades', ''),
+                audience=course_data.get('audience', ''),
+                course_type_detail=course_data.get('course_type_detail', ''),
             )
-        ))
\ No newline at end of file
+            course.refresh_schedule_masks()
+            pending[key] = course
+
+        if pending:
+            with transaction.atomic():
+                Course.objects.bulk_create(pending.values(), batch_size=COURSE_BATCH_SIZE)
+            # Re-read rather than trust bulk_create pks, which MySQL does not return.
+            stored = load_catalog(terms)
+
+        course_objects = {
+            course_key: stored[course_lookup_key_from_data(course_data)]
+            for course_key, course_data in catalog_data.items()
+            if course_lookup_key_from_data(course_data) in stored
+        }
+        return course_objects, len(pending)
+
+    def run_assignments(self, state: dict, tasks: list, workers: int) -> Iterator[tuple]:
+        if workers == 1 or len(tasks) <= 1:
+            _init_assigner(state, setup=False)
+            yield from map(_assign_chunk, tasks)
+            return
+        # Workers only compute assignments; all writes stay in this process.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_assigner, initargs=(state,)) as pool:
+            yield from pool.map(_assign_chunk, tasks)
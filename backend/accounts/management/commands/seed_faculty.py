@@ -1,4 +1,3 @@
-import json
 import os
 from pathlib import Path
 from datetime import datetime
@@ -7,29 +6,73 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
 
 from accounts.models import FacultyProfile
+from accounts.seeding import SEED_BATCH_SIZE, bulk_seed_profiles, read_seed_records
 from accounts.utils import to_key, gender_key
 
 DEFAULT_PASSWORD = os.getenv('DEFAULT_FACULTY_PASSWORD', '000000')
 DEFAULT_PASSWORD_HASH = make_password(DEFAULT_PASSWORD)
+# Updated on existing profiles even when the incoming value is empty, as in the per-record path
+ALWAYS_SYNC_FIELDS = ('faculty_id', 'birth_date', 'is_external', 'is_main_lecturer')
+
+
+def faculty_seed_record(faculty):
+    """Translate one faculty.json entry into a ``bulk_seed_profiles`` record (None if it has no id)."""
+    fid = faculty.get('id')
+    if not fid:
+        return None
+    birth_date = faculty.get('birth_date', '')
+    parsed_birth_date = None
+    if birth_date and birth_date != '无':
+        try:
+            parsed_birth_date = datetime.strptime(birth_date, '%Y-%m-%d').date()
+        except ValueError:
+            parsed_birth_date = None
+    name = faculty.get('name', '')
+    return {
+        'username': str(fid),
+        'first_name': name,
+        'profile': {
+            'faculty_id': fid,
+            'name': name,
+            'gender': gender_key(faculty.get('gender', '')),
+            'department': faculty.get('department', ''),
+            'position': faculty.get('position', ''),
+            'title_level': faculty.get('title_level', ''),
+            'title': faculty.get('title', ''),
+            'staff_type': faculty.get('staff_type', ''),
+            'birth_date': parsed_birth_date,
+            'is_external': faculty.get('is_external', '').lower() in ('是', 'yes', 'true'),
+            'is_main_lecturer': faculty.get('is_main_lecturer', '').lower() in ('主讲', 'yes', 'true'),
+        },
+    }
 
 
 class Command(BaseCommand):
     help = "Seed faculty from backend/accounts/seed_data/faculty.json. Default password '000000' for all."
 
     def add_arguments(self, parser):
-        parser.add_argument('--file', type=str, default=None, help='JSON file path (defaults to backend/accounts/seed_data/faculty.json)')
+        parser.add_argument('--file', type=str, default=None, help='JSON or JSONL file path, or - to read stdin (defaults to backend/accounts/seed_data/faculty.json)')
+        parser.add_argument('--bulk', action='store_true', help='Create/update accounts with batched bulk queries (for large imports)')
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE, help=f'Rows per bulk batch (default: {SEED_BATCH_SIZE})')
 
     def handle(self, *args, **options):
         seed_dir = Path(__file__).resolve().parents[2] / 'seed_data'
         default_json = seed_dir / 'faculty.json'
         json_path = Path(options['file']) if options['file'] else default_json
-        if not json_path.exists():
+        if options['file'] != '-' and not json_path.exists():
             self.stderr.write(self.style.ERROR(f'JSON not found: {json_path}'))
             return
         created = 0
         updated = 0
-        with json_path.open('r', encoding='utf-8') as f:
-            faculty_list = json.load(f)
+        faculty_list = read_seed_records(options['file'] if options['file'] == '-' else str(json_path))
+        if options['bulk']:
+            records = [record for record in map(faculty_seed_record, faculty_list) if record]
+            created, updated = bulk_seed_profiles(
+                records, FacultyProfile, DEFAULT_PASSWORD_HASH,
+                always_sync=ALWAYS_SYNC_FIELDS, batch_size=max(options['batch_size'], 1),
+            )
+            self.stdout.write(self.style.SUCCESS(f'Seeding faculty done. Created: {created}, Updated: {updated}'))
+            return
         for faculty in faculty_list:
             fid = faculty.get('id')
             name = faculty.get('name', '')
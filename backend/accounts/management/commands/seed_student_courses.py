@@ -1,16 +1,52 @@
-import json
 from pathlib import Path
+from typing import Dict, Iterable, Set, Tuple
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models import Count
 
 from accounts.models import Course, StudentProfile, CourseEnrollment
+from accounts.seeding import chunks, read_seed_records
+from activities.course_events import invalidate_all_busy_indexes
+
+ENROLLMENT_BATCH_SIZE = 5000
+
+
+def load_students(student_ids: Iterable[str]) -> Dict[str, int]:
+    """Map student_id -> StudentProfile pk."""
+    found: Dict[str, int] = {}
+    for chunk in chunks(list(set(student_ids))):
+        found.update(StudentProfile.objects.filter(student_id__in=chunk).values_list('student_id', 'pk'))
+    return found
+
+
+def first_course_by_code(codes: Set[str]) -> Dict[str, Tuple[int, int]]:
+    """Map code -> (course id, capacity) of the first course with that code in catalog order."""
+    courses: Dict[str, Tuple[int, int]] = {}
+    for chunk in chunks(list(codes)):
+        rows = Course.objects.filter(code__in=chunk).order_by('term', 'code', 'title', 'pk').values_list('code', 'pk', 'capacity')
+        for code, course_id, capacity in rows:
+            courses.setdefault(code, (course_id, capacity))
+    return courses
+
+
+def load_existing_pairs(student_pks: Iterable[int], course_ids: list) -> Set[Tuple[int, int]]:
+    pairs: Set[Tuple[int, int]] = set()
+    if not course_ids:
+        return pairs
+    for chunk in chunks(list(set(student_pks))):
+        pairs.update(
+            CourseEnrollment.objects.filter(student_id__in=chunk, course_id__in=course_ids)
+            .values_list('course_id', 'student_id')
+        )
+    return pairs
 
 
 class Command(BaseCommand):
     help = "Seed student-course enrollments from backend/accounts/seed_data/student_courses.json"
 
     def add_arguments(self, parser):
-        parser.add_argument('--file', type=str, default=None, help='JSON file path (defaults to backend/accounts/seed_data/student_courses.json)')
+        parser.add_argument('--file', type=str, default=None, help='JSON or JSONL file path, or - to read stdin (defaults to backend/accounts/seed_data/student_courses.json)')
         parser.add_argument('--clear-existing', action='store_true', help='Clear existing enrollments before seeding')
 
     def handle(self, *args, **options):
@@ -18,68 +54,76 @@ class Command(BaseCommand):
         default_json = seed_dir / 'student_courses.json'
         json_path = Path(options['file']) if options['file'] else default_json
 
-        if not json_path.exists():
+        if options['file'] != '-' and not json_path.exists():
             self.stderr.write(self.style.ERROR(f'JSON not found: {json_path}'))
             return
 
-        with json_path.open('r', encoding='utf-8') as f:
-            student_course_data = json.load(f)
+        student_course_data = read_seed_records(options['file'] if options['file'] == '-' else str(json_path))
 
         if options['clear_existing']:
             self.stdout.write('Clearing existing course enrollments...')
             CourseEnrollment.objects.all().delete()
 
+        entries = []
+        for student_data in student_course_data:
+            student_id = student_data.get('student_id')
+            course_codes = student_data.get('courses', [])
+            if not student_id or not course_codes:
+                self.stderr.write(self.style.WARNING(f'Skipping invalid entry: {student_data}'))
+                continue
+            entries.append((student_id, course_codes))
+
+        # Everything the loop needs is preloaded; capacity is then tracked in memory.
+        students = load_students([student_id for student_id, _ in entries])
+        courses = first_course_by_code({code for _, codes in entries for code in codes})
+        course_ids = [course_id for course_id, _ in courses.values()]
+        enrollment_counts = dict(
+            CourseEnrollment.objects.filter(course_id__in=course_ids)
+            .values('course_id').annotate(total=Count('id')).values_list('course_id', 'total')
+        )
+        existing_pairs = load_existing_pairs(students.values(), course_ids)
+
         total_enrollments = 0
         processed_students = 0
+        pending: list[CourseEnrollment] = []
 
-        with transaction.atomic():
-            for student_data in student_course_data:
-                student_id = student_data.get('student_id')
-                course_codes = student_data.get('courses', [])
+        for student_id, course_codes in entries:
+            student_pk = students.get(student_id)
+            if student_pk is None:
+                self.stderr.write(self.style.WARNING(f'Student not found: {student_id}'))
+                continue
 
-                if not student_id or not course_codes:
-                    self.stderr.write(self.style.WARNING(f'Skipping invalid entry: {student_data}'))
+            enrolled_count = 0
+            for course_code in course_codes:
+                if course_code not in courses:
+                    self.stderr.write(self.style.WARNING(f'Course not found: {course_code} for student {student_id}'))
                     continue
+                # Enroll in the first course found with this code (may have multiple terms)
+                course_id, capacity = courses[course_code]
 
-                try:
-                    student = StudentProfile.objects.get(student_id=student_id)
-                except StudentProfile.DoesNotExist:
-                    self.stderr.write(self.style.WARNING(f'Student not found: {student_id}'))
+                current_enrollments = enrollment_counts.get(course_id, 0)
+                if capacity > 0 and current_enrollments >= capacity:
+                    self.stderr.write(self.style.WARNING(f'Course {course_code} is at capacity ({current_enrollments}/{capacity}) for student {student_id}'))
                     continue
 
-                enrolled_count = 0
-                for course_code in course_codes:
-                    try:
-                        # Get all courses with this code (may have multiple terms)
-                        courses = Course.objects.filter(code=course_code)
-                        if not courses.exists():
-                            self.stderr.write(self.style.WARNING(f'Course not found: {course_code} for student {student_id}'))
-                            continue
-                        
-                        # For now, enroll in the first course found with this code
-                        # In the future, we might want to filter by active term
-                        course = courses.first()
-                        
-                        # Check if course has reached capacity
-                        current_enrollments = CourseEnrollment.objects.filter(course=course).count()
-                        if course.capacity > 0 and current_enrollments >= course.capacity:
-                            self.stderr.write(self.style.WARNING(f'Course {course_code} is at capacity ({current_enrollments}/{course.capacity}) for student {student_id}'))
-                            continue
-                        
-                        enrollment, created = CourseEnrollment.objects.get_or_create(
-                            course=course,
-                            student=student
-                        )
-                        if created:
-                            enrolled_count += 1
-                            total_enrollments += 1
-                    except Exception as e:
-                        self.stderr.write(self.style.WARNING(f'Error enrolling student {student_id} in course {course_code}: {e}'))
-                        continue
-
-                if enrolled_count > 0:
-                    processed_students += 1
-                    self.stdout.write(f'Enrolled student {student_id} in {enrolled_count} courses')
+                if (course_id, student_pk) in existing_pairs:
+                    continue
+                existing_pairs.add((course_id, student_pk))
+                enrollment_counts[course_id] = current_enrollments + 1
+                pending.append(CourseEnrollment(course_id=course_id, student_id=student_pk))
+                enrolled_count += 1
+                total_enrollments += 1
+
+            if enrolled_count > 0:
+                processed_students += 1
+                self.stdout.write(f'Enrolled student {student_id} in {enrolled_count} courses')
+
+        for start in range(0, len(pending), ENROLLMENT_BATCH_SIZE):
+            with transaction.atomic():
+                CourseEnrollment.objects.bulk_create(pending[start:start + ENROLLMENT_BATCH_SIZE], ignore_conflicts=True)
+        if pending:
+            # bulk_create skips the post_save hooks that normally drop cached schedules.
+            invalidate_all_busy_indexes()
 
         self.stdout.write(self.style.SUCCESS(
             f'Seeding student-course enrollments done. '
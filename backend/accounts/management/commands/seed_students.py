@@ -1,4 +1,3 @@
-import json
 import os
 from pathlib import Path
 from django.core.management.base import BaseCommand
@@ -6,29 +5,67 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
 
 from accounts.models import StudentProfile
+from accounts.seeding import SEED_BATCH_SIZE, bulk_seed_profiles, read_seed_records
 from accounts.utils import to_key, gender_key
 
 DEFAULT_PASSWORD = os.getenv('DEFAULT_STUDENT_PASSWORD', '000000')
 DEFAULT_PASSWORD_HASH = make_password(DEFAULT_PASSWORD)
+# Updated on existing profiles even when the incoming value is empty, as in the per-record path
+ALWAYS_SYNC_FIELDS = ('student_id', 'year', 'chinese_level', 'country')
+
+
+def student_seed_record(student):
+    """Translate one students.json entry into a ``bulk_seed_profiles`` record (None if it has no id)."""
+    sid = student.get('id')
+    if not sid:
+        return None
+    try:
+        year = int(str(sid)[:4])
+    except Exception:
+        year = 1
+    return {
+        'username': str(sid),
+        'first_name': student.get('name', ''),
+        'profile': {
+            'student_id': sid,
+            'year': year,
+            'class_name': to_key(student.get('class', '')),
+            'major': student.get('major', ''),
+            'college': student.get('college', ''),
+            'chinese_level': student.get('chinese_level', 0),
+            'gender': gender_key(student.get('gender', '')),
+            'phone': student.get('phone', ''),
+            'country': student.get('country', ''),
+        },
+    }
 
 
 class Command(BaseCommand):
     help = "Seed students from backend/accounts/seed_data/students.json. Default password '000000' for all."
 
     def add_arguments(self, parser):
-        parser.add_argument('--file', type=str, default=None, help='JSON file path (defaults to backend/accounts/seed_data/students.json)')
+        parser.add_argument('--file', type=str, default=None, help='JSON or JSONL file path, or - to read stdin (defaults to backend/accounts/seed_data/students.json)')
+        parser.add_argument('--bulk', action='store_true', help='Create/update accounts with batched bulk queries (for large cohorts)')
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE, help=f'Rows per bulk batch (default: {SEED_BATCH_SIZE})')
 
     def handle(self, *args, **options):
         seed_dir = Path(__file__).resolve().parents[2] / 'seed_data'
         default_json = seed_dir / 'students.json'
         json_path = Path(options['file']) if options['file'] else default_json
-        if not json_path.exists():
+        if options['file'] != '-' and not json_path.exists():
             self.stderr.write(self.style.ERROR(f'JSON not found: {json_path}'))
             return
         created = 0
         updated = 0
-        with json_path.open('r', encoding='utf-8') as f:
-            students = json.load(f)
+        students = read_seed_records(options['file'] if options['file'] == '-' else str(json_path))
+        if options['bulk']:
+            records = [record for record in map(student_seed_record, students) if record]
+            created, updated = bulk_seed_profiles(
+                records, StudentProfile, DEFAULT_PASSWORD_HASH,
+                always_sync=ALWAYS_SYNC_FIELDS, batch_size=max(options['batch_size'], 1),
+            )
+            self.stdout.write(self.style.SUCCESS(f'Seeding students done. Created: {created}, Updated: {updated}'))
+            return
         for student in students:
             sid = student.get('id')
             name = student.get('name', '')
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:38
+
+from django.db import migrations, models
+
+from accounts.schedule import period_mask, week_mask
+
+
+def populate_schedule_masks(apps, schema_editor):
+    Course = apps.get_model('accounts', 'Course')
+    batch = []
+    for course in Course.objects.only('id', 'weeks', 'periods').iterator(chunk_size=2000):
+        course.week_mask = week_mask(course.weeks)
+        course.period_mask = period_mask(course.periods)
+        batch.append(course)
+        if len(batch) >= 2000:
+            Course.objects.bulk_update(batch, ['week_mask', 'period_mask'])
+            batch = []
+    if batch:
+        Course.objects.bulk_update(batch, ['week_mask', 'period_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_courseenrollment_external_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='period_mask',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='week_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_schedule_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_approved_activity_count(apps, schema_editor):
+    StudentProfile = apps.get_model('accounts', 'StudentProfile')
+    Participation = apps.get_model('activities', 'Participation')
+    approved = (
+        Participation.objects
+        .filter(student=OuterRef('pk'), status='approved')
+        .order_by()
+        .values('student')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    StudentProfile.objects.update(approved_activity_count=Coalesce(Subquery(approved), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0020_course_schedule_masks'),
+        ('activities', '0003_activity_countries_activity_location_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='approved_activity_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_approved_activity_count, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import Count, Q
+
+from .schedule import period_mask, week_mask
 
 
 def default_i18n():
@@ -8,6 +10,14 @@ def default_i18n():
     return {'zh': '', 'en': ''}
 
 
+class StudentProfileQuerySet(models.QuerySet):
+    def with_activity_counts(self):
+        """Annotate ``approved_participations`` so serializers avoid a COUNT per row."""
+        return self.annotate(
+            approved_participations=Count('participations', filter=Q(participations__status='approved'))
+        )
+
+
 class StudentProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='student_profile')
     student_id = models.CharField(max_length=32, unique=True, null=True, blank=True)
@@ -19,14 +29,20 @@ class StudentProfile(models.Model):
     gender = models.CharField(max_length=16, blank=True)
     phone = models.CharField(max_length=32, blank=True)
     country = models.CharField(max_length=120, blank=True)
+    # Denormalized number of approved participations, kept in sync by activities.signals
+    approved_activity_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = StudentProfileQuerySet.as_manager()
 
     def __str__(self):
         return f"StudentProfile({self.student_id or self.user.username})"
 
     @property
     def activities_participated(self):
-        from activities.models import Participation
-        return Participation.objects.filter(student=self, status='approved').count()
+        annotated = getattr(self, 'approved_participations', None)
+        if annotated is not None:
+            return annotated
+        return self.approved_activity_count
 
     @property
     def remaining_activity_slots(self):
@@ -86,6 +102,9 @@ class Course(models.Model):
     weekday = models.SmallIntegerField(default=-1, help_text="-1 = unscheduled, 1 = Monday, 7 = Sunday")
     periods = models.JSONField(default=list, blank=True, help_text="List of period numbers (1-13) when this course meets")
     weeks = models.JSONField(default=list, blank=True, help_text="List of week numbers when this course meets")
+    # Derived from weeks/periods on save (see accounts.schedule); used for conflict checks.
+    week_mask = models.BigIntegerField(default=0, editable=False)
+    period_mask = models.IntegerField(default=0, editable=False)
     credits = models.DecimalField(max_digits=4, decimal_places=1, default=0)
     department_name = models.CharField(max_length=120, blank=True)
     category = models.CharField(max_length=120, blank=True)
@@ -112,6 +131,18 @@ class Course(models.Model):
     def __str__(self):
         return f"Course({self.code or self.title})"
 
+    def refresh_schedule_masks(self):
+        """Recompute the bitmask columns; call before bulk_create/bulk_update."""
+        self.week_mask = week_mask(self.weeks)
+        self.period_mask = period_mask(self.periods)
+
+    def save(self, *args, **kwargs):
+        self.refresh_schedule_masks()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'weeks', 'periods'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'week_mask', 'period_mask'}
+        super().save(*args, **kwargs)
+
 
 class CourseEnrollment(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
@@ -167,3 +198,37 @@ class AcademicTerm(models.Model):
                 except (ValueError, IndexError):
                     pass
         super().save(*args, **kwargs)
+
+
+class CourseImportJob(models.Model):
+    """A streamed CSV/JSONL course upload processed in chunks off the request path."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    FORMAT_CHOICES = (
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    )
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending', db_index=True)
+    format = models.CharField(max_length=8, choices=FORMAT_CHOICES)
+    source_path = models.CharField(max_length=500, help_text="Spooled upload; removed once processed")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='course_import_jobs')
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="First row errors as {index, error, data}")
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"CourseImportJob({self.pk}, {self.format}, {self.status})"
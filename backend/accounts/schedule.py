@@ -0,0 +1,86 @@
+"""Bitmask encoding for course schedules.
+
+A weekly course slot is stored as three integers on ``Course``:
+
+* ``week_mask`` -- bit ``w - 1`` is set when the course meets in teaching week ``w``
+* ``weekday`` -- 1 (Mon) to 7 (Sun), -1 when unscheduled
+* ``period_mask`` -- bit ``p - 1`` is set when the course occupies period ``p``
+
+Two courses clash when they share a weekday and both their week and period
+masks AND to a non-zero value, so conflict checks never touch the JSON lists.
+"""
+from __future__ import annotations
+
+from typing import List, Sequence
+
+MAX_WEEK = 63  # week_mask is a signed 64-bit column
+MAX_PERIOD = 13
+
+
+def as_int_list(value: Sequence[int] | Sequence[str] | str | None) -> List[int]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        cleaned = value.replace("[", "").replace("]", "")
+        parts = [p.strip() for p in cleaned.split(",") if p.strip()]
+        ints: List[int] = []
+        for part in parts:
+            try:
+                ints.append(int(part))
+            except ValueError:
+                continue
+        return ints
+    ints = []
+    for item in value:
+        try:
+            ints.append(int(item))
+        except (TypeError, ValueError):
+            continue
+    return ints
+
+
+def _to_mask(values, upper: int) -> int:
+    mask = 0
+    for number in as_int_list(values):
+        if 1 <= number <= upper:
+            mask |= 1 << (number - 1)
+    return mask
+
+
+def week_mask(weeks) -> int:
+    return _to_mask(weeks, MAX_WEEK)
+
+
+def period_mask(periods) -> int:
+    return _to_mask(periods, MAX_PERIOD)
+
+
+def mask_to_list(mask: int) -> List[int]:
+    """Decode a mask back into its sorted 1-based numbers."""
+    numbers: List[int] = []
+    number = 1
+    while mask:
+        if mask & 1:
+            numbers.append(number)
+        mask >>= 1
+        number += 1
+    return numbers
+
+
+def is_scheduled(weekday: int | None, weeks: int, periods: int) -> bool:
+    return weekday not in (-1, None) and bool(weeks) and bool(periods)
+
+
+def slots_overlap(weekday_a: int | None, weeks_a: int, periods_a: int,
+                  weekday_b: int | None, weeks_b: int, periods_b: int) -> bool:
+    """True when two (weekday, week_mask, period_mask) slots meet at the same time."""
+    if not is_scheduled(weekday_a, weeks_a, periods_a) or weekday_a != weekday_b:
+        return False
+    return bool(weeks_a & weeks_b) and bool(periods_a & periods_b)
+
+
+def courses_overlap(left, right) -> bool:
+    return slots_overlap(
+        left.weekday, left.week_mask, left.period_mask,
+        right.weekday, right.week_mask, right.period_mask,
+    )
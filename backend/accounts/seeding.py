@@ -0,0 +1,130 @@
+"""Batched seeding helpers shared by the ``seed_*`` commands."""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Type
+
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+
+from .models import AccountMeta
+
+SEED_BATCH_SIZE = 1000
+# Keeps ``username__in`` / ``user_id__in`` lists under every backend's parameter limit.
+LOOKUP_CHUNK_SIZE = 900
+
+
+def chunks(items: Sequence, size: int = LOOKUP_CHUNK_SIZE) -> Iterable[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def read_seed_records(source: str) -> List[Dict]:
+    """Load seed records from a JSON array or JSONL file; ``-`` reads stdin.
+
+    Lets ``csv_to_json_*.py --output -`` pipe straight into a seed command.
+    """
+    text = sys.stdin.read() if source == '-' else Path(source).read_text(encoding='utf-8')
+    text = text.lstrip('\ufeff').strip()
+    if not text:
+        return []
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def existing_users(usernames: Sequence[str]) -> Dict[str, Tuple[int, str]]:
+    """Map username -> (user id, first_name) for the usernames that already exist."""
+    user_model = get_user_model()
+    found: Dict[str, Tuple[int, str]] = {}
+    for chunk in chunks(list(usernames), LOOKUP_CHUNK_SIZE):
+        rows = user_model.objects.filter(username__in=chunk).values_list('username', 'id', 'first_name')
+        found.update({username: (user_id, first_name) for username, user_id, first_name in rows})
+    return found
+
+
+def bulk_seed_profiles(
+    records: List[Dict],
+    profile_model: Type[models.Model],
+    password_hash: str,
+    always_sync: Iterable[str] = (),
+    batch_size: int = SEED_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """Create or refresh users with one profile each; returns ``(created, updated)``.
+
+    ``records`` are ``{'username', 'first_name', 'profile': {field: value}}``. New
+    users get ``password_hash`` (hashed once by the caller), a profile and an
+    AccountMeta, written with bulk_create in batches. Existing profiles follow the
+    per-record commands' rules: fields in ``always_sync`` are copied as-is, the rest
+    only when the incoming value is non-empty.
+    """
+    by_username = {record['username']: record for record in records}
+    known = existing_users(list(by_username))
+    created = _create_accounts(
+        [record for username, record in by_username.items() if username not in known],
+        profile_model, password_hash, batch_size,
+    )
+    updated = _refresh_accounts(
+        [(known[username], record) for username, record in by_username.items() if username in known],
+        profile_model, set(always_sync), batch_size,
+    )
+    return created, updated
+
+
+def _create_accounts(records: List[Dict], profile_model, password_hash: str, batch_size: int) -> int:
+    user_model = get_user_model()
+    for batch in chunks(records, batch_size):
+        with transaction.atomic():
+            user_model.objects.bulk_create([
+                user_model(username=record['username'], first_name=record['first_name'], password=password_hash)
+                for record in batch
+            ])
+            # MySQL does not hand back primary keys from bulk_create, so look them up.
+            ids = {username: user_id for username, (user_id, _) in existing_users([r['username'] for r in batch]).items()}
+            profile_model.objects.bulk_create([
+                profile_model(user_id=ids[record['username']], **record['profile'])
+                for record in batch
+            ])
+            AccountMeta.objects.bulk_create(
+                [AccountMeta(user_id=ids[record['username']]) for record in batch],
+                ignore_conflicts=True,
+            )
+    return len(records)
+
+
+def _refresh_accounts(pairs: List[Tuple[Tuple[int, str], Dict]], profile_model, always_sync: set, batch_size: int) -> int:
+    user_model = get_user_model()
+    profiles = {}
+    for chunk in chunks([user_id for (user_id, _), _ in pairs], LOOKUP_CHUNK_SIZE):
+        profiles.update({profile.user_id: profile for profile in profile_model.objects.filter(user_id__in=chunk)})
+
+    missing: List[models.Model] = []
+    changed_profiles: List[models.Model] = []
+    changed_fields = set()
+    renamed_users: List[models.Model] = []
+    for (user_id, first_name), record in pairs:
+        values = record['profile']
+        if not first_name and record['first_name']:
+            renamed_users.append(user_model(id=user_id, first_name=record['first_name']))
+        profile = profiles.get(user_id)
+        if profile is None:
+            missing.append(profile_model(user_id=user_id, **values))
+            continue
+        dirty = {
+            field for field, value in values.items()
+            if (field in always_sync or value) and getattr(profile, field) != value
+        }
+        if dirty:
+            for field in dirty:
+                setattr(profile, field, values[field])
+            changed_fields |= dirty
+            changed_profiles.append(profile)
+
+    with transaction.atomic():
+        profile_model.objects.bulk_create(missing, batch_size=batch_size)
+        if changed_profiles:
+            profile_model.objects.bulk_update(changed_profiles, sorted(changed_fields), batch_size=batch_size)
+        if renamed_users:
+            user_model.objects.bulk_update(renamed_users, ['first_name'], batch_size=batch_size)
+    return len(missing) + len(changed_profiles) + len(renamed_users)
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
+from django.db import models
 from rest_framework import serializers
 
-from .models import StudentProfile, AccountMeta, Course, CourseEnrollment, AcademicTerm, FacultyProfile
+from .models import StudentProfile, AccountMeta, Course, CourseEnrollment, AcademicTerm, FacultyProfile, CourseImportJob
+from .schedule import MAX_WEEK
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -68,6 +70,40 @@ class FacultyProfileSerializer(serializers.ModelSerializer):
         ]
 
 
+def active_term_starts(term=None) -> dict:
+    """Map term -> first_week_monday for active AcademicTerms (optionally just ``term``)."""
+    qs = AcademicTerm.objects.filter(is_active=True)
+    if term is not None:
+        qs = qs.filter(term=term)
+    return dict(qs.values_list('term', 'first_week_monday'))
+
+
+def resolve_teacher_names(teacher_ids) -> dict:
+    """Map faculty_id -> display name for every id in ``teacher_ids`` with one query."""
+    wanted = {teacher_id for teacher_id in teacher_ids if teacher_id}
+    if not wanted:
+        return {}
+    rows = FacultyProfile.objects.filter(faculty_id__in=wanted).values_list('faculty_id', 'name', 'user__first_name')
+    return {faculty_id: name or first_name for faculty_id, name, first_name in rows}
+
+
+def prime_teacher_names(context: dict, courses) -> None:
+    """Store the teacher names for ``courses`` in the serializer context's ``teacher_names`` map."""
+    names = context.setdefault('teacher_names', {})
+    missing = {course.teacher_id for course in courses if course.teacher_id and course.teacher_id not in names}
+    if missing:
+        found = resolve_teacher_names(missing)
+        # Unknown ids map to "" so they are not looked up again row by row.
+        names.update({teacher_id: found.get(teacher_id, "") for teacher_id in missing})
+
+
+class CourseListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        courses = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        prime_teacher_names(self.context, courses)
+        return super().to_representation(courses)
+
+
 class CourseSerializer(serializers.ModelSerializer):
     teacher_name = serializers.SerializerMethodField()
     teacher_faculty_id = serializers.CharField(source='teacher_id', read_only=True)
@@ -108,16 +144,17 @@ class CourseSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["created_at", "updated_at"]
+        list_serializer_class = CourseListSerializer
 
     def get_teacher_name(self, obj):
         """Get teacher name by looking up FacultyProfile with matching faculty_id"""
-        if obj.teacher_id:
-            try:
-                faculty = FacultyProfile.objects.get(faculty_id=obj.teacher_id)
-                return faculty.name or faculty.user.first_name
-            except FacultyProfile.DoesNotExist:
-                pass
-        return ""
+        if not obj.teacher_id:
+            return ""
+        names = self.context.get('teacher_names')
+        if names is None or obj.teacher_id not in names:
+            # Not primed by a list serializer (e.g. detail view); resolve just this one.
+            names = resolve_teacher_names([obj.teacher_id])
+        return names.get(obj.teacher_id, "")
 
     def validate_weeks(self, value):
         if value in (None, ""):
@@ -130,8 +167,8 @@ class CourseSerializer(serializers.ModelSerializer):
                 week = int(item)
             except (TypeError, ValueError):
                 raise serializers.ValidationError("Week entries must be integers")
-            if week < 1:
-                raise serializers.ValidationError("Week numbers must be >= 1")
+            if not 1 <= week <= MAX_WEEK:
+                raise serializers.ValidationError(f"Week numbers must be between 1 and {MAX_WEEK}")
             cleaned.append(week)
         return sorted(set(cleaned))
 
@@ -161,20 +198,30 @@ class CourseSerializer(serializers.ModelSerializer):
         term_start_date = attrs.get('term_start_date') or getattr(self.instance, 'term_start_date', None)
         
         if term and term_start_date:
-            try:
-                academic_term = AcademicTerm.objects.get(term=term, is_active=True)
-                if academic_term.first_week_monday != term_start_date:
-                    raise serializers.ValidationError({
-                        'term_start_date': f'Invalid week 1 Monday date for term {term}. Expected: {academic_term.first_week_monday}, got: {term_start_date}'
-                    })
-            except AcademicTerm.DoesNotExist:
+            # Bulk imports pass every active term's week 1 Monday in the context.
+            term_starts = self.context.get('academic_terms')
+            if term_starts is None:
+                term_starts = active_term_starts(term)
+            expected = term_starts.get(term)
+            if expected is None:
                 raise serializers.ValidationError({
                     'term': f'No active academic term configuration found for term: {term}. Please configure the term first.'
                 })
+            if expected != term_start_date:
+                raise serializers.ValidationError({
+                    'term_start_date': f'Invalid week 1 Monday date for term {term}. Expected: {expected}, got: {term_start_date}'
+                })
         
         return attrs
 
 
+class CourseEnrollmentListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        enrollments = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        prime_teacher_names(self.context, [enrollment.course for enrollment in enrollments])
+        return super().to_representation(enrollments)
+
+
 class CourseEnrollmentSerializer(serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.user.first_name', read_only=True)
     student_username = serializers.CharField(source='student.user.username', read_only=True)
@@ -194,6 +241,7 @@ class CourseEnrollmentSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['created_at', 'course_title', 'student_name', 'student_username']
+        list_serializer_class = CourseEnrollmentListSerializer
 
 
 class AcademicTermSerializer(serializers.ModelSerializer):
@@ -233,3 +281,24 @@ class AcademicTermSerializer(serializers.ModelSerializer):
                 })
         
         return attrs
+
+
+class CourseImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CourseImportJob
+        fields = [
+            "id",
+            "status",
+            "format",
+            "processed_rows",
+            "created_count",
+            "updated_count",
+            "unchanged_count",
+            "error_count",
+            "errors",
+            "message",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -5,7 +5,7 @@ from .serializers import StudentProfileSerializer, FacultyProfileSerializer
 
 
 class StudentProfileViewSet(viewsets.ModelViewSet):
-    queryset = StudentProfile.objects.select_related('user').all()
+    queryset = StudentProfile.objects.select_related('user__account_meta').with_activity_counts()
     serializer_class = StudentProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
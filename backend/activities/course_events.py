@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+import math
+import time as _time
+from array import array
+from bisect import bisect_right
 from datetime import date, datetime, time, timedelta
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 try:
     from zoneinfo import ZoneInfo
 except ImportError:  # Python < 3.9 fallback
     from backports.zoneinfo import ZoneInfo  # type: ignore[import]
 
+from django.core.cache import cache
 from django.utils import timezone
 
-from accounts.models import CourseEnrollment, StudentProfile
-from common.translation import ensure_en_zh
+from accounts.models import Course, CourseEnrollment, StudentProfile
+from accounts.schedule import as_int_list as _as_int_list, mask_to_list
+from common.caching import bounded_timeout
+from common.translation import lookup_en_zh_many
+from common.translation_queue import enqueue_texts
 
 # Standard course period timetable in 24h clock.
 PERIOD_TIME_RANGES: Dict[int, Tuple[time, time]] = {
@@ -34,28 +42,6 @@ PERIOD_TIME_RANGES: Dict[int, Tuple[time, time]] = {
 CAMPUS_TIME_ZONE = ZoneInfo("Asia/Shanghai")
 
 
-def _as_int_list(value: Sequence[int] | Sequence[str] | str | None) -> List[int]:
-    if value is None:
-        return []
-    if isinstance(value, str):
-        cleaned = value.replace("[", "").replace("]", "")
-        parts = [p.strip() for p in cleaned.split(",") if p.strip()]
-        ints: List[int] = []
-        for part in parts:
-            try:
-                ints.append(int(part))
-            except ValueError:
-                continue
-        return ints
-    ints = []
-    for item in value:
-        try:
-            ints.append(int(item))
-        except (TypeError, ValueError):
-            continue
-    return ints
-
-
 def _normalise_term_start(raw: object) -> date | None:
     if not raw:
         return None
@@ -72,24 +58,22 @@ def _normalise_term_start(raw: object) -> date | None:
     return None
 
 
-def _course_occurrences(course) -> Iterable[Tuple[str, datetime, datetime]]:
-    term_start = _normalise_term_start(getattr(course, "term_start_date", None))
-    weekday = getattr(course, "weekday", None)
+def _occurrence_bounds(term_start_raw: object, weekday: int | None, weeks_raw, periods_raw) -> Iterable[Tuple[datetime, datetime]]:
+    term_start = _normalise_term_start(term_start_raw)
     if not term_start or not weekday or weekday < 1:
-        return []
+        return
 
-    weeks = sorted(set(_as_int_list(getattr(course, "weeks", []))))
-    periods = sorted(set(_as_int_list(getattr(course, "periods", []))))
+    weeks = sorted(set(_as_int_list(weeks_raw)))
+    periods = sorted(set(_as_int_list(periods_raw)))
     if not weeks or not periods:
-        return []
+        return
 
     start_range = PERIOD_TIME_RANGES.get(periods[0])
     end_range = PERIOD_TIME_RANGES.get(periods[-1])
     if not start_range or not end_range:
-        return []
+        return
 
     tz = CAMPUS_TIME_ZONE
-    title = getattr(course, "title", None) or getattr(course, "code", None) or "Course"
 
     for week_number in weeks:
         if week_number < 1:
@@ -98,31 +82,53 @@ def _course_occurrences(course) -> Iterable[Tuple[str, datetime, datetime]]:
         # Ensure stored datetimes are aligned with the campus timetable timezone
         start_dt = datetime.combine(start_date, start_range[0])
         end_dt = datetime.combine(start_date, end_range[1])
-        yield title, timezone.make_aware(start_dt, tz), timezone.make_aware(end_dt, tz)
+        yield timezone.make_aware(start_dt, tz), timezone.make_aware(end_dt, tz)
 
 
-_TITLE_CACHE: Dict[str, Dict[str, str]] = {}
+def _course_title(course) -> str:
+    return getattr(course, "title", None) or getattr(course, "code", None) or "Course"
 
 
-def _course_title_i18n(raw_title: str) -> Dict[str, str]:
-    title = (raw_title or "").strip()
-    if not title:
-        return {'en': '', 'zh': ''}
-    cached = _TITLE_CACHE.get(title)
-    if cached:
-        return cached
-    translations = ensure_en_zh(title) or {}
-    en = translations.get('en') or title
-    zh = translations.get('zh') or title
-    result = {'en': en, 'zh': zh}
-    _TITLE_CACHE[title] = result
+def _course_occurrences(course) -> Iterable[Tuple[str, datetime, datetime]]:
+    title = _course_title(course)
+    bounds = _occurrence_bounds(
+        getattr(course, "term_start_date", None),
+        getattr(course, "weekday", None),
+        getattr(course, "weeks", []),
+        getattr(course, "periods", []),
+    )
+    for start_dt, end_dt in bounds:
+        yield title, start_dt, end_dt
+
+
+def _course_titles_i18n(raw_titles: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """Memoised translations for distinct course titles, never blocking on the network.
+
+    Unseen titles fall back to the source text and are queued for the
+    background translator, so the next request picks up the real values.
+    """
+    titles = list(dict.fromkeys((raw or "").strip() for raw in raw_titles))
+    result: Dict[str, Dict[str, str]] = {}
+    missing: List[str] = []
+    for title, translations in zip(titles, lookup_en_zh_many(titles)):
+        if translations is None:
+            missing.append(title)
+            translations = {}
+        result[title] = {'en': translations.get('en') or title, 'zh': translations.get('zh') or title}
+    if missing:
+        enqueue_texts(missing)
     return result
 
 
 def build_student_course_event_payloads(student: StudentProfile) -> List[Dict[str, object]]:
     """Return lightweight course events for the given student without persisting to the DB."""
 
-    enrollments = CourseEnrollment.objects.select_related("course").filter(student=student)
+    enrollments = [
+        enrollment
+        for enrollment in CourseEnrollment.objects.select_related("course").filter(student=student)
+        if enrollment.course
+    ]
+    titles_i18n = _course_titles_i18n(_course_title(enrollment.course) for enrollment in enrollments)
     payloads: List[Dict[str, object]] = []
     idx = 1
 
@@ -131,7 +137,7 @@ def build_student_course_event_payloads(student: StudentProfile) -> List[Dict[st
         if not course:
             continue
         for title, start_dt, end_dt in _course_occurrences(course):
-            title_i18n = _course_title_i18n(title)
+            title_i18n = titles_i18n[title.strip()]
             payloads.append(
                 {
                     "id": idx,
@@ -150,7 +156,12 @@ def build_student_course_event_payloads(student: StudentProfile) -> List[Dict[st
 def build_student_course_payloads(student: StudentProfile) -> List[Dict[str, object]]:
     """Return raw course scheduling metadata so clients can perform their own expansion."""
 
-    enrollments = CourseEnrollment.objects.select_related("course").filter(student=student)
+    enrollments = [
+        enrollment
+        for enrollment in CourseEnrollment.objects.select_related("course").filter(student=student)
+        if enrollment.course
+    ]
+    titles_i18n = _course_titles_i18n(_course_title(enrollment.course) for enrollment in enrollments)
     payloads: List[Dict[str, object]] = []
 
     for enrollment in enrollments:
@@ -159,11 +170,11 @@ def build_student_course_payloads(student: StudentProfile) -> List[Dict[str, obj
             continue
 
         term_start = _normalise_term_start(getattr(course, "term_start_date", None))
-        periods = sorted(set(_as_int_list(getattr(course, "periods", []))))
-        weeks = sorted(set(_as_int_list(getattr(course, "weeks", []))))
+        periods = mask_to_list(course.period_mask)
+        weeks = mask_to_list(course.week_mask)
 
-        title = getattr(course, "title", None) or getattr(course, "code", None) or "Course"
-        title_i18n = _course_title_i18n(title)
+        title = _course_title(course)
+        title_i18n = titles_i18n[title.strip()]
 
         payloads.append(
             {
@@ -187,10 +198,183 @@ def build_student_course_payloads(student: StudentProfile) -> List[Dict[str, obj
     return payloads
 
 
+def _as_aware(value: datetime) -> datetime:
+    if timezone.is_naive(value):
+        return timezone.make_aware(value)
+    return value
+
+
+def course_slot_mask(period_mask: int) -> int:
+    """Weekly slot bitmap for a course meeting on the periods in ``period_mask``.
+
+    Bit ``2 * (p - 1)`` is period ``p`` and bit ``2 * (p - 1) + 1`` is the break
+    that follows it, so a course occupies the contiguous run of bits from its
+    first to its last period -- the same span ``_occurrence_bounds`` produces.
+    """
+    if not period_mask:
+        return 0
+    low = 2 * ((period_mask & -period_mask).bit_length() - 1)
+    high = 2 * (period_mask.bit_length() - 1)
+    return ((1 << (high + 1)) - 1) ^ ((1 << low) - 1)
+
+
+def _day_slots(day: date) -> Iterable[Tuple[int, datetime, datetime]]:
+    tz = CAMPUS_TIME_ZONE
+    numbers = sorted(PERIOD_TIME_RANGES)
+    for pos, period in enumerate(numbers):
+        start, end = PERIOD_TIME_RANGES[period]
+        slot_start = timezone.make_aware(datetime.combine(day, start), tz)
+        slot_end = timezone.make_aware(datetime.combine(day, end), tz)
+        yield 2 * (period - 1), slot_start, slot_end
+        if pos + 1 < len(numbers):
+            next_start = PERIOD_TIME_RANGES[numbers[pos + 1]][0]
+            yield 2 * (period - 1) + 1, slot_end, timezone.make_aware(datetime.combine(day, next_start), tz)
+
+
+def activity_slot_masks(start: datetime, end: datetime) -> Dict[date, int]:
+    """Map each campus-local date touched by ``[start, end)`` to the slots it overlaps."""
+    start = _as_aware(start)
+    end = _as_aware(end)
+    masks: Dict[date, int] = {}
+    if end <= start:
+        return masks
+    day = start.astimezone(CAMPUS_TIME_ZONE).date()
+    last_day = end.astimezone(CAMPUS_TIME_ZONE).date()
+    while day <= last_day:
+        mask = 0
+        for bit, slot_start, slot_end in _day_slots(day):
+            if slot_start < end and slot_end > start:
+                mask |= 1 << bit
+        if mask:
+            masks[day] = mask
+        day += timedelta(days=1)
+    return masks
+
+
+def courses_conflicting_with(start: datetime, end: datetime) -> List[int]:
+    """IDs of courses with an occurrence overlapping ``[start, end)``.
+
+    Only courses meeting on the touched weekdays are loaded; each is then tested
+    with a single AND of its weekly slot mask against the activity's mask.
+    """
+    masks = activity_slot_masks(start, end)
+    if not masks:
+        return []
+    by_weekday: Dict[int, List[Tuple[date, int]]] = {}
+    for day, mask in masks.items():
+        by_weekday.setdefault(day.isoweekday(), []).append((day, mask))
+
+    rows = Course.objects.filter(weekday__in=list(by_weekday)).exclude(week_mask=0).values_list(
+        "id", "term_start_date", "weekday", "week_mask", "period_mask"
+    )
+    conflicting: List[int] = []
+    for course_id, term_start_raw, weekday, week_mask, period_mask in rows:
+        term_start = _normalise_term_start(term_start_raw)
+        slot_mask = course_slot_mask(period_mask)
+        if not term_start or not slot_mask:
+            continue
+        for day, mask in by_weekday[weekday]:
+            offset = (day - term_start).days - (weekday - 1)
+            if offset < 0 or offset % 7 or not (week_mask >> (offset // 7)) & 1:
+                continue
+            if slot_mask & mask:
+                conflicting.append(course_id)
+                break
+    return conflicting
+
+
+class BusyIntervalIndex:
+    """Sorted, non-overlapping busy intervals (epoch seconds) for one student.
+
+    Both arrays are ascending once intervals are merged, so an overlap query is a
+    single bisect on ``ends`` followed by one comparison against ``starts``.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: array, ends: array):
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Tuple[int, int]]) -> "BusyIntervalIndex":
+        starts = array("q")
+        ends = array("q")
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            # Touching intervals are merged too: overlap answers stay identical.
+            if ends and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+                continue
+            starts.append(start)
+            ends.append(end)
+        return cls(starts, ends)
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        start_ts = math.floor(_as_aware(start).timestamp())
+        end_ts = math.ceil(_as_aware(end).timestamp())
+        # First interval that finishes after the requested start.
+        idx = bisect_right(self.ends, start_ts)
+        return idx < len(self.starts) and self.starts[idx] < end_ts
+
+
+BUSY_INDEX_CACHE_PREFIX = "busy-index"
+BUSY_INDEX_GENERATION_KEY = f"{BUSY_INDEX_CACHE_PREFIX}:generation"
+BUSY_INDEX_TIMEOUT = 60 * 60 * 24
+
+
+def _busy_index_generation() -> int:
+    generation = cache.get(BUSY_INDEX_GENERATION_KEY)
+    if generation is None:
+        # A fresh timestamp orphans any entry written under an evicted generation.
+        cache.add(BUSY_INDEX_GENERATION_KEY, _time.time_ns(), None)
+        generation = cache.get(BUSY_INDEX_GENERATION_KEY)
+    return generation
+
+
+def _busy_index_key(student_id: int) -> str:
+    return f"{BUSY_INDEX_CACHE_PREFIX}:{_busy_index_generation()}:{student_id}"
+
+
+def build_student_busy_index(student: StudentProfile) -> BusyIntervalIndex:
+    """Expand the student's enrolled courses into a merged busy-interval index (one query)."""
+
+    rows = CourseEnrollment.objects.filter(student=student).values_list(
+        "course__term_start_date", "course__weekday", "course__week_mask", "course__period_mask"
+    )
+    intervals = []
+    for term_start, weekday, week_mask, period_mask in rows:
+        bounds = _occurrence_bounds(term_start, weekday, mask_to_list(week_mask), mask_to_list(period_mask))
+        for start_dt, end_dt in bounds:
+            intervals.append((int(start_dt.timestamp()), int(end_dt.timestamp())))
+    return BusyIntervalIndex.from_intervals(intervals)
+
+
+def get_student_busy_index(student: StudentProfile) -> BusyIntervalIndex:
+    """Return the cached busy-interval index for a student, building it on a miss."""
+
+    key = _busy_index_key(student.pk)
+    index = cache.get(key)
+    if index is None:
+        index = build_student_busy_index(student)
+        cache.set(key, index, bounded_timeout(BUSY_INDEX_TIMEOUT))
+    return index
+
+
+def invalidate_student_busy_index(student_id: int) -> None:
+    cache.delete(_busy_index_key(student_id))
+
+
+def invalidate_all_busy_indexes() -> None:
+    """Drop every cached index, e.g. after a course's schedule changed."""
+
+    cache.set(BUSY_INDEX_GENERATION_KEY, _time.time_ns(), None)
+
+
 def student_has_time_conflict(student: StudentProfile, start: datetime, end: datetime) -> bool:
-    for event in build_student_course_event_payloads(student):
-        event_start = datetime.fromisoformat(str(event["start_datetime"]))
-        event_end = datetime.fromisoformat(str(event["end_datetime"]))
-        if event_start < end and event_end > start:
-            return True
-    return False
\ No newline at end of file
+    return get_student_busy_index(student).overlaps(start, end)
@@ -1,11 +1,16 @@
+from __future__ import annotations
+
 from datetime import timedelta
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
+from django.db.models import Count, Q, QuerySet
 from django.utils import timezone
 
 from accounts.models import StudentProfile
 from .models import Activity, Participation
-from .course_events import student_has_time_conflict
+from .course_events import courses_conflicting_with, get_student_busy_index, student_has_time_conflict
+
+MAX_ACTIVITIES_PER_YEAR = 7
 
 
 def check_time_conflict(student: StudentProfile, activity: Activity) -> bool:
@@ -42,60 +47,139 @@ def check_major_college(student: StudentProfile, activity: Activity) -> bool:
     return True
 
 
-def check_chinese_level(student: StudentProfile, activity: Activity) -> bool:
-    # Very simple gate: ensure student.chinese_level >= required lexicographically if same prefix like HSK
-    if not activity.chinese_level_min:
-        return True
-    if not student.chinese_level:
-        return False
+def required_chinese_level(raw: str) -> int | None:
+    """Numeric level for an activity requirement; 0 = none, None = unknown format."""
+    if not raw:
+        return 0
     # Parse activity requirement
-    req_level = activity.chinese_level_min.strip().upper()
+    req_level = raw.strip().upper()
     if req_level.startswith('HSK'):
         try:
-            req_num = int(req_level[3:])
+            return int(req_level[3:])
         except (ValueError, IndexError):
-            return False
+            return None
     elif req_level == 'CET6':
-        req_num = 6
+        return 6
     elif req_level == 'CET4':
-        req_num = 4
+        return 4
     elif req_level == '全英文班':
-        req_num = 6
-    else:
-        return False  # Unknown format
+        return 6
+    return None  # Unknown format
+
+
+def check_chinese_level(student: StudentProfile, activity: Activity) -> bool:
+    # Very simple gate: ensure student.chinese_level >= required lexicographically if same prefix like HSK
+    if not activity.chinese_level_min:
+        return True
+    req_num = required_chinese_level(activity.chinese_level_min)
+    if req_num is None:
+        return False
+    if req_num == 0:
+        # e.g. "HSK0": no requirement, same as eligible_students_queryset
+        return True
+    if not student.chinese_level:
+        return False
     # student.chinese_level is now an integer
     return student.chinese_level >= req_num
 
 
-def check_activity_cap(student: StudentProfile, max_per_year: int = 7) -> bool:
-    approved = Participation.objects.filter(student=student, status='approved')
+def _cap_window_start():
     # Filter within last academic year (simplified: last 365 days)
-    one_year_ago = timezone.now() - timedelta(days=365)
-    count = approved.filter(applied_at__gte=one_year_ago).count()
-    return count < max_per_year
+    return timezone.now() - timedelta(days=365)
 
 
-def evaluate_eligibility(student: StudentProfile, activity: Activity) -> Dict:
-    reasons: List[str] = []
-    ok = True
+def count_recent_approved(student: StudentProfile) -> int:
+    approved = Participation.objects.filter(student=student, status='approved')
+    return approved.filter(applied_at__gte=_cap_window_start()).count()
+
+
+def check_activity_cap(student: StudentProfile, max_per_year: int = MAX_ACTIVITIES_PER_YEAR, approved_count: int | None = None) -> bool:
+    if approved_count is None:
+        approved_count = count_recent_approved(student)
+    return approved_count < max_per_year
+
 
-    if check_time_conflict(student, activity):
-        ok = False
-        reasons.append('Time conflict with existing classes')
+class StudentEligibility:
+    """Evaluates one student against any number of activities.
 
-    if not check_major_college(student, activity):
-        ok = False
-        reasons.append('Major or college requirement not met')
+    The schedule index and the yearly approved count are loaded once on
+    construction, so each ``evaluate`` call runs entirely in memory.
+    """
 
-    if not check_chinese_level(student, activity):
-        ok = False
-        reasons.append('Chinese level requirement not met')
+    def __init__(self, student: StudentProfile):
+        self.student = student
+        self.busy_index = get_student_busy_index(student)
+        self.approved_count = count_recent_approved(student)
 
-    if not check_activity_cap(student):
-        ok = False
-        reasons.append('Yearly activity cap reached (7)')
+    def evaluate(self, activity: Activity) -> Dict:
+        reasons: List[str] = []
+        ok = True
 
-    return {
-        'eligible': ok,
-        'reasons': reasons,
-    }
+        if self.busy_index.overlaps(activity.start_datetime, activity.end_datetime):
+            ok = False
+            reasons.append('Time conflict with existing classes')
+
+        if not check_major_college(self.student, activity):
+            ok = False
+            reasons.append('Major or college requirement not met')
+
+        if not check_chinese_level(self.student, activity):
+            ok = False
+            reasons.append('Chinese level requirement not met')
+
+        if not check_activity_cap(self.student, approved_count=self.approved_count):
+            ok = False
+            reasons.append(f'Yearly activity cap reached ({MAX_ACTIVITIES_PER_YEAR})')
+
+        return {
+            'eligible': ok,
+            'reasons': reasons,
+        }
+
+
+def evaluate_eligibility(student: StudentProfile, activity: Activity) -> Dict:
+    return StudentEligibility(student).evaluate(activity)
+
+
+def evaluate_eligibility_batch(student: StudentProfile, activities: Iterable[Activity]) -> Dict[int, Dict]:
+    """Return ``{activity.id: evaluation}`` using a fixed number of queries."""
+    context = StudentEligibility(student)
+    return {activity.id: context.evaluate(activity) for activity in activities}
+
+
+def eligible_students_queryset(activity: Activity) -> QuerySet:
+    """All students eligible for ``activity``, resolved in SQL.
+
+    College, major, Chinese level and the yearly cap become filters; the time
+    conflict check excludes anyone enrolled in a course whose weekly slot mask
+    overlaps the activity (see ``course_events.courses_conflicting_with``).
+    """
+    qs = StudentProfile.objects.all()
+
+    college = activity.college_required
+    if isinstance(college, str):
+        if college and college != 'all':
+            qs = qs.filter(college=college)
+    elif isinstance(college, list) and college:
+        qs = qs.filter(college__in=college)
+
+    if activity.major_required:
+        qs = qs.filter(major=activity.major_required)
+
+    req_num = required_chinese_level(activity.chinese_level_min)
+    if req_num is None:
+        return qs.none()
+    if req_num:
+        qs = qs.filter(chinese_level__gte=req_num)
+
+    qs = qs.annotate(
+        recent_approved=Count(
+            'participations',
+            filter=Q(participations__status='approved', participations__applied_at__gte=_cap_window_start()),
+        )
+    ).filter(recent_approved__lt=MAX_ACTIVITIES_PER_YEAR)
+
+    conflicting = courses_conflicting_with(activity.start_datetime, activity.end_datetime)
+    if conflicting:
+        qs = qs.exclude(course_enrollments__course_id__in=conflicting)
+    return qs
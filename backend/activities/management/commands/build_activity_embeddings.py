@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.embedding_store import EMBEDDING_BATCH_SIZE, activity_store, build_activity_embeddings
+
+
+class Command(BaseCommand):
+    help = "Encode every activity title/description into the memory-mapped recommender store (RECOMMENDER_STORE_DIR)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=EMBEDDING_BATCH_SIZE, help=f'Activities per encode call (default: {EMBEDDING_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            count = build_activity_embeddings(batch_size=max(options['batch_size'], 1))
+        except Exception as exc:
+            raise CommandError(f'Building activity embeddings failed: {exc}') from exc
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {count} activity embeddings in {activity_store().directory} ({elapsed:.1f}s).'
+        ))
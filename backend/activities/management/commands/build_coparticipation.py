@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.coparticipation import DEFAULT_TOP_K, build_coparticipation, coparticipation_store
+
+
+class Command(BaseCommand):
+    help = "Compute the top co-participation neighbours of every activity from Participation into the recommender store (RECOMMENDER_STORE_DIR)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help=f'Neighbours kept per activity (default: {DEFAULT_TOP_K})')
+        parser.add_argument('--min-support', type=int, default=1, help='Shared participants required for a neighbour (default: 1)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            count = build_coparticipation(top_k=max(options['top_k'], 1), min_support=max(options['min_support'], 1))
+        except Exception as exc:
+            raise CommandError(f'Building co-participation neighbours failed: {exc}') from exc
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored neighbours for {count} activities in {coparticipation_store().directory} ({elapsed:.1f}s).'
+        ))
@@ -0,0 +1,51 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import StudentProfile
+from activities.models import Participation
+from activities.recommendations import compute_recommendations, upcoming_activities
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Rank eligible upcoming activities for every student and cache the results for /api/activities/recommended/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student-id', action='append', dest='student_ids', default=[], help='Only this student_id (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help=f'Students per history query (default: {DEFAULT_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        chunk_size = max(options['chunk_size'], 1)
+        students = StudentProfile.objects.order_by('pk')
+        if options['student_ids']:
+            students = students.filter(student_id__in=options['student_ids'])
+
+        # One activity query for the whole run and one participation query per chunk.
+        upcoming = upcoming_activities()
+        total = 0
+        chunk = []
+        for student in students.iterator(chunk_size=chunk_size):
+            chunk.append(student)
+            if len(chunk) >= chunk_size:
+                total += self._precompute(chunk, upcoming)
+                chunk = []
+        if chunk:
+            total += self._precompute(chunk, upcoming)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Cached recommendations for {total} students over {len(upcoming)} upcoming activities ({elapsed:.1f}s).'
+        ))
+
+    def _precompute(self, students, upcoming) -> int:
+        history = defaultdict(list)
+        rows = Participation.objects.filter(student__in=students).values_list('student_id', 'activity_id')
+        for student_id, activity_id in rows:
+            history[student_id].append(activity_id)
+        for student in students:
+            compute_recommendations(student, upcoming, history[student.pk])
+        return len(students)
@@ -2,7 +2,7 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from common.translation import ensure_en_zh
+from common.translation_queue import apply_i18n_fallbacks, enqueue_field_translations
 
 
 class Activity(models.Model):
@@ -26,19 +26,11 @@ class Activity(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        # Populate translations for title/description
-        try:
-            if self.title and not self.title_i18n:
-                self.title_i18n = {'en': self.title, 'zh': self.title}
-            if self.description and not self.description_i18n:
-                self.description_i18n = {'en': self.description, 'zh': self.description}
-        except Exception:
-            # On any error, fall back to duplicating original text
-            if self.title and not self.title_i18n:
-                self.title_i18n = {'en': self.title, 'zh': self.title}
-            if self.description and not self.description_i18n:
-                self.description_i18n = {'en': self.description, 'zh': self.description}
+        # Source text is the fallback; real translations are filled in the background
+        pending = apply_i18n_fallbacks(self, ('title', 'description'))
         super().save(*args, **kwargs)
+        if pending:
+            enqueue_field_translations(self, pending)
 
 
 class StudentCourseEvent(models.Model):
@@ -52,13 +44,10 @@ class StudentCourseEvent(models.Model):
         return f"{self.student.user.username} - {self.title}"
 
     def save(self, *args, **kwargs):
-        try:
-            if self.title and not self.title_i18n:
-                self.title_i18n = {'en': self.title, 'zh': self.title}
-        except Exception:
-            if self.title and not self.title_i18n:
-                self.title_i18n = {'en': self.title, 'zh': self.title}
+        pending = apply_i18n_fallbacks(self, ('title',))
         super().save(*args, **kwargs)
+        if pending:
+            enqueue_field_translations(self, pending)
 
 
 class Participation(models.Model):
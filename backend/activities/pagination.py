@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """Cursor pagination that only engages when the client asks for it.
+
+    Requests carrying ``page_size`` or ``cursor`` get ``{next, previous, results}``;
+    any other request still receives the full, unpaginated list the frontend expects.
+    """
+
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class ActivityCursorPagination(OptInCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class ParticipationCursorPagination(OptInCursorPagination):
+    ordering = ('-applied_at', '-id')
@@ -0,0 +1,171 @@
+"""Per-student activity recommendations.
+
+Upcoming activities the student is eligible for and has not applied to are
+ranked first by co-participation with their history (``ai.coparticipation``,
+rebuilt in batch), then by similarity to the centroid of the history: embedding
+vectors when the ``ai.embedding_store`` is built for the active encoder,
+otherwise BM25 over the summed history terms (``ai.keyword_index``). Students
+without history, and activities that score zero, fall back to newest first.
+
+Ranked ids are cached per student (``precompute_recommendations`` warms them
+in batch) under a generation that every activity change bumps, so new or
+relaxed activities show up on the next request; the endpoint re-checks the
+short cached list against the current time and eligibility, so stale entries
+never surface ineligible activities.
+"""
+
+import time as _time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from accounts.models import StudentProfile
+from ai.coparticipation import co_participation_scores
+from ai.embedding_store import activity_store, np
+from ai.keyword_index import activity_keyword_index
+from ai.recommendation import get_encoder
+from common.caching import bounded_timeout
+from .eligibility import StudentEligibility
+from .models import Activity, Participation
+
+RECOMMENDATION_CACHE_PREFIX = 'activity-recommendations'
+RECOMMENDATION_GENERATION_KEY = f'{RECOMMENDATION_CACHE_PREFIX}:generation'
+
+
+def recommendation_limit() -> int:
+    return getattr(settings, 'RECOMMENDATION_LIMIT', 50)
+
+
+def recommendation_cache_timeout() -> int:
+    return bounded_timeout(getattr(settings, 'RECOMMENDATION_CACHE_TIMEOUT', 3600))
+
+
+def _recommendation_generation() -> int:
+    generation = cache.get(RECOMMENDATION_GENERATION_KEY)
+    if generation is None:
+        cache.add(RECOMMENDATION_GENERATION_KEY, _time.time_ns(), None)
+        generation = cache.get(RECOMMENDATION_GENERATION_KEY)
+    return generation
+
+
+def recommendation_key(student_id: int) -> str:
+    return f'{RECOMMENDATION_CACHE_PREFIX}:{_recommendation_generation()}:{student_id}'
+
+
+def invalidate_student_recommendations(student_id: int) -> None:
+    cache.delete(recommendation_key(student_id))
+
+
+def invalidate_all_recommendations() -> None:
+    """Orphan every student's cached ranking, e.g. after an activity was added or edited."""
+    cache.set(RECOMMENDATION_GENERATION_KEY, _time.time_ns(), None)
+
+
+def upcoming_activities() -> List[Activity]:
+    return list(Activity.objects.filter(end_datetime__gte=timezone.now()).order_by('-created_at', '-id'))
+
+
+def _embedding_scores(history_ids: Sequence[int], candidate_ids: Sequence[int]) -> Optional[Dict[int, float]]:
+    store = activity_store()
+    if not store.available():
+        return None
+    encoder = get_encoder()
+    if encoder is None or not store.matches(encoder):
+        return None
+    found, history = store.vectors_for(history_ids)
+    if not found:
+        return None
+    centroid = history.mean(axis=0)
+    norm = float(np.linalg.norm(centroid))
+    if norm == 0:
+        return None
+    found, candidates = store.vectors_for(candidate_ids)
+    if not found:
+        return {}
+    return dict(zip(found, (candidates @ (centroid / norm)).tolist()))
+
+
+def _keyword_scores(history_ids: Sequence[int], candidate_ids: Sequence[int]) -> Optional[Dict[int, float]]:
+    index = activity_keyword_index()
+    if index is None:
+        return None
+    terms: Counter = Counter()
+    for activity_id in history_ids:
+        terms.update(index.document_terms(activity_id) or {})
+    if not terms:
+        return None
+    return index.score_documents(dict(terms), candidate_ids)
+
+
+def rank_activities(history_ids: Sequence[int], candidates: Sequence[Activity]) -> List[int]:
+    """Order ``candidates`` (already newest first) by co-participation, then history similarity."""
+    candidate_ids = [activity.id for activity in candidates]
+    if not history_ids or not candidate_ids:
+        return candidate_ids
+    together = co_participation_scores(history_ids, candidate_ids) or {}
+    scores = _embedding_scores(history_ids, candidate_ids)
+    if scores is None:
+        scores = _keyword_scores(history_ids, candidate_ids) or {}
+    recency = {activity_id: position for position, activity_id in enumerate(candidate_ids)}
+    # Unscored or zero-scored activities keep recency order after the matches.
+    return sorted(candidate_ids, key=lambda activity_id: (
+        -together.get(activity_id, 0.0),
+        -max(scores.get(activity_id, 0.0), 0.0),
+        recency[activity_id],
+    ))
+
+
+def compute_recommendations(
+    student: StudentProfile,
+    upcoming: Optional[Sequence[Activity]] = None,
+    history_ids: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """Rank and cache the student's recommendations; returns the cached activity ids.
+
+    ``upcoming`` and ``history_ids`` let batch callers share one activity
+    query and one participation query across many students.
+    """
+    if upcoming is None:
+        upcoming = upcoming_activities()
+    if history_ids is None:
+        history_ids = list(Participation.objects.filter(student=student).values_list('activity_id', flat=True))
+    applied = set(history_ids)
+    by_id = {activity.id: activity for activity in upcoming if activity.id not in applied}
+    limit = recommendation_limit()
+    eligibility = StudentEligibility(student)
+    # Rank first, then check eligibility only until the list is full.
+    ranked = []
+    for activity_id in rank_activities(list(history_ids), list(by_id.values())):
+        if eligibility.evaluate(by_id[activity_id]).get('eligible'):
+            ranked.append(activity_id)
+            if len(ranked) >= limit:
+                break
+    cache.set(recommendation_key(student.pk), ranked, recommendation_cache_timeout())
+    return ranked
+
+
+def recommended_activities(student: StudentProfile, limit: int) -> List[tuple]:
+    """``[(activity, evaluation)]`` for the endpoint: cached ranking, re-checked against now."""
+    if limit <= 0:
+        return []
+    ranked = cache.get(recommendation_key(student.pk))
+    if ranked is None:
+        ranked = compute_recommendations(student)
+    activities = Activity.objects.select_related('created_by').in_bulk(ranked)
+    now = timezone.now()
+    eligibility = StudentEligibility(student)
+    results = []
+    for activity_id in ranked:
+        activity = activities.get(activity_id)
+        if activity is None or activity.end_datetime < now:
+            continue
+        evaluation = eligibility.evaluate(activity)
+        if not evaluation.get('eligible'):
+            continue
+        results.append((activity, evaluation))
+        if len(results) >= limit:
+            break
+    return results
@@ -0,0 +1,51 @@
+"""Versioned cache for the public activity list/detail responses.
+
+Every key embeds the current version, so invalidation is a single ``cache.set``
+of a new version and stale entries simply age out of the backend. The version
+is only visible to other workers through a shared backend, so on LocMem the
+TTL is capped (``common.caching.bounded_timeout``).
+"""
+
+import hashlib
+import time as _time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from common.caching import bounded_timeout
+from common.translation import request_language
+
+ACTIVITY_CACHE_PREFIX = "activity-response"
+ACTIVITY_CACHE_VERSION_KEY = f"{ACTIVITY_CACHE_PREFIX}:version"
+
+
+def activity_cache_timeout() -> int:
+    return bounded_timeout(getattr(settings, "ACTIVITY_CACHE_TIMEOUT", 300))
+
+
+def _activity_cache_version() -> int:
+    version = cache.get(ACTIVITY_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(ACTIVITY_CACHE_VERSION_KEY, _time.time_ns(), None)
+        version = cache.get(ACTIVITY_CACHE_VERSION_KEY)
+    return version
+
+
+def activity_response_key(request, action: str, pk=None) -> str:
+    """Key on (version, action, pk, language, query params); the ``lang`` param is covered by the language."""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        if name != "lang"
+        for value in values
+    )
+    digest = hashlib.sha1(urlencode(params).encode("utf-8")).hexdigest()
+    lang = request_language(request)
+    return f"{ACTIVITY_CACHE_PREFIX}:{_activity_cache_version()}:{action}:{pk or ''}:{lang}:{digest}"
+
+
+def invalidate_activity_responses() -> None:
+    """Orphan every cached list/detail response."""
+
+    cache.set(ACTIVITY_CACHE_VERSION_KEY, _time.time_ns(), None)
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 
 from accounts.serializers import StudentProfileSerializer
+from common.serializers import DynamicFieldsMixin
+from common.translation import request_language
 from .models import Activity, Participation
 
 
-class ActivitySerializer(serializers.ModelSerializer):
+class ActivitySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
 
     class Meta:
@@ -18,29 +20,22 @@ class ActivitySerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        request = self.context.get('request')
-        # derive language code: default to 'en' or 'zh'
-        lang = 'en'
-        if request:
-            # Accept-Language like 'zh-CN,zh;q=0.9'
-            accept = request.META.get('HTTP_ACCEPT_LANGUAGE', '')
-            if 'zh' in accept.lower():
-                lang = 'zh'
-            elif 'en' in accept.lower():
-                lang = 'en'
-            # query param override
-            qp = request.query_params.get('lang')
-            if qp:
-                lang = 'zh' if qp.lower().startswith('zh') else 'en'
+        # Resolved once per serializer tree rather than once per row
+        lang = self.context.get('lang')
+        if lang is None:
+            lang = request_language(self.context.get('request'))
+            self.context['lang'] = lang
         # replace title/description with translated values if present
         i18n_title = (instance.title_i18n or {})
         i18n_desc = (instance.description_i18n or {})
-        data['title'] = i18n_title.get(lang) or data.get('title')
-        data['description'] = i18n_desc.get(lang) or data.get('description')
+        if 'title' in data:
+            data['title'] = i18n_title.get(lang) or data.get('title')
+        if 'description' in data:
+            data['description'] = i18n_desc.get(lang) or data.get('description')
         return data
 
 
-class ParticipationSerializer(serializers.ModelSerializer):
+class ParticipationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     student = StudentProfileSerializer(read_only=True)
     activity_detail = ActivitySerializer(source='activity', read_only=True)
 
@@ -0,0 +1,99 @@
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Course, CourseEnrollment, StudentProfile
+from ai.embedding_store import schedule_activity_embedding
+from ai.keyword_index import note_activities_changed
+from common.signals import translations_applied
+from .course_events import invalidate_all_busy_indexes, invalidate_student_busy_index
+from .models import Activity, Participation
+from .recommendations import invalidate_all_recommendations, invalidate_student_recommendations
+from .response_cache import invalidate_activity_responses
+
+
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+def invalidate_enrollment_busy_index(sender, instance, **kwargs):
+    invalidate_student_busy_index(instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_course_busy_indexes(sender, instance, **kwargs):
+    # Any enrolled student may be affected, so roll the whole index generation.
+    invalidate_all_busy_indexes()
+
+
+@receiver([post_save, post_delete], sender=Activity)
+def invalidate_activity_response_cache(sender, instance, **kwargs):
+    invalidate_activity_responses()
+    invalidate_all_recommendations()
+    note_activities_changed([instance.pk])
+
+
+@receiver(pre_save, sender=Activity)
+def remember_activity_text(sender, instance, **kwargs):
+    # Stash the stored title/description so post_save only re-embeds real text changes.
+    previous = None
+    if instance.pk is not None:
+        previous = Activity.objects.filter(pk=instance.pk).values_list('title', 'description').first()
+    instance._previous_text = previous
+
+
+@receiver(post_save, sender=Activity)
+def refresh_activity_embedding(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_previous_text', None) != (instance.title, instance.description):
+        schedule_activity_embedding(instance.pk)
+
+
+@receiver(post_delete, sender=Activity)
+def drop_activity_embedding(sender, instance, **kwargs):
+    schedule_activity_embedding(instance.pk)
+
+
+@receiver(translations_applied, sender=Activity)
+def invalidate_translated_activity_responses(sender, object_ids, **kwargs):
+    # Background translations update title_i18n via queryset.update(), which skips post_save.
+    invalidate_activity_responses()
+    invalidate_all_recommendations()
+    note_activities_changed(object_ids)
+
+
+def _adjust_approved_count(student_id, delta: int) -> None:
+    StudentProfile.objects.filter(pk=student_id).update(
+        approved_activity_count=Greatest(F('approved_activity_count') + delta, Value(0))
+    )
+
+
+@receiver(pre_save, sender=Participation)
+def remember_participation_approval(sender, instance, **kwargs):
+    # Stash the stored (student, status) so post_save can work out the counter delta.
+    previous = None
+    if instance.pk is not None:
+        previous = Participation.objects.filter(pk=instance.pk).values_list('student_id', 'status').first()
+    instance._previous_approval = previous
+
+
+@receiver(post_save, sender=Participation)
+def sync_approved_count_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_approval', None)
+    was_approved = previous is not None and previous[1] == 'approved'
+    is_approved = instance.status == 'approved'
+    if was_approved and is_approved and previous[0] == instance.student_id:
+        return
+    if was_approved:
+        _adjust_approved_count(previous[0], -1)
+    if is_approved:
+        _adjust_approved_count(instance.student_id, 1)
+
+
+@receiver(post_delete, sender=Participation)
+def sync_approved_count_on_delete(sender, instance, **kwargs):
+    if instance.status == 'approved':
+        _adjust_approved_count(instance.student_id, -1)
+
+
+@receiver([post_save, post_delete], sender=Participation)
+def invalidate_participation_recommendations(sender, instance, **kwargs):
+    # A new application both changes the history centroid and removes a candidate.
+    invalidate_student_recommendations(instance.student_id)
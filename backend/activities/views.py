@@ -1,17 +1,22 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 
 from accounts.models import StudentProfile
+from common.translation import request_language
 from .models import Activity, Participation
 from .serializers import (
     ActivitySerializer,
     ParticipationSerializer,
 )
-from .eligibility import evaluate_eligibility
+from .eligibility import StudentEligibility, eligible_students_queryset, evaluate_eligibility
 from .course_events import build_student_course_event_payloads, build_student_course_payloads
+from .pagination import ActivityCursorPagination, ParticipationCursorPagination
+from .recommendations import recommendation_limit, recommended_activities
+from .response_cache import activity_cache_timeout, activity_response_key
 
 
 class IsStaffOrReadOnly(permissions.BasePermission):
@@ -22,9 +27,10 @@ class IsStaffOrReadOnly(permissions.BasePermission):
 
 
 class ActivityViewSet(viewsets.ModelViewSet):
-    queryset = Activity.objects.all().order_by('-created_at')
+    queryset = Activity.objects.select_related('created_by').order_by('-created_at')
     serializer_class = ActivitySerializer
     permission_classes = [IsStaffOrReadOnly]
+    pagination_class = ActivityCursorPagination
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -32,15 +38,40 @@ class ActivityViewSet(viewsets.ModelViewSet):
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx['request'] = self.request
+        ctx['lang'] = request_language(self.request)
         return ctx
 
+    def list(self, request, *args, **kwargs):
+        key = activity_response_key(request, 'list')
+        return self.cached_response(key, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        key = activity_response_key(request, 'detail', kwargs.get('pk'))
+        return self.cached_response(key, super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, key, render, request, *args, **kwargs):
+        # Responses are identical for every reader, so cache by language and query string only.
+        data = cache.get(key)
+        if data is None:
+            response = render(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            cache.set(key, data, activity_cache_timeout())
+        return Response(data)
+
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated], url_path='eligible')
     def eligible(self, request):
         student_profile = getattr(request.user, 'student_profile', None)
         if not student_profile:
             return Response([])
 
-        qs = self.filter_queryset(self.get_queryset()).filter(end_datetime__gte=timezone.now()).order_by('start_datetime')
+        qs = (
+            self.filter_queryset(self.get_queryset())
+            .filter(end_datetime__gte=timezone.now())
+            .select_related('created_by')
+            .order_by('start_datetime')
+        )
         limit_param = request.query_params.get('limit')
         limit = None
         if limit_param and limit_param.isdigit():
@@ -49,20 +80,64 @@ class ActivityViewSet(viewsets.ModelViewSet):
             except ValueError:
                 limit = None
 
-        results = []
+        # Schedule and yearly cap are loaded once; every activity is then checked in memory.
+        eligibility = StudentEligibility(student_profile)
+        matches = []
         for activity in qs:
-            evaluation = evaluate_eligibility(student_profile, activity)
+            evaluation = eligibility.evaluate(activity)
             if not evaluation.get('eligible'):
                 continue
-            serializer = self.get_serializer(activity, context=self.get_serializer_context())
-            data = serializer.data
-            data['eligibility'] = evaluation
-            results.append(data)
-            if limit is not None and len(results) >= limit:
+            matches.append((activity, evaluation))
+            if limit is not None and len(matches) >= limit:
                 break
 
+        serializer = self.get_serializer([activity for activity, _ in matches], many=True)
+        results = serializer.data
+        for data, (_, evaluation) in zip(results, matches):
+            data['eligibility'] = evaluation
+
         return Response(results)
 
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated], url_path='recommended')
+    def recommended(self, request):
+        """Eligible upcoming activities ranked by similarity to the student's participation history."""
+        student_profile = getattr(request.user, 'student_profile', None)
+        if not student_profile:
+            return Response([])
+
+        limit_param = request.query_params.get('limit')
+        limit = int(limit_param) if limit_param and limit_param.isdigit() else 10
+        matches = recommended_activities(student_profile, min(limit, recommendation_limit()))
+
+        serializer = self.get_serializer([activity for activity, _ in matches], many=True)
+        results = serializer.data
+        for data, (_, evaluation) in zip(results, matches):
+            data['eligibility'] = evaluation
+
+        return Response(results)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser], url_path='eligible-students')
+    def eligible_students(self, request, pk=None):
+        """Count and page through the students eligible for this activity.
+
+        Query params: ``limit`` (default 100, max 1000) and ``offset``.
+        """
+        activity = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 100)), 0), 1000)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except (TypeError, ValueError):
+            return Response({'detail': 'limit and offset must be integers'}, status=400)
+
+        qs = eligible_students_queryset(activity).order_by('id')
+        page = qs.values('id', 'student_id')[offset:offset + limit]
+        return Response({
+            'count': qs.count(),
+            'limit': limit,
+            'offset': offset,
+            'results': list(page),
+        })
+
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def apply(self, request, pk=None):
         activity = self.get_object()
@@ -79,9 +154,14 @@ class ActivityViewSet(viewsets.ModelViewSet):
 
 
 class ParticipationViewSet(viewsets.ModelViewSet):
-    queryset = Participation.objects.select_related('student', 'activity').all().order_by('-applied_at')
+    queryset = (
+        Participation.objects
+        .select_related('student__user__account_meta', 'activity__created_by')
+        .order_by('-applied_at')
+    )
     serializer_class = ParticipationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ParticipationCursorPagination
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -123,15 +203,7 @@ class StudentCourseEventViewSet(viewsets.ViewSet):
 
         payloads = build_student_course_payloads(target_student)
 
-        lang = 'en'
-        accept = request.META.get('HTTP_ACCEPT_LANGUAGE', '') if request else ''
-        if 'zh' in accept.lower():
-            lang = 'zh'
-        elif 'en' in accept.lower():
-            lang = 'en'
-        qp = request.query_params.get('lang') if request else None
-        if qp:
-            lang = 'zh' if qp.lower().startswith('zh') else 'en'
+        lang = request_language(request)
 
         for item in payloads:
             title_i18n = item.get('title_i18n') or {}
@@ -0,0 +1,269 @@
+"""Item-item collaborative filtering over the participation matrix.
+
+``top_k_neighbours`` turns (student, activity) pairs into a binary CSR
+student x activity matrix R, counts co-participation C = RᵀR one block of
+activities at a time (a ``bincount`` over the expanded pairs, so memory stays
+at block x activities), scores pairs by cosine ``C[a, b] / sqrt(n_a * n_b)``
+and keeps the best ``k`` per activity.
+
+``build_coparticipation`` runs it over ``Participation`` and saves the fixed
+width neighbour table the same way as the embedding store: a new ``.npy``
+generation plus an atomic manifest swap, memory-mapped by every reader. A
+request-time lookup is one dict hit and one row slice.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_TOP_K = 20
+# Co-occurrence cells counted per block (block rows x activities).
+BLOCK_CELLS = 4_000_000
+
+
+def csr_from_pairs(rows, cols, n_rows: int):
+    """``(indptr, indices)`` of the binary matrix with ones at (rows, cols); duplicates collapse."""
+    order = np.lexsort((cols, rows))
+    rows, cols = rows[order], cols[order]
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    rows, cols = rows[keep], cols[keep]
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols
+
+
+def top_k_neighbours(student_idx, activity_idx, n_students: int, n_activities: int, k: int = DEFAULT_TOP_K, min_support: int = 1):
+    """Top ``k`` co-participation neighbours per activity column.
+
+    Returns ``(neighbours, scores)``, both ``n_activities x k``: column indices
+    best first (``-1`` padding where fewer than ``k`` share ``min_support``
+    students) and their cosine scores.
+    """
+    student_idx = np.asarray(student_idx, dtype=np.int64)
+    activity_idx = np.asarray(activity_idx, dtype=np.int64)
+    k = max(min(k, n_activities - 1), 0)
+    neighbours = np.full((n_activities, k), -1, dtype=np.int64)
+    scores = np.zeros((n_activities, k), dtype=np.float32)
+    if not k or not len(student_idx):
+        return neighbours, scores
+
+    # Student -> activities (CSR of R) and activity -> students (CSR of Rᵀ).
+    s_indptr, s_activities = csr_from_pairs(student_idx, activity_idx, n_students)
+    s_rows = np.repeat(np.arange(n_students), np.diff(s_indptr))
+    a_indptr, a_students = csr_from_pairs(s_activities, s_rows, n_activities)
+    degree = np.diff(s_indptr)
+    participants = np.diff(a_indptr).astype(np.float32)
+
+    block = max(1, BLOCK_CELLS // n_activities)
+    for start in range(0, n_activities, block):
+        stop = min(start + block, n_activities)
+        size = stop - start
+        students = a_students[a_indptr[start]:a_indptr[stop]]
+        local = np.repeat(np.arange(size), np.diff(a_indptr[start:stop + 1]))
+        # Expand every (activity, student) entry to all of that student's activities.
+        lengths = degree[students]
+        ends = np.cumsum(lengths)
+        offsets = np.repeat(s_indptr[students] - ends + lengths, lengths) + np.arange(ends[-1] if len(ends) else 0)
+        cells = np.repeat(local, lengths) * n_activities + s_activities[offsets]
+        co = np.bincount(cells, minlength=size * n_activities).reshape(size, n_activities).astype(np.float32)
+        co[np.arange(size), np.arange(start, stop)] = 0
+        if min_support > 1:
+            co[co < min_support] = 0
+        norms = np.sqrt(participants[start:stop, None] * participants[None, :])
+        sim = np.divide(co, norms, out=np.zeros_like(co), where=co > 0)
+
+        top = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sim, top, axis=1)
+        order = np.lexsort((top, -top_scores), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        neighbours[start:stop] = np.where(top_scores > 0, top, -1)
+        scores[start:stop] = np.where(top_scores > 0, top_scores, 0)
+    return neighbours, scores
+
+
+class NeighbourStore:
+    """Memory-mapped id -> ranked (neighbour id, score) table; one instance per process and directory."""
+
+    def __init__(self, directory: str, name: str = 'coparticipation'):
+        self.directory = directory
+        self.name = name
+        self.manifest_path = os.path.join(directory, f'{name}.json')
+        self.lock_path = os.path.join(directory, f'{name}.lock')
+        self._lock = threading.RLock()
+        self._stamp = None
+        # (manifest, neighbours, scores, {id: row}) swapped as one tuple
+        self._state = None
+
+    def _current(self):
+        """Snapshot of the live generation (re-mapped when the manifest changed), or None."""
+        if np is None:
+            return None
+        try:
+            stat = os.stat(self.manifest_path)
+        except OSError:
+            self._stamp, self._state = None, None
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    try:
+                        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                            manifest = json.load(f)
+                        path = lambda key: os.path.join(self.directory, manifest[key])  # noqa: E731
+                        ids = np.load(path('ids'))
+                        neighbours = np.load(path('neighbours'), mmap_mode='r')
+                        scores = np.load(path('scores'), mmap_mode='r')
+                    except (OSError, ValueError, KeyError):
+                        # Raced a writer that already swapped again; keep the current
+                        # generation and retry on the next call.
+                        return self._state
+                    rows = {int(object_id): row for row, object_id in enumerate(ids.tolist())}
+                    self._state = (manifest, neighbours, scores, rows)
+                    self._stamp = stamp
+        return self._state
+
+    def available(self) -> bool:
+        return self._current() is not None
+
+    def __len__(self) -> int:
+        state = self._current()
+        return 0 if state is None else len(state[3])
+
+    def neighbours(self, object_id: int, top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        state = self._current()
+        if state is None:
+            return []
+        row = state[3].get(int(object_id))
+        if row is None:
+            return []
+        ids, scores = state[1][row, :top_k], state[2][row, :top_k]
+        return [(int(i), float(s)) for i, s in zip(ids.tolist(), scores.tolist()) if i >= 0]
+
+    @contextmanager
+    def _write_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(self.lock_path, 'a+') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def replace_all(self, ids, neighbours, scores, **meta) -> None:
+        """Write a new generation, swap the manifest, then drop older generations.
+
+        The generation being replaced stays on disk until the next swap, so a
+        reader that loaded the old manifest can still open its files.
+        """
+        with self._write_lock():
+            previous = self._current()
+            generation = f'{time.time_ns():x}'
+            files = {
+                'ids': f'{self.name}-{generation}-ids.npy',
+                'neighbours': f'{self.name}-{generation}-neighbours.npy',
+                'scores': f'{self.name}-{generation}-scores.npy',
+            }
+            arrays = {
+                'ids': np.asarray(ids, dtype=np.int64),
+                'neighbours': np.asarray(neighbours, dtype=np.int64),
+                'scores': np.asarray(scores, dtype=np.float32),
+            }
+            for key, filename in files.items():
+                tmp_path = os.path.join(self.directory, f'.{filename}.tmp')
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, arrays[key])
+                os.replace(tmp_path, os.path.join(self.directory, filename))
+            tmp_manifest = f'{self.manifest_path}.tmp'
+            with open(tmp_manifest, 'w', encoding='utf-8') as f:
+                json.dump({'count': len(arrays['ids']), **meta, **files}, f)
+            os.replace(tmp_manifest, self.manifest_path)
+            current = set(files.values())
+            if previous is not None:
+                current |= {previous[0][key] for key in files}
+            for filename in os.listdir(self.directory):
+                if filename.startswith(f'{self.name}-') and filename.endswith('.npy') and filename not in current:
+                    try:
+                        os.remove(os.path.join(self.directory, filename))
+                    except OSError:
+                        pass
+
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def coparticipation_store() -> NeighbourStore:
+    from .embedding_store import store_dir
+
+    directory = store_dir()
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = NeighbourStore(directory, 'coparticipation')
+        return _stores[directory]
+
+
+def build_coparticipation(top_k: int = DEFAULT_TOP_K, min_support: int = 1) -> int:
+    """Rebuild the activity neighbour table from non-rejected participations; returns activities stored."""
+    if np is None:
+        raise RuntimeError('NumPy is required for the co-participation recommender')
+    from activities.models import Participation
+
+    rows = Participation.objects.exclude(status='rejected').values_list('student_id', 'activity_id')
+    pairs = np.fromiter(chain.from_iterable(rows.iterator(chunk_size=10000)), dtype=np.int64).reshape(-1, 2)
+    student_ids = np.unique(pairs[:, 0])
+    activity_ids = np.unique(pairs[:, 1])
+    neighbours, scores = top_k_neighbours(
+        np.searchsorted(student_ids, pairs[:, 0]),
+        np.searchsorted(activity_ids, pairs[:, 1]),
+        len(student_ids),
+        len(activity_ids),
+        k=top_k,
+        min_support=min_support,
+    )
+    neighbour_ids = np.where(neighbours >= 0, activity_ids[np.maximum(neighbours, 0)], -1) if len(activity_ids) else neighbours
+    coparticipation_store().replace_all(
+        activity_ids, neighbour_ids, scores,
+        top_k=top_k, min_support=min_support, participations=len(pairs),
+    )
+    return len(activity_ids)
+
+
+def co_participation_neighbours(activity_id: int, top_k: int = 5) -> Optional[List[Tuple[int, float]]]:
+    """Precomputed (activity id, cosine) neighbours; None before ``build_coparticipation`` has run."""
+    store = coparticipation_store()
+    if not store.available():
+        return None
+    return store.neighbours(activity_id, top_k)
+
+
+def co_participation_scores(history_ids: Iterable[int], candidate_ids: Iterable[int]) -> Optional[Dict[int, float]]:
+    """Summed neighbour scores of ``candidate_ids`` over a student's history; None without a table."""
+    store = coparticipation_store()
+    if not store.available():
+        return None
+    candidates = set(candidate_ids)
+    totals: Dict[int, float] = {}
+    for activity_id in history_ids:
+        for neighbour_id, score in store.neighbours(activity_id):
+            if neighbour_id in candidates:
+                totals[neighbour_id] = totals.get(neighbour_id, 0.0) + score
+    return totals
@@ -0,0 +1,336 @@
+"""Persisted activity embeddings for the recommender.
+
+Vectors live in a float32 ``.npy`` matrix that every process memory-maps, so
+gunicorn workers share one copy through the page cache; a parallel ``.npy`` of
+activity ids maps rows back to activities. Each write produces a new file
+generation and then atomically swaps a small JSON manifest, so readers never
+see a half-written matrix and pick up changes on their next query.
+
+NumPy is optional: without it (or before ``build_activity_embeddings`` has
+run) ``activity_store().available()`` is False and callers fall back.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .recommendation import Encoder, get_encoder, warm_encoder
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCH_SIZE = 256
+
+
+class EmbeddingStore:
+    """Memory-mapped id -> unit vector store; one instance per process and directory."""
+
+    def __init__(self, directory: str, name: str = 'activities'):
+        self.directory = directory
+        self.name = name
+        self.manifest_path = os.path.join(directory, f'{name}.json')
+        self.lock_path = os.path.join(directory, f'{name}.lock')
+        self._lock = threading.RLock()
+        self._stamp = None
+        # (manifest, vectors, ids, {id: row}) swapped as one tuple so readers never mix generations
+        self._state = None
+
+    # --- reading ---------------------------------------------------------
+
+    def _refresh(self) -> bool:
+        """Re-map the current generation if the manifest changed; False when there is none."""
+        try:
+            stat = os.stat(self.manifest_path)
+        except OSError:
+            self._stamp, self._state = None, None
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp == self._stamp:
+            return True
+        with self._lock:
+            if stamp == self._stamp:
+                return True
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                vectors = np.load(os.path.join(self.directory, manifest['vectors']), mmap_mode='r')
+                ids = np.load(os.path.join(self.directory, manifest['ids']))
+            except (OSError, ValueError, KeyError):
+                # Raced a writer that already swapped again; keep serving what we have
+                # and retry on the next call (the stamp is left unchanged).
+                logger.debug('Embedding store %s changed while loading', self.manifest_path, exc_info=True)
+                return self._state is not None
+            rows = {int(object_id): row for row, object_id in enumerate(ids.tolist())}
+            self._state, self._stamp = (manifest, vectors, ids, rows), stamp
+        return True
+
+    def _current(self):
+        """Snapshot of the live generation, or None."""
+        if np is None or not self._refresh():
+            return None
+        return self._state
+
+    def available(self) -> bool:
+        return self._current() is not None
+
+    def matches(self, encoder: Encoder) -> bool:
+        """True when the stored vectors were produced by ``encoder``."""
+        state = self._current()
+        return (
+            state is not None
+            and state[0].get('encoder') == encoder.name
+            and state[0].get('dimension') == encoder.dimension
+        )
+
+    def __len__(self) -> int:
+        state = self._current()
+        return 0 if state is None else len(state[3])
+
+    def vector(self, object_id: int):
+        state = self._current()
+        if state is None:
+            return None
+        row = state[3].get(int(object_id))
+        return None if row is None else state[1][row]
+
+    def vectors_for(self, ids: Iterable[int]):
+        """``(found ids, matrix)`` for the ids present in the store, in the given order."""
+        state = self._current()
+        if state is None:
+            return [], None
+        rows = state[3]
+        found = [int(object_id) for object_id in ids if int(object_id) in rows]
+        return found, state[1][[rows[object_id] for object_id in found]]
+
+    def search(self, query, top_k: int = 5, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top ``top_k`` (id, cosine) pairs for a unit ``query`` vector: one matrix-vector product."""
+        state = self._current()
+        if state is None or top_k <= 0:
+            return []
+        _, vectors, ids, rows = state
+        scores = vectors @ np.asarray(query, dtype=np.float32)
+        for object_id in exclude:
+            row = rows.get(int(object_id))
+            if row is not None:
+                scores[row] = -np.inf
+        k = min(top_k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        ranked = sorted(top.tolist(), key=lambda row: (-scores[row], ids[row]))
+        return [(int(ids[row]), float(scores[row])) for row in ranked if np.isfinite(scores[row])]
+
+    # --- writing ---------------------------------------------------------
+
+    @contextmanager
+    def _write_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(self.lock_path, 'a+') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def replace_all(self, ids: Sequence[int], vectors, encoder: Encoder) -> None:
+        with self._write_lock():
+            self._write_generation(np.asarray(ids, dtype=np.int64), np.asarray(vectors, dtype=np.float32), encoder)
+
+    def upsert(self, ids: Sequence[int], vectors, encoder: Encoder) -> None:
+        """Replace or append rows for ``ids``; the caller checked ``matches(encoder)``."""
+        with self._write_lock():
+            state = self._current()
+            new_ids = np.asarray(ids, dtype=np.int64)
+            new_vectors = np.asarray(vectors, dtype=np.float32).reshape(len(new_ids), encoder.dimension)
+            if state is None:
+                self._write_generation(new_ids, new_vectors, encoder)
+                return
+            _, old_vectors, old_ids, rows = state
+            merged_ids = old_ids.copy()
+            merged = np.array(old_vectors, dtype=np.float32)
+            appended_ids, appended = [], []
+            for object_id, vector in zip(new_ids.tolist(), new_vectors):
+                row = rows.get(object_id)
+                if row is None:
+                    appended_ids.append(object_id)
+                    appended.append(vector)
+                else:
+                    merged[row] = vector
+            if appended:
+                merged_ids = np.concatenate([merged_ids, np.asarray(appended_ids, dtype=np.int64)])
+                merged = np.vstack([merged, np.asarray(appended, dtype=np.float32)])
+            self._write_generation(merged_ids, merged, encoder)
+
+    def remove(self, ids: Iterable[int]) -> None:
+        with self._write_lock():
+            state = self._current()
+            if state is None:
+                return
+            manifest, vectors, old_ids, rows = state
+            drop = [rows[object_id] for object_id in map(int, ids) if object_id in rows]
+            if not drop:
+                return
+            keep = np.ones(len(old_ids), dtype=bool)
+            keep[drop] = False
+            self._write_generation(old_ids[keep], np.array(vectors[keep], dtype=np.float32), manifest)
+
+    def _write_generation(self, ids, vectors, encoder) -> None:
+        """Write a fresh vectors/ids pair, swap the manifest, then drop older generations.
+
+        The generation being replaced stays on disk until the next swap, so a
+        reader that loaded the old manifest can still open its files.
+        """
+        previous = self._current()
+        if isinstance(encoder, dict):
+            encoder_name, dimension = encoder['encoder'], encoder['dimension']
+        else:
+            encoder_name, dimension = encoder.name, encoder.dimension
+        generation = f'{time.time_ns():x}'
+        files = {
+            'vectors': f'{self.name}-{generation}.npy',
+            'ids': f'{self.name}-{generation}-ids.npy',
+        }
+        for key, array in (('vectors', vectors.reshape(len(ids), dimension)), ('ids', ids)):
+            tmp_path = os.path.join(self.directory, f'.{files[key]}.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, os.path.join(self.directory, files[key]))
+        manifest = {'encoder': encoder_name, 'dimension': dimension, 'count': len(ids), **files}
+        tmp_manifest = f'{self.manifest_path}.tmp'
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, self.manifest_path)
+        self._refresh()
+        current = set(files.values())
+        if previous is not None:
+            current |= {previous[0]['vectors'], previous[0]['ids']}
+        for filename in os.listdir(self.directory):
+            if filename.startswith(f'{self.name}-') and filename.endswith('.npy') and filename not in current:
+                try:
+                    # Processes that still map an old generation keep it alive until they refresh.
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def store_dir() -> str:
+    return str(getattr(settings, 'RECOMMENDER_STORE_DIR', '') or os.path.join(settings.BASE_DIR, 'var', 'recommender'))
+
+
+def activity_store() -> EmbeddingStore:
+    directory = store_dir()
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = EmbeddingStore(directory, 'activities')
+        return _stores[directory]
+
+
+def activity_text(title: str, description: str) -> str:
+    return f'{title or ""}\n{description or ""}'.strip()
+
+
+def _encode_rows(encoder: Encoder, rows: List[Tuple[int, str, str]]):
+    return encoder.encode([activity_text(title, description) for _, title, description in rows])
+
+
+def build_activity_embeddings(batch_size: int = EMBEDDING_BATCH_SIZE) -> int:
+    """Encode every activity and replace the store; returns the number of vectors."""
+    if np is None:
+        raise RuntimeError('NumPy is required for the activity embedding store')
+    from activities.models import Activity
+
+    encoder = warm_encoder()
+    ids: List[int] = []
+    chunks = []
+    batch: List[Tuple[int, str, str]] = []
+    for row in Activity.objects.order_by('id').values_list('id', 'title', 'description').iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            ids.extend(row[0] for row in batch)
+            chunks.append(np.asarray(_encode_rows(encoder, batch), dtype=np.float32))
+            batch = []
+    if batch:
+        ids.extend(row[0] for row in batch)
+        chunks.append(np.asarray(_encode_rows(encoder, batch), dtype=np.float32))
+    vectors = np.vstack(chunks) if chunks else np.zeros((0, encoder.dimension), dtype=np.float32)
+    activity_store().replace_all(ids, vectors, encoder)
+    return len(ids)
+
+
+def update_activity_embeddings(activity_ids: Iterable[int]) -> None:
+    """Re-encode the given activities (dropping deleted ones) in an existing, compatible store."""
+    from activities.models import Activity
+
+    store = activity_store()
+    if not store.available():
+        return
+    encoder = get_encoder()
+    if encoder is None or not store.matches(encoder):
+        return
+    activity_ids = set(activity_ids)
+    rows = list(Activity.objects.filter(id__in=activity_ids).values_list('id', 'title', 'description'))
+    if rows:
+        store.upsert([row[0] for row in rows], _encode_rows(encoder, rows), encoder)
+    missing = activity_ids - {row[0] for row in rows}
+    if missing:
+        store.remove(missing)
+
+
+# --- incremental updates from signals ----------------------------------------
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending: Set[int] = set()
+_pending_lock = threading.Lock()
+
+
+def schedule_activity_embedding(activity_id: int) -> None:
+    """Re-embed an activity on the background thread once the current transaction commits."""
+    if not getattr(settings, 'RECOMMENDER_STORE_SYNC', True) or np is None:
+        return
+    transaction.on_commit(lambda: _submit(activity_id))
+
+
+def _submit(activity_id: int) -> None:
+    global _executor
+    with _pending_lock:
+        first = not _pending
+        _pending.add(activity_id)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='activity-embeddings')
+    if first:
+        _executor.submit(_flush_in_background)
+
+
+def _flush_in_background() -> None:
+    with _pending_lock:
+        activity_ids = set(_pending)
+        _pending.clear()
+    try:
+        update_activity_embeddings(activity_ids)
+    except Exception:
+        logger.exception('Updating activity embeddings failed')
+    finally:
+        connection.close()
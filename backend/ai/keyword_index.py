@@ -0,0 +1,329 @@
+"""BM25 keyword index over activity text; the recommender path that needs no model.
+
+Documents are tokenized once (ASCII words plus character bigrams for Chinese
+runs) into per-term postings. Each term's postings are compiled lazily into
+NumPy ``(rows, tf)`` arrays, so a query is one vectorized BM25 update per query
+term. Edits only recompile the terms the changed document touched.
+
+The activity index is built per process on first use and patched on commit by
+the activity signals. Other processes notice the change through a shared
+version and rebuild on their next query; it is bumped atomically, so a process
+only patches in place when nobody else wrote in between. The version lives in
+the cache when the backend is shared, and otherwise in a small file under
+``RECOMMENDER_STORE_DIR`` that every worker on the host can see (a LocMem
+entry would be invisible to other workers). It never expires, so an unchanged
+index is never rebuilt.
+"""
+
+import math
+import os
+import re
+import threading
+import time as _time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from common.caching import cache_is_shared
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+KEYWORD_INDEX_VERSION_KEY = 'activity-keyword-index:version'
+
+_CJK_RANGES = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_WORD_RE = re.compile(rf"[a-z0-9]+(?:['\u2019][a-z]+)?|[{_CJK_RANGES}]+")
+_CJK_RE = re.compile(rf'[{_CJK_RANGES}]')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased ASCII words (2+ chars) and overlapping bigrams of each Chinese run."""
+    tokens: List[str] = []
+    for match in _WORD_RE.findall((text or '').lower()):
+        if _CJK_RE.match(match):
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        elif len(match) > 1:
+            tokens.append(match)
+    return tokens
+
+
+class KeywordIndex:
+    """Mutable BM25 index keyed by integer document id."""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        if np is None:
+            raise RuntimeError('NumPy is required for the keyword index')
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._postings: List[Dict[int, int]] = []  # term id -> {row: tf}
+        self._compiled: Dict[int, Tuple['np.ndarray', 'np.ndarray']] = {}
+        self._doc_terms: Dict[int, Dict[int, int]] = {}  # row -> {term id: tf}
+        self._row_of: Dict[int, int] = {}
+        self._ids = np.full(64, -1, dtype=np.int64)
+        self._lengths = np.zeros(64, dtype=np.float32)
+        self._free_rows: List[int] = []
+        self._next_row = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._row_of
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._vocab.get(term)
+        if term_id is None:
+            term_id = self._vocab[term] = len(self._postings)
+            self._terms.append(term)
+            self._postings.append({})
+        return term_id
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        row = self._next_row
+        self._next_row += 1
+        if row >= len(self._ids):
+            grow = len(self._ids)
+            self._ids = np.concatenate([self._ids, np.full(grow, -1, dtype=np.int64)])
+            self._lengths = np.concatenate([self._lengths, np.zeros(grow, dtype=np.float32)])
+        return row
+
+    def upsert(self, doc_id: int, tokens: Sequence[str]) -> None:
+        with self._lock:
+            self.remove(doc_id)
+            counts = Counter(tokens)
+            row = self._allocate_row()
+            terms = {self._term_id(term): tf for term, tf in counts.items()}
+            for term_id, tf in terms.items():
+                self._postings[term_id][row] = tf
+                self._compiled.pop(term_id, None)
+            self._doc_terms[row] = terms
+            self._row_of[doc_id] = row
+            self._ids[row] = doc_id
+            length = sum(counts.values())
+            self._lengths[row] = length
+            self._total_length += length
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            row = self._row_of.pop(doc_id, None)
+            if row is None:
+                return
+            for term_id in self._doc_terms.pop(row):
+                del self._postings[term_id][row]
+                self._compiled.pop(term_id, None)
+            self._total_length -= int(self._lengths[row])
+            self._ids[row] = -1
+            self._lengths[row] = 0
+            self._free_rows.append(row)
+
+    def _arrays(self, term_id: int):
+        arrays = self._compiled.get(term_id)
+        if arrays is None:
+            postings = self._postings[term_id]
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings)),
+            )
+            self._compiled[term_id] = arrays
+        return arrays
+
+    def document_terms(self, doc_id: int) -> Optional[Dict[str, int]]:
+        """Stored term frequencies for a document (used to query "more like this")."""
+        with self._lock:
+            row = self._row_of.get(doc_id)
+            if row is None:
+                return None
+            return {self._terms[term_id]: tf for term_id, tf in self._doc_terms[row].items()}
+
+    def scores(self, query_terms: Dict[str, int]):
+        """BM25 score for every row (zeros for rows matching no query term)."""
+        with self._lock:
+            n_docs = len(self._row_of)
+            scores = np.zeros(self._next_row, dtype=np.float32)
+            if not n_docs:
+                return scores
+            avg_length = self._total_length / n_docs or 1.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[:self._next_row] / avg_length)
+            for term, query_tf in query_terms.items():
+                term_id = self._vocab.get(term)
+                if term_id is None or not self._postings[term_id]:
+                    continue
+                rows, tf = self._arrays(term_id)
+                df = len(rows)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                scores[rows] += query_tf * idf * tf * (self.k1 + 1) / (tf + norm[rows])
+            return scores
+
+    def score_documents(self, query_terms: Dict[str, int], doc_ids: Iterable[int]) -> Dict[int, float]:
+        """BM25 scores for the given documents only (missing ids are skipped)."""
+        with self._lock:
+            scores = self.scores(query_terms)
+            return {doc_id: float(scores[self._row_of[doc_id]]) for doc_id in doc_ids if doc_id in self._row_of}
+
+    def search(self, query_terms: Dict[str, int], top_k: int = 5, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top ``top_k`` (doc id, score) pairs with a positive score, best first."""
+        with self._lock:
+            scores = self.scores(query_terms)
+            for doc_id in exclude:
+                row = self._row_of.get(doc_id)
+                if row is not None:
+                    scores[row] = 0
+            ids = self._ids[:self._next_row].copy()
+        candidates = np.flatnonzero(scores > 0)
+        if top_k <= 0 or not len(candidates):
+            return []
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        ranked = sorted(candidates.tolist(), key=lambda row: (-scores[row], ids[row]))
+        return [(int(ids[row]), float(scores[row])) for row in ranked]
+
+
+def query_terms(text: str) -> Dict[str, int]:
+    return dict(Counter(tokenize(text)))
+
+
+# --- activity index ------------------------------------------------------------
+
+
+def activity_tokens(title: str, description: str, title_i18n: Optional[dict], description_i18n: Optional[dict]) -> List[str]:
+    """Tokens for one activity: source text plus every stored translation (en/zh)."""
+    texts = {title or '', description or ''}
+    for translations in (title_i18n, description_i18n):
+        if isinstance(translations, dict):
+            texts.update(value for value in translations.values() if isinstance(value, str))
+    return [token for text in sorted(texts) for token in tokenize(text)]
+
+
+_ACTIVITY_FIELDS = ('id', 'title', 'description', 'title_i18n', 'description_i18n')
+
+_activity_index: Optional[KeywordIndex] = None
+_activity_version = None
+_activity_lock = threading.Lock()
+
+
+def _version_path() -> str:
+    from .embedding_store import store_dir
+
+    return os.path.join(store_dir(), 'activity-keyword-index.version')
+
+
+def _read_version_file(path: str) -> Optional[int]:
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _bump_version_file(path: str) -> int:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.lock', 'a+') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            current = _read_version_file(path)
+            # A fresh timestamp never repeats a version from a deleted file.
+            version = _time.time_ns() if current is None else current + 1
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='ascii') as f:
+                f.write(str(version))
+            os.replace(tmp_path, path)
+            return version
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _current_version():
+    if not cache_is_shared():
+        path = _version_path()
+        version = _read_version_file(path)
+        return _bump_version_file(path) if version is None else version
+    version = cache.get(KEYWORD_INDEX_VERSION_KEY)
+    if version is None:
+        # A fresh timestamp never repeats a version that was evicted.
+        cache.add(KEYWORD_INDEX_VERSION_KEY, _time.time_ns(), None)
+        version = cache.get(KEYWORD_INDEX_VERSION_KEY)
+    return version
+
+
+def _bump_version() -> int:
+    if not cache_is_shared():
+        return _bump_version_file(_version_path())
+    try:
+        return cache.incr(KEYWORD_INDEX_VERSION_KEY)
+    except ValueError:
+        _current_version()
+        return cache.incr(KEYWORD_INDEX_VERSION_KEY)
+
+
+def _build_activity_index() -> KeywordIndex:
+    from activities.models import Activity
+
+    index = KeywordIndex()
+    for activity_id, *text in Activity.objects.values_list(*_ACTIVITY_FIELDS).iterator(chunk_size=2000):
+        index.upsert(activity_id, activity_tokens(*text))
+    return index
+
+
+def activity_keyword_index() -> Optional[KeywordIndex]:
+    """This process's activity index, (re)built when another process changed activities; None without NumPy."""
+    global _activity_index, _activity_version
+    if np is None:
+        return None
+    version = _current_version()
+    if _activity_index is not None and version == _activity_version:
+        return _activity_index
+    with _activity_lock:
+        if _activity_index is None or version != _activity_version:
+            _activity_index = _build_activity_index()
+            _activity_version = version
+        return _activity_index
+
+
+def _apply_activity_changes(activity_ids: Iterable[int]) -> None:
+    """Patch the local index in place and bump the shared version for other processes."""
+    global _activity_version
+    from activities.models import Activity
+
+    activity_ids = set(activity_ids)
+    with _activity_lock:
+        version = _bump_version()
+        if _activity_index is None or _activity_version is None or version != _activity_version + 1:
+            # Not built yet, or another process bumped since our last sync: the next query rebuilds.
+            return
+        rows = Activity.objects.filter(id__in=activity_ids).values_list(*_ACTIVITY_FIELDS)
+        seen = set()
+        for activity_id, *text in rows:
+            _activity_index.upsert(activity_id, activity_tokens(*text))
+            seen.add(activity_id)
+        for activity_id in activity_ids - seen:
+            _activity_index.remove(activity_id)
+        _activity_version = version
+
+
+def note_activities_changed(activity_ids: Iterable[int]) -> None:
+    """Called from signals; applies the change once the surrounding transaction commits."""
+    activity_ids = list(activity_ids)
+    transaction.on_commit(lambda: _apply_activity_changes(activity_ids))
+
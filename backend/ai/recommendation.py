@@ -1,18 +1,137 @@
 """Lightweight recommendation placeholder.
 
 Uses sentence-transformers embeddings (install optional dependency) to find similar activities.
-Falls back to simple keyword overlap if model not available.
+Falls back to BM25 keyword scoring (see ``keyword_index``) if model not available,
+and to simple keyword overlap when NumPy is missing as well.
+
+The encoder is resolved lazily from ``RECOMMENDER_ENCODER`` on first use (or by
+``manage.py warm_recommender``), so importing this module never loads a model.
+Candidates that are activity titles reuse their vectors from the persisted
+``embedding_store``; only the query and any other strings are encoded per call.
+The BM25 fallback likewise scores activity titles on the shared activity index
+and keeps a small LRU of indexes for other candidate lists.
 """
 
-from typing import List
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Protocol, Sequence
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from common.translation import LRUCache
+from .keyword_index import KeywordIndex, activity_keyword_index, np, query_terms, tokenize
 
-try:
-    from sentence_transformers import SentenceTransformer, util  # type: ignore
-    _MODEL = SentenceTransformer("all-MiniLM-L6-v2")
-except Exception:  # pragma: no cover
-    _MODEL = None
+logger = logging.getLogger(__name__)
 
 KEYWORD_SPLIT_CHARS = [',', ';', '\n']
+CANDIDATE_INDEX_CACHE_SIZE = 32
+
+_candidate_indexes = LRUCache(CANDIDATE_INDEX_CACHE_SIZE)
+
+
+class Encoder(Protocol):
+    """Turns texts into unit-length vectors of ``dimension`` floats."""
+
+    name: str
+    dimension: int
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        ...
+
+
+class SentenceTransformerEncoder:
+    """sentence-transformers model loaded from ``RECOMMENDER_MODEL_PATH`` (hub name or local dir)."""
+
+    def __init__(self, model_path: Optional[str] = None):
+        from sentence_transformers import SentenceTransformer  # type: ignore
+
+        self.name = model_path or getattr(settings, 'RECOMMENDER_MODEL_PATH', 'all-MiniLM-L6-v2')
+        self._model = SentenceTransformer(self.name)
+        self.dimension = int(self._model.get_sentence_embedding_dimension())
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = self._model.encode(list(texts), normalize_embeddings=True, show_progress_bar=False)
+        return vectors.tolist()
+
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]')
+
+
+class HashingEncoder:
+    """Deterministic offline encoder for tests and local development.
+
+    Words and CJK characters are hashed into signed buckets, so equal texts
+    always map to equal vectors and shared tokens raise cosine similarity.
+    """
+
+    name = 'hashing'
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self._encode_one(text) for text in texts]
+
+    def _encode_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for token in _TOKEN_RE.findall((text or '').lower()):
+            digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+
+_encoder: Optional[Encoder] = None
+_encoder_lock = threading.Lock()
+# After a failed load, report "no encoder" until this monotonic time instead of
+# retrying the (slow) load on every call; a later call tries again.
+_retry_after = 0.0
+
+
+def get_encoder() -> Optional[Encoder]:
+    """Return the configured encoder, loading it once per process; None if unavailable."""
+    global _encoder, _retry_after
+    if _encoder is not None:
+        return _encoder
+    if time.monotonic() < _retry_after:
+        return None
+    with _encoder_lock:
+        if _encoder is None and time.monotonic() >= _retry_after:
+            try:
+                _encoder = _load_encoder()
+            except Exception:
+                logger.warning('Recommender encoder unavailable; using keyword overlap', exc_info=True)
+                _retry_after = time.monotonic() + getattr(settings, 'RECOMMENDER_FAILURE_BACKOFF', 300)
+        return _encoder
+
+
+def warm_encoder() -> Encoder:
+    """Load the encoder now (ignoring any failure backoff) and return it; raises on failure."""
+    global _encoder, _retry_after
+    with _encoder_lock:
+        if _encoder is None:
+            _encoder = _load_encoder()
+            _retry_after = 0.0
+        return _encoder
+
+
+def set_encoder(encoder: Optional[Encoder]) -> None:
+    """Install an encoder directly (tests), or drop the loaded one with ``None``."""
+    global _encoder, _retry_after
+    with _encoder_lock:
+        _encoder = encoder
+        _retry_after = 0.0
+
+
+def _load_encoder() -> Encoder:
+    factory = import_string(getattr(settings, 'RECOMMENDER_ENCODER', 'ai.recommendation.SentenceTransformerEncoder'))
+    return factory()
 
 
 def _keywords(text: str) -> List[str]:
@@ -21,12 +140,76 @@ def _keywords(text: str) -> List[str]:
     return [w.lower() for w in text.split() if len(w) > 3]
 
 
+def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _activity_ids_by_title(candidates: Sequence[str]) -> Dict[str, int]:
+    """Map the candidates that are activity titles to an activity id (the oldest on duplicates)."""
+    from activities.models import Activity
+
+    found: Dict[str, int] = {}
+    rows = Activity.objects.filter(title__in=set(candidates)).order_by('id').values_list('title', 'id')
+    for candidate, activity_id in rows:
+        found.setdefault(candidate, activity_id)
+    return found
+
+
+def _embedding_scores(encoder: Encoder, title: str, candidates: Sequence[str]) -> List[float]:
+    """Cosine of every candidate to ``title``, reusing stored activity vectors where possible."""
+    from .embedding_store import activity_store
+
+    store = activity_store()
+    stored: Dict[str, Sequence[float]] = {}
+    if store.matches(encoder):
+        by_title = _activity_ids_by_title(candidates)
+        found, vectors = store.vectors_for(by_title.values())
+        rows = dict(zip(found, vectors if found else []))
+        stored = {candidate: rows[activity_id] for candidate, activity_id in by_title.items() if activity_id in rows}
+    fresh = [candidate for candidate in dict.fromkeys(candidates) if candidate not in stored]
+    query_vec, *fresh_vecs = encoder.encode([title, *fresh])
+    vectors = {**dict(zip(fresh, fresh_vecs)), **stored}
+    # Encoders return unit vectors, so the dot product is the cosine similarity
+    if np is not None:
+        matrix = np.asarray([vectors[candidate] for candidate in candidates], dtype=np.float32)
+        return (matrix @ np.asarray(query_vec, dtype=np.float32)).tolist()
+    return [_dot(query_vec, vectors[candidate]) for candidate in candidates]
+
+
+def _candidate_index(candidates: Sequence[str]) -> KeywordIndex:
+    """BM25 index over arbitrary candidate strings (doc id = position), reused for repeated lists."""
+    key = tuple(candidates)
+    index = _candidate_indexes.get(key)
+    if index is None:
+        index = KeywordIndex()
+        for position, candidate in enumerate(key):
+            index.upsert(position, tokenize(candidate))
+        _candidate_indexes.set(key, index)
+    return index
+
+
+def _keyword_scores(title: str, candidates: Sequence[str]) -> List[float]:
+    """BM25 score of every candidate; activity titles are scored on the shared activity index."""
+    terms = query_terms(title)
+    shared = activity_keyword_index()
+    if shared is not None:
+        by_title = _activity_ids_by_title(candidates)
+        if len(by_title) == len(set(candidates)):
+            scores = shared.score_documents(terms, set(by_title.values()))
+            return [scores.get(by_title[candidate], 0.0) for candidate in candidates]
+    scores = _candidate_index(candidates).score_documents(terms, range(len(candidates)))
+    return [scores[position] for position in range(len(candidates))]
+
+
 def similar_titles(title: str, candidates: List[str], top_k: int = 5) -> List[str]:
-    if _MODEL:
-        query_vec = _MODEL.encode(title, convert_to_tensor=True)
-        cand_vecs = _MODEL.encode(candidates, convert_to_tensor=True)
-        scores = util.cos_sim(query_vec, cand_vecs)[0]
-        paired = list(zip(candidates, scores.tolist()))
+    encoder = get_encoder()
+    if encoder is not None and candidates:
+        paired = list(zip(candidates, _embedding_scores(encoder, title, candidates)))
+        paired.sort(key=lambda x: x[1], reverse=True)
+        return [p[0] for p in paired[:top_k]]
+    if np is not None and candidates:
+        # Fallback: BM25; unmatched candidates keep their input order
+        paired = list(zip(candidates, _keyword_scores(title, candidates)))
         paired.sort(key=lambda x: x[1], reverse=True)
         return [p[0] for p in paired[:top_k]]
     # Fallback: keyword overlap
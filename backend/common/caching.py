@@ -0,0 +1,27 @@
+"""Cache timeouts that stay safe on process-local backends.
+
+Invalidation (signals, management commands) only reaches other processes
+through a shared backend such as Redis or Memcached. On LocMem each gunicorn
+worker keeps its own copy, so entries there are capped at
+``LOCAL_CACHE_MAX_TIMEOUT`` seconds to bound how long a worker can serve
+stale data.
+"""
+
+from django.conf import settings
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared() -> bool:
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def bounded_timeout(timeout):
+    """``timeout`` on a shared backend, else at most ``LOCAL_CACHE_MAX_TIMEOUT`` (``None`` counts as forever)."""
+    if cache_is_shared():
+        return timeout
+    limit = getattr(settings, 'LOCAL_CACHE_MAX_TIMEOUT', 30)
+    return limit if timeout is None else min(timeout, limit)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from common.translation_queue import drain_pending
+
+
+class Command(BaseCommand):
+    help = "Translate queued title/description fields (TranslationJob rows) in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Jobs per translation batch (default: 100)')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches (default: drain everything)')
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry jobs that exhausted their attempts')
+
+    def handle(self, *args, **options):
+        processed = drain_pending(
+            batch_size=max(options['batch_size'], 1),
+            max_batches=options['max_batches'],
+            include_failed=options['retry_failed'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} translation jobs.'))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.recommendation import warm_encoder
+
+
+class Command(BaseCommand):
+    help = "Load the recommender encoder (RECOMMENDER_ENCODER / RECOMMENDER_MODEL_PATH) and run one encode to verify it."
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            encoder = warm_encoder()
+            encoder.encode(['warm-up'])
+        except Exception as exc:
+            raise CommandError(f'Recommender encoder failed to load: {exc}') from exc
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Recommender encoder {encoder.name} ready ({encoder.dimension} dims) in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,47 @@
+from django.db import models
+
+
+class TranslationMemo(models.Model):
+    """Persisted translation keyed by (sha256 of source text, source, target)."""
+    text_hash = models.CharField(max_length=64)
+    source = models.CharField(max_length=16)
+    target = models.CharField(max_length=16)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['text_hash', 'source', 'target'], name='unique_translation_memo'),
+        ]
+
+    def __str__(self):
+        return f"TranslationMemo({self.source}->{self.target}: {self.source_text[:30]})"
+
+
+class TranslationJob(models.Model):
+    """Queued translation of a model field (or a bare string when model_label is blank).
+
+    Drained by ``common.translation_queue.drain_pending``, either from the
+    background thread kicked after a save or the ``translate_pending`` command.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    model_label = models.CharField(max_length=100, blank=True, help_text="app_label.ModelName, blank for memo-only jobs")
+    object_id = models.CharField(max_length=64, blank=True)
+    field = models.CharField(max_length=64, blank=True, help_text="Source field; the result is written to <field>_i18n")
+    source_text = models.TextField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending', db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        target = f"{self.model_label}#{self.object_id}.{self.field}" if self.model_label else 'memo'
+        return f"TranslationJob({target}, {self.status})"
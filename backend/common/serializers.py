@@ -0,0 +1,51 @@
+from rest_framework import serializers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class DynamicFieldsMixin:
+    """Let GET clients trim the top-level serializer with ``?fields=`` and ``?expand=``.
+
+    ``fields=id,status`` keeps only the named fields. ``expand=student`` keeps the
+    named nested serializers expanded and collapses every other nested serializer
+    to the related primary key. Without ``expand`` everything stays expanded, so
+    existing clients see the same payload as before.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self._is_root_serializer():
+            return fields
+
+        params = getattr(request, 'query_params', request.GET)
+        if 'fields' in params:
+            wanted = _split_param(params.get('fields'))
+            if wanted:
+                fields = {name: field for name, field in fields.items() if name in wanted}
+
+        if 'expand' in params:
+            expand = _split_param(params.get('expand'))
+            for name, field in list(fields.items()):
+                if isinstance(field, serializers.BaseSerializer) and name not in expand:
+                    fields[name] = _primary_key_field(name, field)
+        return fields
+
+    def _is_root_serializer(self) -> bool:
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+def _split_param(raw) -> set:
+    return {part.strip() for part in (raw or '').split(',') if part.strip()}
+
+
+def _primary_key_field(name: str, field: serializers.BaseSerializer) -> serializers.Field:
+    kwargs = {'read_only': True}
+    if field.source and field.source != name:
+        kwargs['source'] = field.source
+    if isinstance(field, serializers.ListSerializer):
+        kwargs['many'] = True
+    return serializers.PrimaryKeyRelatedField(**kwargs)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent with sender=<model class> and object_ids=[...] after background
+# translations were written to <field>_i18n via queryset.update().
+translations_applied = Signal()
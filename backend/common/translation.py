@@ -1,19 +1,64 @@
+import hashlib
 import json
+import threading
+import time
 import urllib.request
-import urllib.error
-from typing import Optional
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from django.conf import settings
+from django.db import DatabaseError
+from django.utils.module_loading import import_string
 
 
-def translate_text(text: str, target: str, source: str = 'auto') -> Optional[str]:
-    """
-    Translate text to target language using LibreTranslate-compatible API.
-    Returns translated text, or None on fatal error.
-    """
-    if not text:
-        return ''
+class LRUCache:
+    """Small thread-safe LRU map used in front of the translation memo table."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_CACHE = LRUCache(getattr(settings, 'TRANSLATION_CACHE_SIZE', 4096))
+# After a failed API call, skip the network until this monotonic time so an
+# unreachable translator cannot stall every request by the full timeout.
+_backoff_until = 0.0
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def libretranslate_batch(texts: List[str], target: str, source: str) -> Optional[List[str]]:
+    """POST one batch to the LibreTranslate-compatible API; None on any failure."""
+    global _backoff_until
+    if time.monotonic() < _backoff_until:
+        return None
     data = json.dumps({
-        'q': text,
+        'q': texts,
         'source': source,
         'target': target,
         **({'api_key': settings.TRANSLATE_API_KEY} if getattr(settings, 'TRANSLATE_API_KEY', '') else {})
@@ -24,19 +69,167 @@ def translate_text(text: str, target: str, source: str = 'auto') -> Optional[str
         headers={'Content-Type': 'application/json'}
     )
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
+        with urllib.request.urlopen(req, timeout=getattr(settings, 'TRANSLATE_TIMEOUT', 10)) as resp:
             payload = json.loads(resp.read().decode('utf-8'))
-            # LibreTranslate returns { "translatedText": "..." }
-            return payload.get('translatedText') or payload.get('translated_text')
-    except urllib.error.HTTPError as e:
+    except Exception:
         # Log-able in real app; here we swallow to avoid breaking saves
+        _backoff_until = time.monotonic() + getattr(settings, 'TRANSLATE_FAILURE_BACKOFF', 60)
         return None
-    except Exception:
+    # LibreTranslate returns { "translatedText": "..." } or a list when q is a list
+    translated = payload.get('translatedText') or payload.get('translated_text')
+    if isinstance(translated, str):
+        translated = [translated]
+    if not isinstance(translated, list) or len(translated) != len(texts):
         return None
+    return translated
+
+
+def translation_backoff_active() -> bool:
+    """True while a recent backend failure makes ``libretranslate_batch`` skip the network."""
+    return time.monotonic() < _backoff_until
+
+
+def stub_translate_batch(texts: List[str], target: str, source: str) -> Optional[List[str]]:
+    """Deterministic offline backend for tests and local development."""
+    return [f'[{target}] {text}' for text in texts]
+
+
+def get_translator():
+    """Resolve the TRANSLATION_BACKEND setting to a ``(texts, target, source)`` callable."""
+    return import_string(getattr(settings, 'TRANSLATION_BACKEND', 'common.translation.libretranslate_batch'))
+
+
+def _load_memos(texts: Iterable[str], target: str, source: str) -> Dict[str, str]:
+    from .models import TranslationMemo
+
+    by_hash = {_text_hash(text): text for text in texts}
+    try:
+        rows = TranslationMemo.objects.filter(
+            text_hash__in=list(by_hash), source=source, target=target
+        ).values_list('text_hash', 'translated_text')
+        return {by_hash[text_hash]: translated for text_hash, translated in rows}
+    except DatabaseError:
+        # Memo table missing (e.g. before migrate); behave as a cold cache.
+        return {}
+
+
+def _store_memos(pairs: Dict[str, str], target: str, source: str) -> None:
+    from .models import TranslationMemo
+
+    memos = [
+        TranslationMemo(
+            text_hash=_text_hash(text), source=source, target=target,
+            source_text=text, translated_text=translated,
+        )
+        for text, translated in pairs.items()
+    ]
+    try:
+        TranslationMemo.objects.bulk_create(memos, ignore_conflicts=True)
+    except DatabaseError:
+        pass
+
+
+def _cached_translations(texts: Sequence[str], target: str, source: str) -> Tuple[Dict[str, Optional[str]], List[str]]:
+    """Resolve texts from the LRU and then the memo table; return (found, still_missing)."""
+    results: Dict[str, Optional[str]] = {'': ''}
+    missing: List[str] = []
+    for text in dict.fromkeys(texts):
+        if not text:
+            continue
+        cached = _CACHE.get((text, source, target))
+        if cached is not None:
+            results[text] = cached
+        else:
+            missing.append(text)
+
+    if missing:
+        for text, translated in _load_memos(missing, target, source).items():
+            results[text] = translated
+            _CACHE.set((text, source, target), translated)
+        missing = [text for text in missing if text not in results]
+    return results, missing
+
+
+def translate_many(texts: Sequence[str], target: str, source: str = 'auto') -> List[Optional[str]]:
+    """
+    Translate many strings to ``target``, consulting the LRU, then the memo table,
+    and only sending unseen strings to the backend in batches of TRANSLATE_BATCH_SIZE.
+    Returns a list aligned with ``texts``; entries are None where translation failed.
+    """
+    results, missing = _cached_translations(texts, target, source)
+
+    translator = get_translator()
+    batch_size = max(getattr(settings, 'TRANSLATE_BATCH_SIZE', 50), 1)
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        translated = translator(batch, target, source)
+        if translated is None:
+            continue
+        fresh = {text: value for text, value in zip(batch, translated) if value}
+        _store_memos(fresh, target, source)
+        for text, value in fresh.items():
+            results[text] = value
+            _CACHE.set((text, source, target), value)
+
+    return [results.get(text or '') for text in texts]
+
+
+def lookup_many(texts: Sequence[str], target: str, source: str = 'auto') -> List[Optional[str]]:
+    """Like ``translate_many`` but never calls the backend; unseen texts come back as None."""
+    results, _ = _cached_translations(texts, target, source)
+    return [results.get(text or '') for text in texts]
+
+
+def translate_text(text: str, target: str, source: str = 'auto') -> Optional[str]:
+    """
+    Translate text to target language using LibreTranslate-compatible API.
+    Returns translated text, or None on fatal error.
+    """
+    if not text:
+        return ''
+    return translate_many([text], target, source)[0]
+
+
+def ensure_en_zh_many(texts: Sequence[str]) -> List[dict]:
+    """Return ``{'en': ..., 'zh': ...}`` for each text, falling back to the source text."""
+    en = translate_many(texts, 'en')
+    zh = translate_many(texts, 'zh')
+    return [
+        {'en': en_text or text, 'zh': zh_text or text}
+        for text, en_text, zh_text in zip(texts, en, zh)
+    ]
+
+
+def lookup_en_zh_many(texts: Sequence[str]) -> List[Optional[dict]]:
+    """Memoised ``{'en', 'zh'}`` pairs without touching the network; None when either is unseen."""
+    en = lookup_many(texts, 'en')
+    zh = lookup_many(texts, 'zh')
+    return [
+        {'en': en_text, 'zh': zh_text} if en_text is not None and zh_text is not None else None
+        for en_text, zh_text in zip(en, zh)
+    ]
 
 
 def ensure_en_zh(text: str) -> dict:
     """Return a dict with 'en' and 'zh' translations for the given text."""
-    en = translate_text(text, 'en') or text
-    zh = translate_text(text, 'zh') or text
-    return {'en': en, 'zh': zh}
+    return ensure_en_zh_many([text])[0]
+
+
+def request_language(request) -> str:
+    """'zh' or 'en' from the ?lang= override, else the Accept-Language header."""
+    # derive language code: default to 'en' or 'zh'
+    lang = 'en'
+    if request is None:
+        return lang
+    # Accept-Language like 'zh-CN,zh;q=0.9'
+    accept = request.META.get('HTTP_ACCEPT_LANGUAGE', '').lower()
+    if 'zh' in accept:
+        lang = 'zh'
+    elif 'en' in accept:
+        lang = 'en'
+    # query param override
+    params = getattr(request, 'query_params', request.GET)
+    qp = params.get('lang')
+    if qp:
+        lang = 'zh' if qp.lower().startswith('zh') else 'en'
+    return lang
@@ -0,0 +1,174 @@
+"""Background translation pipeline.
+
+Saves fill ``<field>_i18n`` with the source text as a fallback and enqueue a
+``TranslationJob``; the request returns immediately. Jobs are drained in
+batches by a single background thread (``TRANSLATION_ASYNC``) or by the
+``translate_pending`` management command.
+"""
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import TranslationJob
+from .signals import translations_applied
+from .translation import translate_many, translation_backoff_active
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+_executor: Optional[ThreadPoolExecutor] = None
+_drain_queued = False
+_lock = threading.Lock()
+
+
+def apply_i18n_fallbacks(instance, fields: Sequence[str]) -> List[str]:
+    """Fill missing or outdated ``<field>_i18n`` values with the source text.
+
+    Returns the fields whose i18n value is still the untranslated fallback and
+    therefore need a job. An edited source text resets its translations unless
+    the caller supplied new ones alongside it.
+    """
+    previous: Dict = {}
+    if instance.pk:
+        i18n_fields = [f'{field}_i18n' for field in fields]
+        previous = type(instance).objects.filter(pk=instance.pk).values(*fields, *i18n_fields).first() or {}
+
+    stale = []
+    for field in fields:
+        text = getattr(instance, field) or ''
+        if not text:
+            continue
+        i18n_attr = f'{field}_i18n'
+        current = getattr(instance, i18n_attr) or {}
+        edited = bool(previous) and previous.get(field) != text and previous.get(i18n_attr) == current
+        if not current or edited:
+            current = {'en': text, 'zh': text}
+            setattr(instance, i18n_attr, current)
+        if current.get('en') == text and current.get('zh') == text:
+            stale.append(field)
+    return stale
+
+
+def enqueue_field_translations(instance, fields: Sequence[str]) -> None:
+    label = instance._meta.label
+    object_id = str(instance.pk)
+    jobs = [
+        TranslationJob(model_label=label, object_id=object_id, field=field, source_text=getattr(instance, field))
+        for field in fields
+        if getattr(instance, field)
+    ]
+    if not jobs:
+        return
+    # A newer edit supersedes whatever was still waiting for the same field.
+    TranslationJob.objects.filter(
+        model_label=label, object_id=object_id, field__in=[job.field for job in jobs], status='pending'
+    ).delete()
+    TranslationJob.objects.bulk_create(jobs)
+    schedule_drain()
+
+
+def enqueue_texts(texts: Iterable[str]) -> None:
+    """Queue bare strings so later lookups hit the memo table."""
+    texts = [text for text in dict.fromkeys(texts) if text]
+    if not texts:
+        return
+    known = set(
+        TranslationJob.objects.filter(model_label='', source_text__in=texts)
+        .exclude(status='done')
+        .values_list('source_text', flat=True)
+    )
+    jobs = [TranslationJob(source_text=text) for text in texts if text not in known]
+    if jobs:
+        TranslationJob.objects.bulk_create(jobs)
+        schedule_drain()
+
+
+def process_jobs(jobs: List[TranslationJob]) -> None:
+    # During a backoff the backend is never reached, so misses are not real attempts.
+    backing_off = translation_backoff_active()
+    texts = list(dict.fromkeys(job.source_text for job in jobs))
+    en = dict(zip(texts, translate_many(texts, 'en')))
+    zh = dict(zip(texts, translate_many(texts, 'zh')))
+
+    applied = defaultdict(list)
+    changed = []
+    now = timezone.now()
+    for job in jobs:
+        en_text, zh_text = en.get(job.source_text), zh.get(job.source_text)
+        missing = en_text is None or zh_text is None
+        if missing and backing_off:
+            continue
+        job.updated_at = now
+        changed.append(job)
+        if missing:
+            job.attempts += 1
+            job.status = 'failed' if job.attempts >= MAX_ATTEMPTS else 'pending'
+            continue
+        job.status = 'done'
+        if not job.model_label:
+            continue
+        model = apps.get_model(job.model_label)
+        # Only write if the source is unchanged; a later edit has its own job.
+        updated = model.objects.filter(pk=job.object_id, **{job.field: job.source_text}).update(
+            **{f'{job.field}_i18n': {'en': en_text, 'zh': zh_text}}
+        )
+        if updated:
+            applied[model].append(job.object_id)
+
+    TranslationJob.objects.bulk_update(changed, ['status', 'attempts', 'updated_at'])
+    for model, object_ids in applied.items():
+        translations_applied.send(sender=model, object_ids=object_ids)
+
+
+def drain_pending(batch_size: int = 100, max_batches: Optional[int] = None, include_failed: bool = False) -> int:
+    """Process queued jobs in id order; returns how many jobs were handled."""
+    statuses = ['pending', 'failed'] if include_failed else ['pending']
+    processed = 0
+    batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+        jobs = list(TranslationJob.objects.filter(status__in=statuses, id__gt=last_id).order_by('id')[:batch_size])
+        if not jobs:
+            break
+        last_id = jobs[-1].id
+        process_jobs(jobs)
+        processed += len(jobs)
+        batches += 1
+    return processed
+
+
+def schedule_drain() -> None:
+    """Drain the queue on a background thread once the current transaction commits."""
+    if getattr(settings, 'TRANSLATION_ASYNC', True):
+        transaction.on_commit(_submit_drain)
+
+
+def _submit_drain() -> None:
+    global _executor, _drain_queued
+    with _lock:
+        if _drain_queued:
+            return
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='translation')
+        _drain_queued = True
+    _executor.submit(_drain_in_background)
+
+
+def _drain_in_background() -> None:
+    global _drain_queued
+    with _lock:
+        _drain_queued = False
+    try:
+        drain_pending()
+    except Exception:
+        logger.exception('Background translation drain failed')
+    finally:
+        connection.close()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Benchmark the co-participation neighbour build on a synthetic participation matrix.
+
+Generates popularity-skewed (student, activity) pairs, then times the CSR +
+top-k build from ``backend/ai/coparticipation.py``, writing the table to a
+temporary store, and a request-time neighbour lookup. No database is needed.
+
+Usage: python scripts/py/benchmark_coparticipation.py [--students 50000] [--activities 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from ai.coparticipation import DEFAULT_TOP_K, NeighbourStore, top_k_neighbours  # noqa: E402
+
+
+def synthetic_pairs(students: int, activities: int, per_student: float, seed: int):
+    """Poisson-sized histories drawn from a Zipf-like activity popularity."""
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, activities + 1) ** 0.8
+    popularity /= popularity.sum()
+    sizes = rng.poisson(per_student, students)
+    student_idx = np.repeat(np.arange(students), sizes)
+    activity_idx = rng.choice(activities, size=len(student_idx), p=popularity)
+    return student_idx, activity_idx
+
+
+def timed(label: str, func, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:10.1f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--activities", type=int, default=2_000)
+    parser.add_argument("--per-student", type=float, default=8.0, help="Mean participations per student (default: 8)")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--min-support", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per step; the best is reported (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    student_idx, activity_idx = synthetic_pairs(args.students, args.activities, args.per_student, args.seed)
+    print(
+        f"{args.students} students x {args.activities} activities, "
+        f"{len(student_idx)} participations, top {args.top_k}"
+    )
+
+    neighbours, scores = timed(
+        "build (CSR + top-k)",
+        lambda: top_k_neighbours(
+            student_idx, activity_idx, args.students, args.activities, k=args.top_k, min_support=args.min_support
+        ),
+        args.repeat,
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        store = NeighbourStore(directory)
+        ids = np.arange(args.activities)
+        timed("write store", lambda: store.replace_all(ids, neighbours, scores), args.repeat)
+        store.neighbours(0)
+        lookups = 10_000
+        started = time.perf_counter()
+        for activity_id in np.random.default_rng(args.seed).integers(0, args.activities, lookups).tolist():
+            store.neighbours(activity_id, 10)
+        per_lookup = (time.perf_counter() - started) / lookups
+        print(f"{'lookup (top 10)':<28} {per_lookup * 1e6:10.1f} us")
+    filled = int((neighbours >= 0).sum(axis=1).mean()) if len(neighbours) else 0
+    print(f"Average neighbours per activity: {filled}")
+
+
+if __name__ == "__main__":
+    main()
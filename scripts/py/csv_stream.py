@@ -0,0 +1,183 @@
+"""Streaming helpers shared by the csv_to_json_* converters.
+
+Records flow CSV row -> dict -> output line without ever being collected into a
+list: CSVs are converted in parallel into per-file JSONL spool files, the parent
+reads those back in input order, de-duplicates by key and writes JSONL (or an
+incrementally written JSON array) to a file or stdout.
+"""
+
+import os
+import sys
+import csv
+import json
+import glob
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+
+def log(message: str) -> None:
+    """Progress goes to stderr so stdout can carry JSONL into a seed command."""
+    print(message, file=sys.stderr)
+
+
+def find_csvs(csv_folder: str, pattern: str) -> list[str]:
+    return sorted(glob.glob(os.path.join(csv_folder, pattern)))
+
+
+def iter_csv_dicts(csv_path: str):
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def _spool_csv(task) -> tuple[str, str | None, str | None]:
+    """Worker: convert one CSV to a temporary JSONL file; returns (csv, spool path, error)."""
+    convert, csv_path, spool_dir = task
+    fd, spool_path = tempfile.mkstemp(prefix="csv-", suffix=".jsonl", dir=spool_dir)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            for record in convert(csv_path):
+                out.write(json.dumps(record, ensure_ascii=False))
+                out.write("\n")
+    except Exception as e:
+        os.remove(spool_path)
+        return csv_path, None, str(e)
+    return csv_path, spool_path, None
+
+
+def iter_converted(csv_files: list[str], convert, jobs: int = 1):
+    """Yield ``convert(csv_path)`` records for every file, in file order.
+
+    ``convert`` must be a module-level generator function so worker processes
+    can import it. A file that fails is reported and skipped, like before.
+    """
+    if jobs <= 1 or len(csv_files) <= 1:
+        for csv_path in csv_files:
+            log(f"Processing: {csv_path}")
+            try:
+                yield from convert(csv_path)
+            except Exception as e:
+                log(f"Error processing {csv_path}: {e}")
+        return
+
+    with tempfile.TemporaryDirectory(prefix="csv-to-json-") as spool_dir:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            tasks = [(convert, csv_path, spool_dir) for csv_path in csv_files]
+            # map() hands results back in submission order, so output order is stable
+            for csv_path, spool_path, error in pool.map(_spool_csv, tasks):
+                log(f"Processing: {csv_path}")
+                if error is not None:
+                    log(f"Error processing {csv_path}: {error}")
+                    continue
+                with open(spool_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        yield json.loads(line)
+                os.remove(spool_path)
+
+
+def iter_seed_records(path: str):
+    """Stream records from an existing seed file (JSON array or JSONL); missing/empty yields nothing."""
+    if not path or path == "-" or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        content = f.read().strip()
+    if content:
+        yield from json.loads(content)
+
+
+def dedupe(records, key: str, fill_empty: bool = False, complete_fields: tuple = ()):
+    """Drop repeated ``key`` values, keeping the first record.
+
+    With ``fill_empty`` later duplicates fill fields that are still empty. Only
+    records missing one of ``complete_fields`` can still change, so only those
+    are held back until the end; everything else is yielded immediately.
+    """
+    seen: set = set()
+    pending: dict = {}
+    for record in records:
+        record_id = record.get(key)
+        if record_id in pending:
+            held = pending[record_id]
+            for field, value in record.items():
+                if not held.get(field) and value:
+                    held[field] = value
+            if all(held.get(field) for field in complete_fields):
+                yield pending.pop(record_id)
+            continue
+        if record_id in seen:
+            continue
+        seen.add(record_id)
+        if fill_empty and not all(record.get(field) for field in complete_fields):
+            pending[record_id] = record
+        else:
+            yield record
+    yield from pending.values()
+
+
+def output_format(path: str, requested: str | None) -> str:
+    if requested:
+        return requested
+    return "jsonl" if path == "-" or path.endswith(".jsonl") else "json"
+
+
+class RecordWriter:
+    """Write records one at a time as JSONL or as a JSON array.
+
+    Files are written to a temporary sibling and renamed on success, so the
+    output may also be one of the inputs (merging into an existing seed file).
+    """
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._tmp_path = None
+        self._out = None
+
+    def __enter__(self):
+        if self.path == "-":
+            self._out = sys.stdout
+        else:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, self._tmp_path = tempfile.mkstemp(prefix=".seed-", dir=directory)
+            self._out = os.fdopen(fd, "w", encoding="utf-8")
+        if self.fmt == "json":
+            self._out.write("[")
+        return self
+
+    def write(self, record: dict) -> None:
+        if self.fmt == "json":
+            self._out.write(",\n  " if self.count else "\n  ")
+            self._out.write(json.dumps(record, ensure_ascii=False))
+        else:
+            self._out.write(json.dumps(record, ensure_ascii=False))
+            self._out.write("\n")
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.fmt == "json":
+            self._out.write("\n]\n" if self.count else "]\n")
+        if self._out is sys.stdout:
+            self._out.flush()
+            return False
+        self._out.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+        return False
+
+
+def add_stream_arguments(parser, default_output: str, csv_folder: str) -> None:
+    parser.add_argument("--csv-dir", default=csv_folder, help="Folder with registrar CSV exports")
+    parser.add_argument("--output", "-o", default=default_output,
+                        help="Output file; '-' writes JSONL to stdout for piping into a seed command")
+    parser.add_argument("--format", choices=("json", "jsonl"), default=None,
+                        help="Output format (default: from the output extension; stdout is always JSONL)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for converting CSV files (default: all cores)")
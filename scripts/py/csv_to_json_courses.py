@@ -1,9 +1,14 @@
+"""CSV to JSON courses converter for database seeding
+
+Streams course rows from the faculty CSV export into
+backend/accounts/seed_data/courses.json (or JSONL / stdout with --output).
+"""
+
 import os
-import sys
-import csv
-import json
-import glob
 import re
+import argparse
+
+from csv_stream import add_stream_arguments, dedupe, find_csvs, iter_converted, iter_csv_dicts, log, output_format, RecordWriter
 
 
 def parse_class_time(class_time_str):
@@ -59,120 +64,114 @@ def parse_class_time(class_time_str):
     return day_of_week, sorted(list(all_periods)), sorted(list(all_weeks))
 
 
+def iter_course_records(csv_path: str):
+    """Yield one course record per (course code, teacher) row of a faculty CSV."""
+    for row in iter_csv_dicts(csv_path):
+        course_code = row.get("课程代码", "").strip()
+        if not course_code:
+            continue
+        
+        title = row.get("课程名称", "").strip()
+        if not title:
+            continue
+        
+        faculty_id = row.get("教工号", "").strip()
+        if not faculty_id:
+            continue
+        
+        # Extract course-specific information from this row
+        term = f"{row.get('学年', '').strip()}-{row.get('学期', '').strip()}"
+        location = row.get("教学地点", "").strip()
+        course_category = row.get("课程类别", "").strip()
+        course_nature = row.get("课程性质", "").strip()
+        teaching_mode = row.get("上课方式", "").strip()
+        exam_type = row.get("考试形式", "").strip()
+        grading_method = row.get("考核方式", "").strip()
+        credits = row.get("学分", "").strip()
+        department_name = row.get("开课学院", "").strip()
+        campus_name = row.get("校区", "").strip()
+        hours_per_week = row.get("周学时", "").strip()
+        total_course_hours = row.get("课程总学时", "").strip()
+        enrolled_students = row.get("选课人数", "").strip()
+        class_students = row.get("教学班人数", "").strip()
+        capacity = row.get("教学班容量", "").strip()
+        majors = row.get("专业组成", "").strip()
+        grades = row.get("年级组成", "").strip()
+        audience = row.get("面向对象", "").strip()
+        course_type_detail = row.get("课程类型", "").strip()
+        
+        class_time = row.get("上课时间", "").strip()
+        day_of_week, periods, week_pattern = parse_class_time(class_time)
+        
+        # Handle online courses without specific location
+        if not periods and not week_pattern and not location:
+            location = "qq群号：1039827290"
+            day_of_week = -1
+        
+        first_week_monday = "2025-09-08"  # TODO: calculate based on academic year
+        
+        # Handle multiple faculty IDs (comma-separated)
+        faculty_ids = [fid.strip() for fid in faculty_id.split(',') if fid.strip()]
+        
+        for fid in faculty_ids:
+            yield {
+                "key": f"{course_code}-{fid}",
+                "code": course_code,
+                "title": title,
+                "teacher_id": fid,
+                "weekday": day_of_week,
+                "periods": periods,
+                "weeks": week_pattern,
+                "location": location,
+                "term": term,
+                "term_start_date": first_week_monday,
+                "credits": credits,
+                "department_name": department_name,
+                "category": course_category,
+                "nature": course_nature,
+                "teaching_mode": teaching_mode,
+                "exam_type": exam_type,
+                "grading_method": grading_method,
+                "hours_per_week": hours_per_week,
+                "total_course_hours": total_course_hours,
+                "enrolled_students": enrolled_students,
+                "class_students": class_students,
+                "capacity": capacity,
+                "campus_name": campus_name,
+                "majors": majors,
+                "grades": grades,
+                "audience": audience,
+                "course_type_detail": course_type_detail,
+            }
+
+
 def main() -> None:
     # Paths
     script_dir = os.path.dirname(__file__)
     csv_folder = os.path.join(script_dir, "..", "..", "reference", "csv")
     seed_file = os.path.join(script_dir, "..", "..", "backend", "accounts", "seed_data", "courses.json")
+
+    parser = argparse.ArgumentParser(description="Convert the faculty CSV export into course seed records")
+    add_stream_arguments(parser, seed_file, csv_folder)
+    parser.add_argument("--pattern", default="faculty-and-staff-information-form.csv",
+                        help="Glob of CSV files inside --csv-dir that carry course data")
+    args = parser.parse_args()
     
     # Find CSVs - look for faculty CSV which contains course data
-    csv_files = glob.glob(os.path.join(csv_folder, "faculty-and-staff-information-form.csv"))
+    csv_files = find_csvs(args.csv_dir, args.pattern)
     if not csv_files:
-        print(f"No faculty CSV files found in {csv_folder}")
+        log(f"No faculty CSV files found in {args.csv_dir}")
         return
     
-    # Collect courses
-    courses = {}
-    for csv_path in csv_files:
-        print(f"Processing: {csv_path}")
-        try:
-            with open(csv_path, "r", encoding="utf-8-sig") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    course_code = row.get("课程代码", "").strip()
-                    if not course_code:
-                        continue
-                    
-                    title = row.get("课程名称", "").strip()
-                    if not title:
-                        continue
-                    
-                    faculty_id = row.get("教工号", "").strip()
-                    if not faculty_id:
-                        continue
-                    
-                    # Extract course-specific information from this row
-                    term = f"{row.get('学年', '').strip()}-{row.get('学期', '').strip()}"
-                    location = row.get("教学地点", "").strip()
-                    course_category = row.get("课程类别", "").strip()
-                    course_nature = row.get("课程性质", "").strip()
-                    teaching_mode = row.get("上课方式", "").strip()
-                    exam_type = row.get("考试形式", "").strip()
-                    grading_method = row.get("考核方式", "").strip()
-                    credits = row.get("学分", "").strip()
-                    department_name = row.get("开课学院", "").strip()
-                    campus_name = row.get("校区", "").strip()
-                    hours_per_week = row.get("周学时", "").strip()
-                    total_course_hours = row.get("课程总学时", "").strip()
-                    enrolled_students = row.get("选课人数", "").strip()
-                    class_students = row.get("教学班人数", "").strip()
-                    capacity = row.get("教学班容量", "").strip()
-                    majors = row.get("专业组成", "").strip()
-                    grades = row.get("年级组成", "").strip()
-                    audience = row.get("面向对象", "").strip()
-                    course_type_detail = row.get("课程类型", "").strip()
-                    
-                    class_time = row.get("上课时间", "").strip()
-                    day_of_week, periods, week_pattern = parse_class_time(class_time)
-                    
-                    # Handle online courses without specific location
-                    if not periods and not week_pattern and not location:
-                        location = "qq群号：1039827290"
-                        day_of_week = -1
-                    
-                    first_week_monday = "2025-09-08"  # TODO: calculate based on academic year
-                    
-                    # Handle multiple faculty IDs (comma-separated)
-                    faculty_ids = [fid.strip() for fid in faculty_id.split(',') if fid.strip()]
-                    
-                    for fid in faculty_ids:
-                        course_key = f"{course_code}-{fid}"
-                        
-                        if course_key not in courses:
-                            courses[course_key] = {
-                                "code": course_code,
-                                "title": title,
-                                "teacher_id": fid,
-                                "weekday": day_of_week,
-                                "periods": periods,
-                                "weeks": week_pattern,
-                                "location": location,
-                                "term": term,
-                                "term_start_date": first_week_monday,
-                                "credits": credits,
-                                "department_name": department_name,
-                                "category": course_category,
-                                "nature": course_nature,
-                                "teaching_mode": teaching_mode,
-                                "exam_type": exam_type,
-                                "grading_method": grading_method,
-                                "hours_per_week": hours_per_week,
-                                "total_course_hours": total_course_hours,
-                                "enrolled_students": enrolled_students,
-                                "class_students": class_students,
-                                "capacity": capacity,
-                                "campus_name": campus_name,
-                                "majors": majors,
-                                "grades": grades,
-                                "audience": audience,
-                                "course_type_detail": course_type_detail,
-                            }
-        except Exception as e:
-            print(f"Error processing {csv_path}: {e}")
-            continue
-    
-    # Save courses
-    os.makedirs(os.path.dirname(seed_file), exist_ok=True)
-    course_list = list(courses.values())
-    course_list.sort(key=lambda c: c["code"])
-    content = json.dumps(course_list, ensure_ascii=False, indent=2, separators=(',', ':'))
-    # Make arrays compact on one line
-    content = re.sub(r'\[\s*(\d+(?:,\s*\d+)*)\s*\]', lambda m: '[' + re.sub(r'\s+', '', m.group(1)) + ']', content)
-    with open(seed_file, "w", encoding="utf-8") as f:
-        f.write(content)
+    # Stream courses, first row per (code, teacher) wins
+    records = dedupe(iter_converted(csv_files, iter_course_records, args.jobs), "key")
+    with RecordWriter(args.output, output_format(args.output, args.format)) as writer:
+        for course in records:
+            course.pop("key")
+            writer.write(course)
     
-    print(f"Generated {seed_file} with {len(course_list)} courses.")
+    log(f"Generated {args.output} with {writer.count} courses.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,14 +1,16 @@
 """CSV to JSON students converter for database seeding
 
-Automatically processes CSVs in the csv folder and appends unique students to
-backend/accounts/seed_data/students.json
+Streams CSVs in the csv folder and merges unique students into
+backend/accounts/seed_data/students.json (or JSONL / stdout with --output).
 """
 
 import os
-import sys
-import csv
-import json
-import glob
+import argparse
+
+from csv_stream import (
+    add_stream_arguments, dedupe, find_csvs, iter_converted, iter_csv_dicts, iter_seed_records, log,
+    output_format, RecordWriter,
+)
 
 
 # Country translations from Chinese to English
@@ -118,138 +120,114 @@ MAJOR_TRANSLATION = {
 }
 
 
+STUDENT_FIELDS = ('id', 'name', 'gender', 'major', 'chinese_level', 'college', 'class', 'phone', 'country')
+
+
+def iter_student_records(csv_path: str):
+    """Yield one student record per CSV row that has an ID and a name."""
+    for row in iter_csv_dicts(csv_path):
+        # Map to student dict
+        class_full = row.get("班级", "").strip()
+        # Extract major and class number
+        # Assume class number is the last 4 digits
+        if class_full and class_full[-4:].isdigit():
+            major_raw = class_full[:-4].strip()
+            class_num = class_full[-4:]
+        else:
+            major_raw = class_full.strip()
+            class_num = ""
+        
+        # Parse major_raw into major, chinese_level
+        if '（' in major_raw:
+            major_part = major_raw.split('（')[0]
+            chinese_level_part = major_raw.split('（')[1].rstrip('）')
+        else:
+            major_part = major_raw
+            chinese_level_part = ''
+        
+        major = major_part.strip()
+        major = MAJOR_TRANSLATION.get(major, major)
+        chinese_level = CHINESE_LEVEL_MAPPING.get(chinese_level_part.strip(), 0)
+        college = COLLEGE_MAPPING.get(major_part, '')
+        college = COLLEGE_TRANSLATION.get(college, college)
+        
+        gender_raw = row.get("性别", "").strip()
+        # Translate gender
+        if gender_raw == "男":
+            gender = "male"
+        elif gender_raw == "女":
+            gender = "female"
+        else:
+            gender = gender_raw  # Keep as is if English or other
+        
+        student = {
+            "id": row.get("学号", "").strip(),
+            "name": row.get("姓名", "").strip(),
+            "gender": gender,
+            "major": major,
+            "chinese_level": chinese_level,
+            "college": college,
+            "class": class_num,
+            "phone": row.get("手机号码", "").strip(),
+            "country": COUNTRY_TRANSLATIONS.get(row.get("国籍", "").strip(), row.get("国籍", "").strip()),
+        }
+        # Skip if required fields are empty
+        if not student["id"] or not student["name"]:
+            continue
+        yield student
+
+
 def main() -> None:
     # Paths
     script_dir = os.path.dirname(__file__)
     csv_folder = os.path.join(script_dir, "..", "..", "reference", "csv")
     seed_file = os.path.join(script_dir, "..", "..", "backend", "accounts", "seed_data", "students.json")
-    
-    # Load existing students into a dict by ID
-    existing_students = {}
-    if os.path.exists(seed_file):
-        with open(seed_file, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            if content:
-                for student in json.loads(content):
-                    existing_students[student["id"]] = student
+
+    parser = argparse.ArgumentParser(description="Convert registrar CSV exports into student seed records")
+    add_stream_arguments(parser, seed_file, csv_folder)
+    parser.add_argument("--pattern", default="*.csv", help="Glob of CSV files inside --csv-dir")
+    parser.add_argument("--no-merge", action="store_true",
+                        help="Do not carry over students already in the output file")
+    args = parser.parse_args()
     
     # Find CSVs
-    csv_files = glob.glob(os.path.join(csv_folder, "*.csv"))
+    csv_files = find_csvs(args.csv_dir, args.pattern)
     if not csv_files:
-        print(f"No CSV files found in {csv_folder}")
+        log(f"No CSV files found in {args.csv_dir}")
         return
     
-    # Collect all new students from CSVs
-    new_students = {}
-    for csv_path in csv_files:
-        print(f"Processing: {csv_path}")
-        try:
-            with open(csv_path, "r", encoding="utf-8-sig") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Map to student dict
-                    class_full = row.get("班级", "").strip()
-                    # Extract major and class number
-                    # Assume class number is the last 4 digits
-                    if class_full and class_full[-4:].isdigit():
-                        major_raw = class_full[:-4].strip()
-                        class_num = class_full[-4:]
-                    else:
-                        major_raw = class_full.strip()
-                        class_num = ""
-                    
-                    # Parse major_raw into major, chinese_level
-                    if '（' in major_raw:
-                        major_part = major_raw.split('（')[0]
-                        chinese_level_part = major_raw.split('（')[1].rstrip('）')
-                    else:
-                        major_part = major_raw
-                        chinese_level_part = ''
-                    
-                    major = major_part.strip()
-                    major = MAJOR_TRANSLATION.get(major, major)
-                    chinese_level = CHINESE_LEVEL_MAPPING.get(chinese_level_part.strip(), 0)
-                    college = COLLEGE_MAPPING.get(major_part, '')
-                    college = COLLEGE_TRANSLATION.get(college, college)
-                    
-                    gender_raw = row.get("性别", "").strip()
-                    # Translate gender
-                    if gender_raw == "男":
-                        gender = "male"
-                    elif gender_raw == "女":
-                        gender = "female"
-                    else:
-                        gender = gender_raw  # Keep as is if English or other
-                    
-                    student = {
-                        "id": row.get("学号", "").strip(),
-                        "name": row.get("姓名", "").strip(),
-                        "gender": gender,
-                        "major": major,
-                        "chinese_level": chinese_level,
-                        "college": college,
-                        "class": class_num,
-                        "phone": row.get("手机号码", "").strip(),
-                        "country": COUNTRY_TRANSLATIONS.get(row.get("国籍", "").strip(), row.get("国籍", "").strip()),
-                    }
-                    # Skip if required fields are empty
-                    if not student["id"] or not student["name"]:
-                        continue
-                    
-                    id = student["id"]
-                    if id in new_students:
-                        # Merge with existing new
-                        for key in student:
-                            if not new_students[id].get(key) and student[key]:
-                                new_students[id][key] = student[key]
-                    else:
-                        new_students[id] = student.copy()
-        except Exception as e:
-            print(f"Error processing {csv_path}: {e}")
-            continue
-    
-    # Now merge new_students into existing_students
+    # Students already in the output come first; later rows with the same ID
+    # only fill fields that are still empty.
+    existing = [] if args.no_merge else iter_seed_records(args.output)
+    existing_ids = set()
+
+    def chained():
+        for student in existing:
+            existing_ids.add(student.get("id"))
+            yield student
+        yield from iter_converted(csv_files, iter_student_records, args.jobs)
+
+    field_counts = {field: 0 for field in STUDENT_FIELDS}
+    complete_count = 0
     total_new = 0
-    total_merged = 0
-    merged_ids = []
-    for id, student in new_students.items():
-        if id in existing_students:
-            # Merge
-            merged = False
-            for key in student:
-                if not existing_students[id].get(key) and student[key]:
-                    existing_students[id][key] = student[key]
-                    merged = True
-            if merged:
-                total_merged += 1
-                merged_ids.append(id)
-        else:
-            existing_students[id] = student
-            total_new += 1
-    
-    # Save updated students
-    os.makedirs(os.path.dirname(seed_file), exist_ok=True)
-    students_list = list(existing_students.values())
-    students_list.sort(key=lambda s: int(s["id"]))
-    with open(seed_file, "w", encoding="utf-8") as f:
-        json.dump(students_list, f, ensure_ascii=False, indent=2)
-    
-    # Compute completeness stats
-    total_students = len(students_list)
-    complete_count = sum(1 for s in students_list if all(s.get(k) for k in ['id', 'name', 'gender', 'major', 'chinese_level', 'college', 'class', 'phone', 'country']))
-    field_counts = {}
-    for field in ['id', 'name', 'gender', 'major', 'chinese_level', 'college', 'class', 'phone', 'country']:
-        field_counts[field] = sum(1 for s in students_list if s.get(field))
+    with RecordWriter(args.output, output_format(args.output, args.format)) as writer:
+        for student in dedupe(chained(), "id", fill_empty=True, complete_fields=STUDENT_FIELDS):
+            writer.write(student)
+            # Completeness stats are tallied on the fly instead of re-scanning a list
+            filled = [field for field in STUDENT_FIELDS if student.get(field)]
+            for field in filled:
+                field_counts[field] += 1
+            complete_count += len(filled) == len(STUDENT_FIELDS)
+            total_new += student.get("id") not in existing_ids
     
-    print(f"Updated {seed_file} with {total_new} new students, merged {total_merged} existing.")
-    if merged_ids:
-        print(f"Merged IDs: {', '.join(merged_ids)}")
-    print(f"Total students: {total_students}")
-    print(f"Data completeness:")
-    print(f"  Complete records (all fields): {complete_count}/{total_students}")
+    total_students = writer.count
+    log(f"Updated {args.output} with {total_new} new students.")
+    log(f"Total students: {total_students}")
+    log(f"Data completeness:")
+    log(f"  Complete records (all fields): {complete_count}/{total_students}")
     for field, count in field_counts.items():
-        print(f"  {field}: {count}/{total_students}")
+        log(f"  {field}: {count}/{total_students}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -9,41 +9,87 @@ import sys
 import glob
 import pdfplumber
 import re
+import io
 import json
+import hashlib
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+# Pages scanned for the title header / term line when metadata rows lack them
+HEADER_TEXT_PAGES = 2
+
+# Bump whenever table extraction or block parsing changes so cached results are re-parsed.
+PARSER_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "reference", "pdf", ".cache")
+
 
 def find_default_pdf() -> str | None:
     pdfs = sorted(glob.glob("*.pdf"))
     return pdfs[0] if pdfs else None
 
 
+def _page_tables(page, strategy: str):
+    tables = []
+    if strategy in ("auto", "lines"):
+        try:
+            tables = page.extract_tables({
+                "vertical_strategy": "lines",
+                "horizontal_strategy": "lines",
+            }) or []
+        except Exception:
+            tables = []
+    if strategy == "text" or (strategy == "auto" and not tables):
+        try:
+            tables = page.extract_tables({
+                "vertical_strategy": "text",
+                "horizontal_strategy": "text",
+            }) or []
+        except Exception:
+            tables = page.extract_tables() or []
+    return tables
+
+
 def extract_tables(pdf_path: str, strategy: str = "auto"):
     all_tables = []  # (page_index, table_index, rows)
     with pdfplumber.open(pdf_path) as pdf:
         for i, page in enumerate(pdf.pages, start=1):
-            tables = []
-            if strategy in ("auto", "lines"):
-                try:
-                    tables = page.extract_tables({
-                        "vertical_strategy": "lines",
-                        "horizontal_strategy": "lines",
-                    }) or []
-                except Exception:
-                    tables = []
-            if strategy == "text" or (strategy == "auto" and not tables):
-                try:
-                    tables = page.extract_tables({
-                        "vertical_strategy": "text",
-                        "horizontal_strategy": "text",
-                    }) or []
-                except Exception:
-                    tables = page.extract_tables() or []
-            for t_idx, table in enumerate(tables, start=1):
+            for t_idx, table in enumerate(_page_tables(page, strategy), start=1):
                 all_tables.append((i, t_idx, table))
     return all_tables
 
 
+def read_pdf(pdf_path: str, strategy: str = "lines") -> dict:
+    """Open a PDF once and return everything the pipeline needs from it.
+
+    Tables are extracted and merged a single time (newlines preserved), and the
+    text of the first pages is kept for the term / student-name fallbacks, so
+    no later step has to re-open the file.
+    """
+    all_tables = []
+    header_lines: list[str] = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for i, page in enumerate(pdf.pages, start=1):
+            for t_idx, table in enumerate(_page_tables(page, strategy), start=1):
+                all_tables.append((i, t_idx, table))
+            if i <= HEADER_TEXT_PAGES:
+                try:
+                    txt = page.extract_text() or ""
+                except Exception:
+                    txt = ""
+                header_lines.extend([l.strip() for l in txt.splitlines() if l.strip()])
+    headers, rows, meta, notes, is_chinese = merge_main_table(all_tables, collapse_newlines=False)
+    return {
+        "headers": headers,
+        "rows": rows,
+        "meta": meta,
+        "notes": notes,
+        "is_chinese": is_chinese,
+        "header_lines": header_lines,
+    }
+
+
 def merge_main_table(all_tables, collapse_newlines: bool = True):
     import html as _html
 
@@ -744,49 +790,56 @@ def extract_student_info(metadata_lines: list[str]) -> dict:
     return info
 
 
-def extract_student_info_from_pdf(pdf_path: str, metadata_lines: list[str]) -> dict:
+def _header_pages_lines(pdf_path: str) -> list[list[str]]:
+    pages: list[list[str]] = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for i, p in enumerate(pdf.pages):
+            if i >= HEADER_TEXT_PAGES:
+                break
+            txt = p.extract_text() or ""
+            pages.append([l.strip() for l in txt.splitlines() if l.strip()])
+    return pages
+
+
+def extract_student_info_from_pdf(pdf_path: str, metadata_lines: list[str], header_lines: list[str] | None = None) -> dict:
     """Extract student info using metadata lines first, then fallback to scanning PDF text.
 
     Handles title headers such as "<NAME>'s Curriculum" (EN) and "<NAME>课表/课程表" (CN)
-    that may not be part of table metadata rows.
+    that may not be part of table metadata rows. ``header_lines`` (from ``read_pdf``)
+    avoids re-opening the PDF for the fallback.
     """
     info = extract_student_info(metadata_lines or [])
     if info.get("name"):
         return info
     # Fallback: scan first 2 pages text
     try:
-        import pdfplumber  # type: ignore
-        with pdfplumber.open(pdf_path) as pdf:
-            pages = [p for i, p in enumerate(pdf.pages) if i < 2]
-            for p in pages:
-                txt = p.extract_text() or ""
-                # Normalize colons and spaces
-                lines = [l.strip() for l in txt.splitlines() if l.strip()]
-                for s in lines:
-                    if info.get("name"):
-                        break
-                    # English header: <NAME>'s … Curriculum (with possible injected term/ID)
-                    if re.search(r"\bCurriculum\b", s, flags=re.IGNORECASE) and "'s" in s:
-                        pre = re.split(r"'s\b", s, maxsplit=1, flags=re.IGNORECASE)[0]
-                        x = pre
-                        dash_chars = "\u2010\u2011\u2012\u2013\u2014\u2212\ufe63\uff0d"
-                        trans = {ord(ch): '-' for ch in dash_chars}
-                        for i in range(10):
-                            trans[0xFF10 + i] = ord('0') + i
-                        x = x.translate(trans)
-                        x = re.sub(r"\b\d{4}-\d{4}\b.*?academic\s*year\s*[1-2]\s*term", " ", x, flags=re.IGNORECASE)
-                        x = re.sub(r"\bstudent\s*id\s*:\s*[A-Za-z0-9_-]+", " ", x, flags=re.IGNORECASE)
-                        cand = " ".join(x.split()).strip(" -:·.")
-                        if cand:
-                            info["name"] = cand
-                            break
-                    # Chinese header: <NAME>课表 or <NAME>课程表
-                    m_cn = re.search(r"^\s*([A-Za-z\u4e00-\u9fff][A-Za-z\u4e00-\u9fff\s.\-']{1,}?)\s*(?:课表|课程表)\s*$", s)
-                    if m_cn and not info.get("name"):
-                        info["name"] = " ".join(m_cn.group(1).split())
-                        break
+        pages = [header_lines] if header_lines is not None else _header_pages_lines(pdf_path)
+        for lines in pages:
+            for s in lines:
                 if info.get("name"):
                     break
+                # English header: <NAME>'s … Curriculum (with possible injected term/ID)
+                if re.search(r"\bCurriculum\b", s, flags=re.IGNORECASE) and "'s" in s:
+                    pre = re.split(r"'s\b", s, maxsplit=1, flags=re.IGNORECASE)[0]
+                    x = pre
+                    dash_chars = "\u2010\u2011\u2012\u2013\u2014\u2212\ufe63\uff0d"
+                    trans = {ord(ch): '-' for ch in dash_chars}
+                    for i in range(10):
+                        trans[0xFF10 + i] = ord('0') + i
+                    x = x.translate(trans)
+                    x = re.sub(r"\b\d{4}-\d{4}\b.*?academic\s*year\s*[1-2]\s*term", " ", x, flags=re.IGNORECASE)
+                    x = re.sub(r"\bstudent\s*id\s*:\s*[A-Za-z0-9_-]+", " ", x, flags=re.IGNORECASE)
+                    cand = " ".join(x.split()).strip(" -:·.")
+                    if cand:
+                        info["name"] = cand
+                        break
+                # Chinese header: <NAME>课表 or <NAME>课程表
+                m_cn = re.search(r"^\s*([A-Za-z\u4e00-\u9fff][A-Za-z\u4e00-\u9fff\s.\-']{1,}?)\s*(?:课表|课程表)\s*$", s)
+                if m_cn and not info.get("name"):
+                    info["name"] = " ".join(m_cn.group(1).split())
+                    break
+            if info.get("name"):
+                break
     except Exception:
         pass
     return info
@@ -799,7 +852,7 @@ def extract_term_from_pdf(pdf_path: str) -> str | None:
     return m.group(1) if m else None
 
 
-def extract_term_from_content(pdf_path: str, metadata_lines: list[str]) -> str | None:
+def extract_term_from_content(pdf_path: str, metadata_lines: list[str], header_lines: list[str] | None = None) -> str | None:
     """Extract academic term (YYYY-YYYY-N) from content: metadata first, then page text.
 
     Handles Unicode dashes and CN/EN phrasing like:
@@ -841,15 +894,10 @@ def extract_term_from_content(pdf_path: str, metadata_lines: list[str]) -> str |
     if term:
         return term
     # 2) Fallback: scan first 2 pages text
+    if header_lines is not None:
+        return from_text_list(header_lines)
     try:
-        import pdfplumber  # type: ignore
-        with pdfplumber.open(pdf_path) as pdf:
-            lines: list[str] = []
-            for i, p in enumerate(pdf.pages):
-                if i >= 2:
-                    break
-                txt = p.extract_text() or ""
-                lines.extend([l.strip() for l in txt.splitlines() if l.strip()])
+        lines = [line for page in _header_pages_lines(pdf_path) for line in page]
         return from_text_list(lines)
     except Exception:
         return None
@@ -1024,15 +1072,17 @@ def extract_outside_courses(metadata_lines: list[str]) -> list[dict]:
     return courses
 
 
-def process_pdf(pdf_path: str, monday_date: str) -> list[dict]:
-    """Process a single PDF and return courses list."""
+def process_pdf(pdf_path: str, monday_date: str, content: dict | None = None) -> list[dict]:
+    """Process a single PDF and return courses list.
+
+    ``content`` is the result of ``read_pdf``; it is read here when not supplied.
+    """
     print(f"Processing: {pdf_path}")
     
-    # Detect tables
-    tables = extract_tables(pdf_path, strategy="lines")
-    
-    # Merge while preserving newlines for robust block parsing
-    headers, rows, meta, _, is_chinese = merge_main_table(tables, collapse_newlines=False)
+    # Detect tables and merge while preserving newlines for robust block parsing
+    if content is None:
+        content = read_pdf(pdf_path)
+    headers, rows, meta, is_chinese = content["headers"], content["rows"], content["meta"], content["is_chinese"]
     if not headers:
         print(f"Could not detect main timetable header for {pdf_path}; skipping.")
         return []
@@ -1053,8 +1103,8 @@ def process_pdf(pdf_path: str, monday_date: str) -> list[dict]:
     print(summarize_courses(courses, is_chinese))
     
     # Extract term and student for each course
-    term = extract_term_from_content(pdf_path, meta) or derive_term_from_monday(monday_date)
-    student = extract_student_info_from_pdf(pdf_path, meta)
+    term = extract_term_from_content(pdf_path, meta, content["header_lines"]) or derive_term_from_monday(monday_date)
+    student = extract_student_info_from_pdf(pdf_path, meta, content["header_lines"])
     
     # Prepare courses data
     db_courses = []
@@ -1089,18 +1139,147 @@ def process_pdf(pdf_path: str, monday_date: str) -> list[dict]:
     return db_courses
 
 
+# Hardcoded known terms and their Monday dates (simplified)
+KNOWN_TERMS = {
+    "2024-2025-1": "2024-09-09",
+    "2024-2025-2": "2025-03-03", 
+    "2025-2026-1": "2025-09-08",
+    "2025-2026-2": "2026-03-02",
+}
+
+
+def extract_student_pdf(pdf_path: str) -> tuple[str | None, list[dict]]:
+    """Single pass over one student timetable: returns (student_id, extracted courses).
+
+    The PDF is opened and its tables merged once; term detection, student info
+    and course parsing all reuse that result.
+    """
+    print(f"\nProcessing: {os.path.basename(pdf_path)}")
+    content = read_pdf(pdf_path)
+
+    # Extract term
+    term = extract_term_from_pdf(pdf_path) or extract_term_from_content(pdf_path, content["meta"], content["header_lines"])
+    if not term:
+        print(f"Could not extract term from {pdf_path}; skipping.")
+        return None, []
+
+    # Use hardcoded Monday date (simplified)
+    monday_date = KNOWN_TERMS.get(term, "2025-09-08")  # Default fallback
+    student = extract_student_info_from_pdf(pdf_path, content["meta"], content["header_lines"])
+    if not student.get('id'):
+        print(f"Could not extract student ID from {pdf_path}; skipping.")
+        return None, []
+
+    # Process PDF to get courses
+    try:
+        extracted_courses = process_pdf(pdf_path, monday_date, content)
+    except Exception as e:
+        print(f"Error processing {pdf_path}: {e}")
+        return None, []
+    return student['id'], extracted_courses
+
+
+def pdf_cache_key(pdf_path: str) -> str:
+    """SHA-256 of the file name and content plus ``PARSER_VERSION``.
+
+    The name is part of the key because the term is read from it first.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{PARSER_VERSION}\0{os.path.basename(pdf_path)}\0".encode("utf-8"))
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_cached(cache_path: str):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("parser_version") != PARSER_VERSION:
+        return None
+    return entry["log"], entry["student_id"], entry["courses"]
+
+
+def _store_cached(cache_path: str, result) -> None:
+    log, student_id, courses = result
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"parser_version": PARSER_VERSION, "log": log, "student_id": student_id, "courses": courses},
+                      f, ensure_ascii=False)
+        # Atomic rename: concurrent workers never see a half-written entry
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+
+
+def _extract_student_pdf_logged(pdf_path: str, cache_dir: str | None = None) -> tuple[str, str | None, list[dict]]:
+    """Pool worker: run ``extract_student_pdf`` with its output captured so the
+    parent can print each PDF's log in input order.
+
+    With ``cache_dir`` the result is looked up by ``pdf_cache_key`` first and
+    stored after a fresh parse; failed reads are not cached.
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f"{pdf_cache_key(pdf_path)}.json")
+        cached = _load_cached(cache_path)
+        if cached is not None:
+            return cached
+
+    buf = io.StringIO()
+    failed = False
+    with contextlib.redirect_stdout(buf):
+        try:
+            student_id, courses = extract_student_pdf(pdf_path)
+        except Exception as e:
+            print(f"Error reading {pdf_path}: {e}")
+            student_id, courses = None, []
+            failed = True
+    result = (buf.getvalue(), student_id, courses)
+    if cache_path and not failed:
+        _store_cached(cache_path, result)
+    return result
+
+
+def iter_extracted_pdfs(pdf_files: list[str], jobs: int, cache_dir: str | None = None):
+    """Yield (student_id, courses) per PDF in input order, using ``jobs`` processes.
+
+    Unchanged PDFs are served from ``cache_dir`` when given.
+    """
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    if jobs <= 1 or len(pdf_files) <= 1:
+        for pdf_path in pdf_files:
+            log, student_id, courses = _extract_student_pdf_logged(pdf_path, cache_dir)
+            sys.stdout.write(log)
+            yield student_id, courses
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # map() keeps submission order, so output is identical to a serial run
+        results = pool.map(_extract_student_pdf_logged, pdf_files, [cache_dir] * len(pdf_files), chunksize=4)
+        for log, student_id, courses in results:
+            sys.stdout.write(log)
+            yield student_id, courses
+
+
 def main() -> None:
-    # Hardcoded known terms and their Monday dates (simplified)
-    known_terms = {
-        "2024-2025-1": "2024-09-09",
-        "2024-2025-2": "2025-03-03", 
-        "2025-2026-1": "2025-09-08",
-        "2025-2026-2": "2026-03-02",
-    }
+    parser = argparse.ArgumentParser(description="Match ZJNU student timetable PDFs against courses.json")
+    parser.add_argument("--pdf-dir", default=None, help="Folder with timetable PDFs (defaults to reference/pdf)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for PDF extraction (default: all cores; 1 = serial)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Parsed-PDF cache keyed by content hash (default: reference/pdf/.cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every PDF and skip the cache")
+    args = parser.parse_args()
 
     # Paths
     script_dir = os.path.dirname(__file__)
-    pdf_folder = os.path.join(script_dir, "..", "..", "reference", "pdf")
+    pdf_folder = args.pdf_dir or os.path.join(script_dir, "..", "..", "reference", "pdf")
     courses_file = os.path.join(script_dir, "..", "..", "backend", "accounts", "seed_data", "courses.json")
     output_file = os.path.join(script_dir, "..", "..", "backend", "accounts", "seed_data", "student_courses.json")
 
@@ -1128,8 +1307,10 @@ def main() -> None:
         if code_term[0] and code_term[1]:
             course_lookup[code_term] = course
 
+    title_index = CourseTitleIndex(existing_courses)
+
     # Find PDFs
-    pdf_files = glob.glob(os.path.join(pdf_folder, "*.pdf"))
+    pdf_files = sorted(glob.glob(os.path.join(pdf_folder, "*.pdf")))
     if not pdf_files:
         print(f"No PDF files found in {pdf_folder}")
         return
@@ -1139,39 +1320,10 @@ def main() -> None:
     total_courses_matched = 0
     total_courses_unmatched = 0
 
-    for pdf_path in pdf_files:
-        print(f"\nProcessing: {os.path.basename(pdf_path)}")
-
-        # Extract term
-        term = extract_term_from_pdf(pdf_path)
-        if not term:
-            # Try from content
-            tables = extract_tables(pdf_path, strategy="lines")
-            _, _, meta, _, _ = merge_main_table(tables, collapse_newlines=False)
-            term = extract_term_from_content(pdf_path, meta)
-
-        if not term:
-            print(f"Could not extract term from {pdf_path}; skipping.")
+    cache_dir = None if args.no_cache else args.cache_dir
+    for student_id, extracted_courses in iter_extracted_pdfs(pdf_files, args.jobs, cache_dir):
+        if not student_id:
             continue
-        
-        # Use hardcoded Monday date (simplified)
-        monday_date = known_terms.get(term, "2025-09-08")  # Default fallback        # Extract student info first
-        tables = extract_tables(pdf_path, strategy="lines")
-        _, _, meta, _, _ = merge_main_table(tables, collapse_newlines=False)
-        student = extract_student_info_from_pdf(pdf_path, meta)
-
-        if not student.get('id'):
-            print(f"Could not extract student ID from {pdf_path}; skipping.")
-            continue
-
-        # Process PDF to get courses
-        try:
-            extracted_courses = process_pdf(pdf_path, monday_date)
-        except Exception as e:
-            print(f"Error processing {pdf_path}: {e}")
-            continue
-
-        student_id = student['id']
         print(f"Student ID: {student_id}")
 
         # Match courses for this student
@@ -1183,18 +1335,10 @@ def main() -> None:
             course_teacher = extracted_course.get('teacher', '').strip()
             course_term = extracted_course.get('term', '').strip()
 
-            # Try to match the course
-            matched_course = None
-
-            # First try exact match by title and term
-            for course in existing_courses:
-                if course.get('term', '').strip() == course_term:
-                    course_title_db = course.get('title', '').strip()
-                    if (course_title_db == course_title or 
-                        similar_course_titles(course_title, course_title_db)):
-                        # For now, accept the match regardless of teacher (since teacher IDs don't match names)
-                        matched_course = course
-                        break
+            # Exact or similar title within the same term; the index narrows the
+            # catalog to plausible candidates before similar_course_titles runs.
+            # For now, accept the match regardless of teacher (since teacher IDs don't match names)
+            matched_course = title_index.match(course_title, course_term)
 
             if matched_course:
                 course_code = matched_course.get('code', '')
@@ -1254,6 +1398,42 @@ def similar_names(name1: str, name2: str) -> bool:
     return name1_clean in name2_clean or name2_clean in name1_clean
 
 
+# Common translations/equivalents used by similar_course_titles
+TITLE_TRANSLATIONS = {
+    'artificial intelligence': ['人工智能', 'ai', 'artificial intelligence', '智能'],
+    'programming': ['程序设计', '编程', 'program', '语言'],
+    'computer science': ['计算机科学', 'cs', 'computer science', '计算机'],
+    'software': ['软件', 'software'],
+    'analysis': ['分析', 'analysis'],
+    'design': ['设计', 'design'],
+    'quality': ['质量', 'quality'],
+    'testing': ['测试', 'testing'],
+    'mathematics': ['数学', 'math', '高等数学'],
+    'algebra': ['代数', 'algebra', '线性代数'],
+    'language': ['语言', 'language'],
+    'introduction': ['导论', 'introduction', '入门'],
+    'foundation': ['基础', 'foundation', '基础'],
+    'physical education': ['体育', 'physical education', 'pe', '体教'],
+    'chinese': ['中文', 'chinese', '汉语'],
+    'english': ['英语', 'english'],
+    'communication': ['交流', 'communication', '沟通'],
+    'project': ['项目', 'project'],
+    'training': ['培训', 'training', '实训'],
+    'internship': ['实习', 'internship'],
+    'professional': ['专业', 'professional'],
+    'c language': ['c语言', 'c program', 'c语言程序设计'],
+    'object oriented': ['面向对象', 'object oriented'],
+    'data structure': ['数据结构', 'data structure'],
+    'algorithm': ['算法', 'algorithm'],
+    'database': ['数据库', 'database'],
+    'network': ['网络', 'network'],
+    'security': ['安全', 'security'],
+    'system': ['系统', 'system'],
+    'engineering': ['工程', 'engineering'],
+    'management': ['管理', 'management'],
+}
+
+
 def similar_course_titles(title1: str, title2: str) -> bool:
     """Check if two course titles are similar based on keywords"""
     if not title1 or not title2:
@@ -1263,41 +1443,6 @@ def similar_course_titles(title1: str, title2: str) -> bool:
     if title1.lower() == title2.lower():
         return True
     
-    # Common translations/equivalents
-    translations = {
-        'artificial intelligence': ['人工智能', 'ai', 'artificial intelligence', '智能'],
-        'programming': ['程序设计', '编程', 'program', '语言'],
-        'computer science': ['计算机科学', 'cs', 'computer science', '计算机'],
-        'software': ['软件', 'software'],
-        'analysis': ['分析', 'analysis'],
-        'design': ['设计', 'design'],
-        'quality': ['质量', 'quality'],
-        'testing': ['测试', 'testing'],
-        'mathematics': ['数学', 'math', '高等数学'],
-        'algebra': ['代数', 'algebra', '线性代数'],
-        'language': ['语言', 'language'],
-        'introduction': ['导论', 'introduction', '入门'],
-        'foundation': ['基础', 'foundation', '基础'],
-        'physical education': ['体育', 'physical education', 'pe', '体教'],
-        'chinese': ['中文', 'chinese', '汉语'],
-        'english': ['英语', 'english'],
-        'communication': ['交流', 'communication', '沟通'],
-        'project': ['项目', 'project'],
-        'training': ['培训', 'training', '实训'],
-        'internship': ['实习', 'internship'],
-        'professional': ['专业', 'professional'],
-        'c language': ['c语言', 'c program', 'c语言程序设计'],
-        'object oriented': ['面向对象', 'object oriented'],
-        'data structure': ['数据结构', 'data structure'],
-        'algorithm': ['算法', 'algorithm'],
-        'database': ['数据库', 'database'],
-        'network': ['网络', 'network'],
-        'security': ['安全', 'security'],
-        'system': ['系统', 'system'],
-        'engineering': ['工程', 'engineering'],
-        'management': ['管理', 'management'],
-    }
-    
     title1_lower = title1.lower()
     title2_lower = title2.lower()
     
@@ -1311,7 +1456,7 @@ def similar_course_titles(title1: str, title2: str) -> bool:
         return True
     
     # Check translation equivalents
-    for eng_word, chn_equivalents in translations.items():
+    for eng_word, chn_equivalents in TITLE_TRANSLATIONS.items():
         if eng_word in title1_lower:
             for chn in chn_equivalents:
                 if chn in title2_lower:
@@ -1322,7 +1467,73 @@ def similar_course_titles(title1: str, title2: str) -> bool:
                     return True
     
     return False
- 
+
+
+def _translation_keys(title_lower: str) -> tuple[set[str], set[str]]:
+    """Translation entries whose English key / any equivalent occurs in the title."""
+    eng = {key for key in TITLE_TRANSLATIONS if key in title_lower}
+    chn = {key for key, equivalents in TITLE_TRANSLATIONS.items() if any(e in title_lower for e in equivalents)}
+    return eng, chn
+
+
+class CourseTitleIndex:
+    """Inverted index over catalog titles, built once per run.
+
+    ``match`` returns the same course as scanning ``existing_courses`` in order
+    with ``title == title_db or similar_course_titles(...)`` for the same term,
+    but only verifies courses that share a feature that function can match on:
+    the exact / case-folded title, a whitespace word, or a TITLE_TRANSLATIONS
+    entry on opposite sides.
+    """
+
+    def __init__(self, courses: list[dict]):
+        self.courses = courses
+        self.exact: dict[tuple[str, str], list[int]] = {}
+        self.folded: dict[tuple[str, str], list[int]] = {}
+        self.words: dict[tuple[str, str], list[int]] = {}
+        self.eng: dict[tuple[str, str], list[int]] = {}
+        self.chn: dict[tuple[str, str], list[int]] = {}
+        for idx, course in enumerate(courses):
+            term = course.get('term', '').strip()
+            title = course.get('title', '').strip()
+            self.exact.setdefault((term, title), []).append(idx)
+            if not title:
+                continue
+            lowered = title.lower()
+            self.folded.setdefault((term, lowered), []).append(idx)
+            for word in set(lowered.split()):
+                self.words.setdefault((term, word), []).append(idx)
+            eng, chn = _translation_keys(lowered)
+            for key in eng:
+                self.eng.setdefault((term, key), []).append(idx)
+            for key in chn:
+                self.chn.setdefault((term, key), []).append(idx)
+
+    def candidates(self, title: str, term: str) -> list[int]:
+        found = set(self.exact.get((term, title), ()))
+        if title:
+            lowered = title.lower()
+            found.update(self.folded.get((term, lowered), ()))
+            shared: dict[int, int] = {}
+            for word in set(lowered.split()):
+                for idx in self.words.get((term, word), ()):
+                    shared[idx] = shared.get(idx, 0) + 1
+            found.update(idx for idx, count in shared.items() if count >= 2)
+            eng, chn = _translation_keys(lowered)
+            for key in eng:
+                found.update(self.chn.get((term, key), ()))
+            for key in chn:
+                found.update(self.eng.get((term, key), ()))
+        return sorted(found)
+
+    def match(self, title: str, term: str) -> dict | None:
+        for idx in self.candidates(title, term):
+            course = self.courses[idx]
+            title_db = course.get('title', '').strip()
+            if title_db == title or similar_course_titles(title, title_db):
+                return course
+        return None
+
 
 if __name__ == "__main__":
     main()